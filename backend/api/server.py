@@ -177,6 +177,11 @@ class WebCrawlRequest(BaseModel):
         None,
         description="Name of the knowledge graph to export to (creates new if not exists)"
     )
+    num_workers: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Number of crawler processes; more than one shards the crawl across processes"
+    )
 
 
 class ModifyDatasetRequest(BaseModel):
@@ -274,6 +279,9 @@ async def status():
     all_tasks = task_tracker.list_resumable_tasks()
     active_tasks = len([task for task in all_tasks if task.get('status') not in ['completed', 'failed', 'cancelled']])
     
+    # HTML-to-Markdown conversion queue (None until the first conversion)
+    from processors.conversion_service import get_conversion_stats
+    
     return {
         "success": True,
         "message": "API server is running",
@@ -284,7 +292,8 @@ async def status():
             "version": app.version,
             "missing_configs": missing_configs,
             "active_tasks": active_tasks,
-            "total_tasks": len(all_tasks)
+            "total_tasks": len(all_tasks),
+            "markdown_conversion": get_conversion_stats()
         }
     }
 
@@ -1068,7 +1077,8 @@ async def crawl_website(
             recursive=request.recursive,
             progress_callback=progress_callback,
             export_to_knowledge_graph=request.export_to_graph,
-            graph_name=request.graph_name
+            graph_name=request.graph_name,
+            num_workers=request.num_workers
         )
         
         if result.get("success"):
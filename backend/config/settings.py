@@ -141,3 +141,86 @@ LOG_BACKUP_COUNT = 3
 PARALLEL_MAX_WORKERS = None  # None means use CPU count - 1
 PARALLEL_CHUNK_SIZE = 10  # Number of items to process at once in parallel
 ASYNC_MAX_WORKERS = None  # None means use CPU count * 2 for IO-bound tasks
+
+# PDF extraction settings
+PDF_PAGE_CACHE_ENABLED = True  # Reuse text extracted from unchanged PDF pages across runs
+PDF_PAGE_CACHE_PATH = CACHE_DIR / "pdf_pages.sqlite3"  # Persistent page cache keyed by file hash and page number
+PDF_PAGE_WORKERS = None  # Processes extracting the pages of one large PDF; None means use the CPU count
+PDF_PAGES_PER_TASK = 16  # Pages sent to a worker process at once
+PDF_PARALLEL_MIN_PAGES = 64  # PDFs with fewer pages to extract are extracted in the calling process
+JSON_STREAMING_MIN_BYTES = 16 * 1024 * 1024  # JSON files and notebooks at least this large are parsed incrementally
+
+# Web crawler settings
+CRAWL_CACHE_DIR = CACHE_DIR / "crawl"  # HTTP validators and converted markdown for re-crawls
+CRAWL_CACHE_MAX_AGE = 30 * 24 * 3600  # Seconds a page stays in the crawl cache after it was last crawled
+CRAWL_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Cached markdown and links kept before the oldest pages are evicted
+NEAR_DUPLICATE_MAX_DISTANCE = 6  # Max SimHash bit difference for two pages to count as near-duplicates
+CRAWL_CHECKPOINT_DIR = APP_DIR / "crawl_checkpoints"  # Resumable crawl state, keyed by task ID
+CRAWL_CHECKPOINT_INTERVAL = 25  # Pages crawled between checkpoints
+HTML_PARSER = None  # BeautifulSoup tree builder for crawled pages; None uses lxml when installed
+CRAWL_MAX_DELAY = 120.0  # Upper bound in seconds on per-domain politeness delays, including Retry-After
+CRAWL_LATENCY_DELAY_FACTOR = 1.0  # Minimum per-domain delay as a multiple of the host's response time
+CRAWL_MAX_RETRIES = 2  # Times a page is re-queued after a 429/503 response
+ROBOTS_CACHE_DIR = CACHE_DIR / "robots"  # robots.txt files shared by all crawls
+ROBOTS_CACHE_TTL = 24 * 3600  # Max seconds a robots.txt is cached (Cache-Control/Expires may shorten it)
+ROBOTS_ERROR_TTL = 600  # Seconds 5xx responses and failed robots.txt fetches are cached
+ROBOTS_FETCH_TIMEOUT = 10  # Timeout of robots.txt requests in seconds
+CRAWL_WORKERS = None  # Worker processes of sharded crawls; None means use the CPU count
+CRAWL_SHARD_POLL_INTERVAL = 0.2  # Seconds idle crawl shards and the coordinator wait between frontier checks
+CRAWL_WORKER_RESTARTS = 2  # Times a crashed crawl worker is replaced before its shard is given up
+CRAWL_ARCHIVE_ENABLED = True  # Keep raw HTML, headers and markdown of dataset crawls in WARC archives
+CRAWL_ARCHIVE_DIR = APP_DIR / "crawl_archives"  # Compressed WARC files and their CDXJ offset indexes
+CRAWL_ARCHIVE_COMPRESSION = "gzip"  # gzip, or zstd when the zstandard package is installed
+CRAWL_ARCHIVE_MAX_FILE_SIZE = 1024 * 1024 * 1024  # Bytes after which a new archive file is started
+CRAWL_MAX_PAGE_BYTES = 10 * 1024 * 1024  # Largest (decompressed) HTML page the crawler reads
+CRAWL_MAX_DOCUMENT_BYTES = 50 * 1024 * 1024  # Largest linked document (PDF, ...) the crawler downloads
+CRAWL_HTTP_POOL_SIZE = 10  # Keep-alive connections per host in the crawler's HTTP session
+CRAWL_DOCUMENT_TYPES = {  # Non-HTML content types downloaded for the file processor, with their file extension
+    "application/pdf": ".pdf",
+    "application/json": ".json",
+    "application/x-ipynb+json": ".ipynb",
+    "text/markdown": ".md",
+    "text/x-markdown": ".md",
+    "text/plain": ".txt",
+}
+
+# Browser rendering settings
+PLAYWRIGHT_WAIT_STRATEGY = "domcontentloaded"  # domcontentloaded, load, networkidle or selector
+PLAYWRIGHT_WAIT_SELECTOR = "main, article, [role=main]"  # Element awaited by the "selector" strategy
+PLAYWRIGHT_RENDER_BUDGET = 15.0  # Max seconds spent rendering one page; content is taken as-is when it runs out
+PLAYWRIGHT_BLOCKED_RESOURCE_TYPES = ["image", "media", "font", "stylesheet"]  # Not needed for text extraction
+PLAYWRIGHT_BLOCKED_DOMAINS = [  # Analytics and ad hosts, blocked with their subdomains
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "hotjar.com",
+    "segment.com",
+    "segment.io",
+    "mixpanel.com",
+    "intercom.io",
+    "hs-scripts.com",
+    "clarity.ms",
+]
+PLAYWRIGHT_BLOCK_THIRD_PARTY = False  # Also block every request to hosts outside the page's site
+
+# Markdown conversion settings
+MARKDOWN_CONVERSION_TIMEOUT = 600  # Max seconds a crawl waits for a queued HTML-to-Markdown job
+MARKDOWN_BATCH_SIZE = 4  # Documents or page chunks generated together (similar lengths are grouped)
+MARKDOWN_MAX_NEW_TOKENS = 4096  # Max tokens the model generates per document in batch conversions
+MARKDOWN_CHUNK_TOKENS = 4096  # Max HTML tokens per model call; longer pages are split at sections/headings
+MARKDOWN_CACHE_ENABLED = True  # Reuse model conversions of identical cleaned HTML across crawls and retries
+MARKDOWN_CACHE_PATH = CACHE_DIR / "markdown_conversions.sqlite3"  # Persistent conversion cache
+MARKDOWN_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Cached markdown kept before least recently used entries are evicted
+MARKDOWN_QUANTIZE = False  # Dynamically quantize the model's linear layers to int8 when running on CPU
+MARKDOWN_NUM_THREADS = None  # CPU threads used by the markdown model; None keeps the torch default
+MARKDOWN_ROUTING_ENABLED = True  # Send simple, well-structured pages to the rule-based converter instead of the model
+MARKDOWN_ROUTER_THRESHOLDS = {  # A page goes to the model when any of these limits is exceeded
+    "min_model_size": 2000,  # Pages with fewer characters of cleaned HTML always use the rules
+    "min_text_ratio": 0.2,  # Minimum share of visible text in the cleaned HTML (lower means layout-heavy markup)
+    "max_depth": 30,  # Maximum element nesting depth
+    "max_elements": 5000,  # Maximum number of elements
+    "max_table_cells": 400,  # Maximum table cells (spanned cells and nested tables always go to the model)
+    "max_code_blocks": 30,  # Maximum <pre> blocks
+}
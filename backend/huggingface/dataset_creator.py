@@ -612,7 +612,8 @@ class DatasetCreator:
     def create_dataset_from_url(
         self, url, dataset_name, description, recursive=False, progress_callback=None,
         _cancellation_event=None, task_id=None, resume_from=None, update_existing=False,
-        export_to_knowledge_graph=True, graph_name=None, user_instructions=None, use_ai_guidance=False
+        export_to_knowledge_graph=True, graph_name=None, user_instructions=None, use_ai_guidance=False,
+        num_workers=None
     ):
         """Create a dataset from a URL by crawling the website.
         
@@ -630,6 +631,7 @@ class DatasetCreator:
             graph_name: Optional name for the knowledge graph
             user_instructions: User's description of what to scrape (for AI guidance)
             use_ai_guidance: Whether to use AI to guide the crawling process
+            num_workers: Number of crawler processes (more than one shards the crawl)
             
         Returns:
             Dictionary with success status and message
@@ -672,7 +674,22 @@ class DatasetCreator:
         try:
             # Initialize web crawler
             from web.crawler import WebCrawler
-            web_crawler = WebCrawler(respect_robots_txt=True, rate_limit_delay=1.0)
+            from web.crawl_cache import CrawlCache
+            from web.crawl_archive import CrawlArchive
+            from web.document_downloader import DocumentDownloader
+            from config.settings import CRAWL_ARCHIVE_ENABLED, TEMP_DIR
+
+            # Every crawl records validators and conversions so later updates can skip
+            # unchanged pages; only updates use conditional requests and reuse conversions
+            crawl_cache = CrawlCache(reuse=update_existing)
+            
+            # Keep the raw HTML so pages can be converted again without re-crawling
+            crawl_archive = CrawlArchive() if CRAWL_ARCHIVE_ENABLED else None
+            
+            # Linked documents are downloaded to a directory of their own, removed with the task's files
+            document_downloader = DocumentDownloader(download_dir=TEMP_DIR / "documents" / str(task_id))
+            web_crawler = WebCrawler(respect_robots_txt=True, rate_limit_delay=1.0, crawl_cache=crawl_cache,
+                                     crawl_archive=crawl_archive, document_downloader=document_downloader)
             
             # Start crawling message
             _progress_callback(10, f"Starting {'recursive ' if recursive else ''}crawl of {url}")
@@ -689,18 +706,46 @@ class DatasetCreator:
                 scaled_percent = 10 + (p * 0.5)
                 _progress_callback(scaled_percent, m)
             
-            # Perform the crawl
-            crawled_data = web_crawler.crawl_website(
+            # Perform the crawl, preparing each page for the dataset as it
+            # arrives; only lightweight page records are kept in memory
+            file_data_list = []
+            crawled_data = []
+            for page_data in web_crawler.iter_crawl(
                 start_url=url,
                 recursive=recursive,
                 max_pages=None,  # No limit
                 progress_callback=crawl_progress,
                 _cancellation_event=_cancellation_event,
                 user_instructions=user_instructions,
-                use_ai_guidance=use_ai_guidance
-            )
+                use_ai_guidance=use_ai_guidance,
+                task_id=task_id,
+                num_workers=num_workers
+            ):
+                file_data_list.extend(web_crawler.prepare_data_for_dataset([page_data]))
+                crawled_data.append({
+                    "url": page_data["url"],
+                    "title": page_data.get("title"),
+                    "meta_description": page_data.get("meta_description"),
+                    "local_path": page_data.get("local_path"),
+                    "fetched_at": page_data.get("fetched_at", "")
+                })
             
-            # Check for cancellation or error
+            # Linked PDFs and other documents are processed by the file processor
+            if web_crawler.documents:
+                file_data_list.extend(web_crawler.prepare_data_for_dataset(web_crawler.documents))
+                _progress_callback(60, f"Downloaded {len(web_crawler.documents)} linked documents")
+            
+            # A cancelled crawl keeps its checkpoint so the task can be resumed
+            if _cancellation_event and _cancellation_event.is_set():
+                _progress_callback(60, "Operation cancelled after crawling")
+                self.task_tracker.cancel_task(task_id)
+                return {
+                    "success": False, 
+                    "message": "Operation cancelled after crawling", 
+                    "task_id": task_id
+                }
+            
+            # Check for errors
             if not crawled_data:
                 _progress_callback(60, "No content found or operation cancelled")
                 self.task_tracker.complete_task(
@@ -714,18 +759,7 @@ class DatasetCreator:
                     "task_id": task_id
                 }
             
-            if _cancellation_event and _cancellation_event.is_set():
-                _progress_callback(60, "Operation cancelled after crawling")
-                self.task_tracker.cancel_task(task_id)
-                return {
-                    "success": False, 
-                    "message": "Operation cancelled after crawling", 
-                    "task_id": task_id
-                }
-            
-            # Prepare data for dataset creation
-            _progress_callback(65, "Preparing data for dataset creation")
-            file_data_list = web_crawler.prepare_data_for_dataset(crawled_data)
+            _progress_callback(65, f"Prepared {len(file_data_list)} pages for dataset creation")
             
             # Create and push dataset
             # Progress from 70-90%
@@ -759,6 +793,15 @@ class DatasetCreator:
                     # Initialize graph schema if needed
                     graph_store.initialize_schema()
                     
+                    def read_markdown(page_data):
+                        # Page content lives in the crawler's local files
+                        try:
+                            with open(page_data["local_path"], "r", encoding="utf-8") as f:
+                                return f.read()
+                        except Exception as read_error:
+                            logger.warning(f"Could not read crawled page {page_data.get('url')}: {read_error}")
+                            return ""
+                    
                     # Add documents to graph
                     for i, page_data in enumerate(crawled_data):
                         # Basic document metadata
@@ -766,7 +809,7 @@ class DatasetCreator:
                             "url": page_data.get("url", ""),
                             "title": page_data.get("title", "Unknown Title"),
                             "description": page_data.get("meta_description", ""),
-                            "content": page_data.get("markdown", ""),
+                            "content": read_markdown(page_data),
                             "fetched_at": page_data.get("fetched_at", "")
                         }
                         
@@ -778,6 +821,9 @@ class DatasetCreator:
                             progress = 91 + ((i + 1) / len(crawled_data) * 8)
                             _progress_callback(progress, f"Adding documents to knowledge graph ({i+1}/{len(crawled_data)})")
                     
+                    # Add the hyperlinks between crawled pages
+                    graph_store.add_document_links(list(web_crawler.link_graph.edges()))
+                    
                     # Extract entities from documents
                     _progress_callback(99, "Extracting entities for knowledge graph")
                     documents = [
@@ -785,7 +831,7 @@ class DatasetCreator:
                             "id": f"doc_{i}",
                             "url": page.get("url", ""),
                             "title": page.get("title", ""),
-                            "content": page.get("markdown", "")
+                            "content": read_markdown(page)
                         }
                         for i, page in enumerate(crawled_data)
                     ]
@@ -807,9 +853,17 @@ class DatasetCreator:
                         import os
                         if os.path.exists(item["local_path"]):
                             os.remove(item["local_path"])
+                
+                # Downloaded PDFs and other documents
+                import shutil
+                shutil.rmtree(document_downloader.download_dir, ignore_errors=True)
             except Exception as cleanup_error:
                 logger.warning(f"Error cleaning up temporary files: {cleanup_error}")
             
+            # The crawl no longer needs to be resumable
+            from web.crawl_checkpoint import CrawlCheckpointStore
+            CrawlCheckpointStore().delete(task_id)
+            
             # Mark task as completed
             self.task_tracker.complete_task(
                 task_id, 
@@ -821,7 +875,8 @@ class DatasetCreator:
                 "success": True, 
                 "message": f"Dataset {'updated' if update_existing else 'created'} successfully", 
                 "task_id": task_id,
-                "pages_processed": len(crawled_data)
+                "pages_processed": len(crawled_data),
+                "pages_skipped": crawl_cache.skipped_count if crawl_cache else 0
             }
             
         except Exception as e:
@@ -328,7 +328,45 @@ class GraphStore:
         except Exception as e:
             logger.error(f"Failed to add document: {e}")
             return None
-    
+
+    def add_document_links(self, links: List[Tuple[str, str]]) -> bool:
+        """
+        Add hyperlinks between documents to the knowledge graph.
+
+        Args:
+            links: List of (source URL, target URL) tuples, e.g. from a crawl's LinkGraph
+
+        Returns:
+            bool: Whether the links were added successfully
+        """
+        if not self.graph:
+            logger.error("Neo4j connection not available")
+            return False
+
+        try:
+            link_query = f"""
+            UNWIND $links AS link
+            MATCH (source:Document {{url: link.source, graph_name: '{self.graph_name}'}})
+            MATCH (target:Document {{url: link.target, graph_name: '{self.graph_name}'}})
+            MERGE (source)-[:LINKS_TO]->(target)
+            """
+
+            # Send the links in batches to keep each query small
+            batch_size = 1000
+            for start in range(0, len(links), batch_size):
+                batch = [
+                    {"source": source, "target": target}
+                    for source, target in links[start:start + batch_size]
+                ]
+                self.graph.query(link_query, {"links": batch})
+
+            logger.info(f"Added {len(links)} document links to graph {self.graph_name}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to add document links: {e}")
+            return False
+
     def extract_entities_from_documents(self, documents: List[Dict[str, Any]], llm_api_key: str = None) -> bool:
         """
         Extract entities and relationships from documents and add them to the graph.
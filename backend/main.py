@@ -1721,7 +1721,10 @@ def run_update(args):
                 return 1
             
             if result.get("success"):
-                logger.info(f"Dataset '{dataset_name}' updated successfully")
+                logger.info(
+                    f"Dataset '{dataset_name}' updated successfully "
+                    f"({result.get('pages_skipped', 0)} unchanged pages skipped)"
+                )
                 if task_id:
                     task_tracker.complete_task(task_id, success=True)
                 return 0
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.settings import MARKDOWN_CACHE_PATH, MARKDOWN_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Process-wide cache
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class ConversionCache:
+    """
+    Persistent cache of model HTML-to-Markdown conversions.
+
+    Entries are keyed by a hash of the cleaned HTML, the instruction, the
+    model and the generation parameters, so unchanged pages, duplicate URLs
+    and retries are converted once. The cache is bounded in size and evicts
+    the least recently used entries first.
+    """
+
+    def __init__(self, db_path=None, max_bytes: int = MARKDOWN_CACHE_MAX_BYTES):
+        """
+        Initialize the cache. The database is opened on first use.
+
+        Args:
+            db_path: Path of the SQLite database (defaults to MARKDOWN_CACHE_PATH)
+            max_bytes: Maximum total size of the cached markdown in bytes
+        """
+        self.db_path = Path(db_path) if db_path else MARKDOWN_CACHE_PATH
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._lock = threading.Lock()
+
+        # Statistics for this process
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(html: str, instruction: Optional[str], model_id: str, params: Dict[str, Any]) -> str:
+        """
+        Build the cache key of a conversion.
+
+        Args:
+            html: Cleaned HTML sent to the model
+            instruction: Custom instruction (None for the default one)
+            model_id: Model name or path
+            params: Generation parameters that affect the output
+
+        Returns:
+            Hex digest identifying the conversion
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps([instruction, model_id, params], sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(html.encode("utf-8", errors="surrogatepass"))
+        return digest.hexdigest()
+
+    def _connection(self):
+        """Open the database and create the table if needed."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None,
+                                         check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS conversions (
+                    key TEXT PRIMARY KEY,
+                    markdown TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS conversions_by_use ON conversions (last_used);
+                CREATE TABLE IF NOT EXISTS conversions_size (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    total INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO conversions_size (id, total)
+                    SELECT 0, COALESCE(SUM(size), 0) FROM conversions;
+            """)
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a conversion and mark it as recently used.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Cached markdown, or None on a miss
+        """
+        with self._lock:
+            try:
+                conn = self._connection()
+                row = conn.execute("SELECT markdown FROM conversions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE conversions SET last_used = ? WHERE key = ?", (time.time(), key))
+            except sqlite3.Error as e:
+                logger.warning(f"Conversion cache lookup failed: {e}")
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, markdown: str):
+        """
+        Store a conversion, evicting least recently used entries beyond the size limit.
+
+        Args:
+            key: Key from make_key()
+            markdown: Converted markdown
+        """
+        size = len(markdown.encode("utf-8", errors="surrogatepass"))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            try:
+                conn = self._connection()
+                # The running total of sizes is updated in the same transaction
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = conn.execute("SELECT size FROM conversions WHERE key = ?", (key,)).fetchone()
+                    conn.execute(
+                        "INSERT OR REPLACE INTO conversions (key, markdown, size, last_used) VALUES (?, ?, ?, ?)",
+                        (key, markdown, size, time.time())
+                    )
+                    conn.execute(
+                        "UPDATE conversions_size SET total = total + ? WHERE id = 0", (size - (row[0] if row else 0),)
+                    )
+                    self._evict(conn)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error as e:
+                logger.warning(f"Conversion cache write failed: {e}")
+
+    def _evict(self, conn):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        total = conn.execute("SELECT total FROM conversions_size WHERE id = 0").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        evicted = []
+        for key, size in conn.execute("SELECT key, size FROM conversions ORDER BY last_used"):
+            evicted.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM conversions WHERE key = ?", evicted)
+        conn.execute("UPDATE conversions_size SET total = total - ? WHERE id = 0", (freed,))
+        self.evictions += len(evicted)
+        logger.debug(f"Evicted {len(evicted)} cached conversions ({freed} bytes)")
+
+    def clear(self):
+        """Remove every cached conversion."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM conversions")
+            conn.execute("UPDATE conversions_size SET total = 0 WHERE id = 0")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with entry count, size, hits, misses, hit rate and evictions
+        """
+        with self._lock:
+            try:
+                conn = self._connection()
+                entries = conn.execute("SELECT COUNT(*) FROM conversions").fetchone()[0]
+                size = conn.execute("SELECT total FROM conversions_size WHERE id = 0").fetchone()[0]
+            except sqlite3.Error:
+                entries, size = None, None
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "size_bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def get_conversion_cache() -> ConversionCache:
+    """Get or create the process-wide conversion cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ConversionCache()
+        return _cache
@@ -0,0 +1,189 @@
+import logging
+import re
+import threading
+from typing import Any, Dict, Optional
+
+from config.settings import MARKDOWN_ROUTER_THRESHOLDS
+
+logger = logging.getLogger(__name__)
+
+HEURISTIC = "heuristic"
+MODEL = "model"
+
+_TAG = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9-]*)[^>]*?(/?)>")
+_SPANNED_CELL = re.compile(r"<t[dh][^>]*\b(?:rowspan|colspan)\s*=\s*[\"']?([0-9]+)", re.IGNORECASE)
+
+# Elements without a closing tag, which do not nest
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param",
+    "source", "track", "wbr",
+}
+
+
+def page_features(html: str) -> Dict[str, Any]:
+    """
+    Measure the structure of a cleaned HTML page with a single tag scan.
+
+    Args:
+        html: Cleaned HTML content
+
+    Returns:
+        Dictionary with the page size in characters, element count, maximum nesting
+        depth, share of visible text, table cells, spanned cells, nested tables and
+        code blocks
+    """
+    elements = 0
+    depth = 0
+    max_depth = 0
+    markup = 0
+    table_depth = 0
+    features = {"table_cells": 0, "nested_tables": 0, "code_blocks": 0}
+
+    for match in _TAG.finditer(html):
+        markup += match.end() - match.start()
+        closing, name, self_closing = match.group(1), match.group(2).lower(), match.group(3)
+        if closing:
+            depth = max(0, depth - 1)
+            if name == "table":
+                table_depth = max(0, table_depth - 1)
+            continue
+
+        elements += 1
+        if name in ("td", "th"):
+            features["table_cells"] += 1
+        elif name == "table":
+            if table_depth:
+                features["nested_tables"] += 1
+            table_depth += 1
+        elif name == "pre":
+            features["code_blocks"] += 1
+
+        if name not in VOID_ELEMENTS and not self_closing:
+            depth += 1
+            max_depth = max(max_depth, depth)
+
+    spanned = [int(value) for value in _SPANNED_CELL.findall(html)]
+    features.update({
+        "size": len(html),
+        "elements": elements,
+        "max_depth": max_depth,
+        "text_ratio": (len(html) - markup) / len(html) if html else 1.0,
+        "spanned_cells": sum(1 for value in spanned if value > 1),
+    })
+    return features
+
+
+class ConversionRouter:
+    """
+    Routes each page to the rule-based converter or the model.
+
+    Simple, well-structured pages are converted by the fast rule-based
+    converter; pages whose layout, tables or code the rules are likely to
+    mangle are reserved for the model. Every decision is logged with its
+    reasons and counted, together with the time spent on each route.
+    """
+
+    def __init__(self, thresholds: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the router.
+
+        Args:
+            thresholds: Overrides of MARKDOWN_ROUTER_THRESHOLDS. A page goes to the model when
+                it has less visible text than min_text_ratio, is nested deeper than max_depth,
+                has more than max_elements elements, max_table_cells table cells or
+                max_code_blocks code blocks, or has spanned cells or nested tables;
+                pages smaller than min_model_size characters always use the rules
+        """
+        self.thresholds = dict(MARKDOWN_ROUTER_THRESHOLDS)
+        self.thresholds.update(thresholds or {})
+
+        self._lock = threading.Lock()
+        self.pages = {HEURISTIC: 0, MODEL: 0}
+        self.seconds = {HEURISTIC: 0.0, MODEL: 0.0}
+        self.characters = {HEURISTIC: 0, MODEL: 0}
+
+    def reasons(self, features: Dict[str, Any]) -> list:
+        """
+        List why a page needs the model.
+
+        Args:
+            features: Result of page_features()
+
+        Returns:
+            List of human-readable reasons (empty for pages the rules can handle)
+        """
+        limits = self.thresholds
+        if features["size"] < limits["min_model_size"]:
+            return []
+
+        reasons = []
+        if features["text_ratio"] < limits["min_text_ratio"]:
+            reasons.append(f"text ratio {features['text_ratio']:.2f} < {limits['min_text_ratio']}")
+        if features["max_depth"] > limits["max_depth"]:
+            reasons.append(f"depth {features['max_depth']} > {limits['max_depth']}")
+        if features["elements"] > limits["max_elements"]:
+            reasons.append(f"{features['elements']} elements > {limits['max_elements']}")
+        if features["table_cells"] > limits["max_table_cells"]:
+            reasons.append(f"{features['table_cells']} table cells > {limits['max_table_cells']}")
+        if features["spanned_cells"] or features["nested_tables"]:
+            reasons.append("complex tables")
+        if features["code_blocks"] > limits["max_code_blocks"]:
+            reasons.append(f"{features['code_blocks']} code blocks > {limits['max_code_blocks']}")
+        return reasons
+
+    def route(self, html: str, label: Optional[str] = None) -> str:
+        """
+        Choose the converter for a page.
+
+        Args:
+            html: Cleaned HTML content
+            label: Name of the page used in the log message
+
+        Returns:
+            HEURISTIC or MODEL
+        """
+        features = page_features(html)
+        reasons = self.reasons(features)
+        route = MODEL if reasons else HEURISTIC
+        logger.info(
+            f"Routed {label or 'page'} ({features['size']} chars, {features['elements']} elements, "
+            f"text ratio {features['text_ratio']:.2f}) to {route}"
+            + (f": {', '.join(reasons)}" if reasons else "")
+        )
+        return route
+
+    def record(self, route: str, seconds: float, characters: int):
+        """
+        Record a finished conversion.
+
+        Args:
+            route: Route the page took
+            seconds: Time spent converting it
+            characters: Size of its cleaned HTML
+        """
+        with self._lock:
+            self.pages[route] += 1
+            self.seconds[route] += seconds
+            self.characters[route] += characters
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get routing statistics.
+
+        Returns:
+            Dictionary with the pages, share of pages and throughput of each route
+        """
+        with self._lock:
+            total = sum(self.pages.values())
+            return {
+                route: {
+                    "pages": self.pages[route],
+                    "share": self.pages[route] / total if total else 0.0,
+                    "seconds": self.seconds[route],
+                    "pages_per_second": self.pages[route] / self.seconds[route] if self.seconds[route] else None,
+                    "characters_per_second": (
+                        self.characters[route] / self.seconds[route] if self.seconds[route] else None
+                    ),
+                }
+                for route in (HEURISTIC, MODEL)
+            }
@@ -0,0 +1,232 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+from config.settings import MARKDOWN_CONVERSION_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Process-wide service instance
+_service = None
+_service_lock = threading.Lock()
+
+
+class MarkdownConversionService:
+    """
+    Long-lived HTML to Markdown conversion service.
+
+    A single HTMLMarkdownConverter is shared by every crawl, task and API
+    request in the process, so the ReaderLM-v2 weights are loaded once.
+    Conversion jobs are submitted through a queue and run one at a time on a
+    dedicated worker thread that owns the model.
+    """
+
+    def __init__(self, converter=None):
+        """
+        Initialize the conversion service.
+
+        Args:
+            converter: HTMLMarkdownConverter to use (created lazily if not provided)
+        """
+        self.converter = converter
+        self.jobs = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+        # Job statistics
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.total_wait_time = 0.0
+        self.total_processing_time = 0.0
+        self.last_job_latency = None
+        self.model_load_time = None
+
+    def _ensure_worker(self):
+        """Start the worker thread if it is not running."""
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Markdown conversion service has been shut down")
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="markdown-conversion", daemon=True
+                )
+                self._worker.start()
+
+    def _get_converter(self):
+        """Create the shared converter and load its model on first use."""
+        if self.converter is None:
+            from processors.markdown_converter import HTMLMarkdownConverter
+            self.converter = HTMLMarkdownConverter()
+
+        if not self.converter.model and not self.converter.load_attempted:
+            start_time = time.time()
+            self.converter.load_model()
+            self.model_load_time = time.time() - start_time
+            logger.info(f"Markdown conversion model ready after {self.model_load_time:.2f}s")
+
+        return self.converter
+
+    def _run(self):
+        """Worker loop processing queued conversion jobs."""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                break
+
+            future, kwargs, submitted_at = job
+            if not future.set_running_or_notify_cancel():
+                self.jobs.task_done()
+                continue
+
+            started_at = time.time()
+            try:
+                markdown = self._get_converter().html_to_markdown(**kwargs)
+            except Exception as e:
+                logger.error(f"Error in markdown conversion job: {e}")
+                with self._lock:
+                    self.jobs_failed += 1
+                future.set_exception(e)
+            else:
+                finished_at = time.time()
+                with self._lock:
+                    self.jobs_completed += 1
+                    self.total_wait_time += started_at - submitted_at
+                    self.total_processing_time += finished_at - started_at
+                    self.last_job_latency = finished_at - submitted_at
+                logger.debug(
+                    f"Converted document in {finished_at - started_at:.2f}s "
+                    f"(queued {started_at - submitted_at:.2f}s, {self.queue_depth} jobs waiting)"
+                )
+                future.set_result(markdown)
+            finally:
+                self.jobs.task_done()
+
+    def submit(
+        self,
+        html: str,
+        clean_html: bool = True,
+        custom_instruction: str = None,
+        max_tokens: int = 4096,
+        temperature: float = 0.0,
+        soup: Any = None
+    ) -> Future:
+        """
+        Queue an HTML document for conversion.
+
+        Args:
+            html: HTML content to convert
+            clean_html: Whether to clean the HTML before conversion
+            custom_instruction: Optional custom instruction for the model
+            max_tokens: Maximum number of new tokens to generate
+            temperature: Temperature for generation (0.0 = deterministic)
+            soup: Already parsed HTML, reused if the converter falls back to rule-based conversion
+
+        Returns:
+            Future resolving to the Markdown string
+        """
+        self._ensure_worker()
+        future = Future()
+        kwargs = {
+            "html": html,
+            "clean_html": clean_html,
+            "custom_instruction": custom_instruction,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "soup": soup,
+        }
+        self.jobs.put((future, kwargs, time.time()))
+        return future
+
+    def convert(self, html: str, timeout: Optional[float] = MARKDOWN_CONVERSION_TIMEOUT, **kwargs) -> str:
+        """
+        Convert HTML to Markdown and wait for the result.
+
+        Args:
+            html: HTML content to convert
+            timeout: Maximum seconds to wait for the job (None waits indefinitely)
+            **kwargs: Conversion options accepted by submit()
+
+        Returns:
+            Markdown string
+        """
+        return self.submit(html, **kwargs).result(timeout=timeout)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting to be converted."""
+        return self.jobs.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get service statistics.
+
+        Returns:
+            Dictionary with queue depth, job counts, latencies in seconds, conversion cache and routing statistics
+        """
+        cache = getattr(self.converter, "cache", None)
+        router = getattr(self.converter, "router", None)
+        with self._lock:
+            completed = self.jobs_completed
+            return {
+                "queue_depth": self.queue_depth,
+                "jobs_completed": completed,
+                "jobs_failed": self.jobs_failed,
+                "average_wait_time": self.total_wait_time / completed if completed else 0.0,
+                "average_processing_time": self.total_processing_time / completed if completed else 0.0,
+                "last_job_latency": self.last_job_latency,
+                "model_loaded": bool(self.converter and self.converter.model),
+                "model_load_time": self.model_load_time,
+                "cache": cache.get_stats() if cache else None,
+                "routing": router.get_stats() if router else None,
+            }
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stop the worker thread after the queued jobs finish.
+
+        Args:
+            wait: Whether to block until the worker has stopped
+        """
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            worker = self._worker
+
+        if worker and worker.is_alive():
+            self.jobs.put(None)
+            if wait:
+                worker.join()
+
+
+def get_conversion_service() -> MarkdownConversionService:
+    """Get or create the process-wide conversion service."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = MarkdownConversionService()
+        return _service
+
+
+def get_conversion_stats() -> Optional[Dict[str, Any]]:
+    """Get the conversion service statistics, or None if the service has not been started."""
+    return _service.get_stats() if _service is not None else None
+
+
+def shutdown_conversion_service():
+    """Shut down the process-wide conversion service."""
+    global _service
+    with _service_lock:
+        if _service is not None:
+            logger.debug("Shutting down markdown conversion service")
+            _service.shutdown()
+            _service = None
+
+
+atexit.register(shutdown_conversion_service)
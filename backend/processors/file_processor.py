@@ -1,21 +1,210 @@
+import hashlib
 import logging
 import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Callable
+from typing import List, Dict, Any, Callable, Optional
+
+from config.settings import (
+    PARALLEL_MAX_WORKERS, PARALLEL_CHUNK_SIZE, PDF_PAGE_CACHE_ENABLED, PDF_PAGE_WORKERS, PDF_PAGES_PER_TASK,
+    PDF_PARALLEL_MIN_PAGES, JSON_STREAMING_MIN_BYTES
+)
+from processors.json_stream import JSON_ERRORS, file_events, object_events, write_json
+from processors.pdf_page_cache import get_pdf_page_cache
 
 logger = logging.getLogger(__name__)
 
+# Formats whose parsing is CPU-bound; other files are mostly I/O and are read in threads
+CPU_BOUND_EXTENSIONS = {".pdf", ".ipynb", ".json"}
+
+
+def _hash_pdf_object(obj, digest, memo: Dict[tuple, Optional[str]]):
+    """
+    Add a PDF object and everything it references to a digest.
+
+    Indirect objects are hashed once per document (memo), which also breaks
+    reference cycles; streams contribute their raw data.
+    """
+    if hasattr(obj, "idnum") and hasattr(obj, "get_object"):
+        key = (obj.idnum, obj.generation)
+        if key not in memo:
+            memo[key] = None
+            sub_digest = hashlib.sha256()
+            _hash_pdf_object(obj.get_object(), sub_digest, memo)
+            memo[key] = sub_digest.hexdigest()
+        digest.update((memo[key] or "cycle").encode())
+        return
+
+    if hasattr(obj, "get_data"):
+        digest.update(_raw_stream_data(obj))
+    if isinstance(obj, dict):
+        for key in sorted(obj, key=str):
+            if key == "/Parent":
+                continue
+            digest.update(str(key).encode())
+            # raw_get keeps references unresolved, so shared objects hit the memo
+            _hash_pdf_object(obj.raw_get(key) if hasattr(obj, "raw_get") else obj[key], digest, memo)
+    elif isinstance(obj, list):
+        for item in obj:
+            _hash_pdf_object(item, digest, memo)
+    elif not hasattr(obj, "get_data"):
+        digest.update(repr(obj).encode())
+
+
+def _raw_stream_data(stream) -> bytes:
+    """
+    Get the data of a PDF stream as stored in the file, without decoding it.
+
+    Together with the stream's /Filter entry this identifies the content, and
+    unlike get_data() it does not inflate images or parse content streams.
+    """
+    data = getattr(stream, "_data", None)
+    if data is None:
+        return stream.get_data()
+    return data if isinstance(data, bytes) else str(data).encode("utf-8", errors="surrogatepass")
+
+
+def _page_digest(page, memo: Dict[tuple, Optional[str]]) -> Optional[str]:
+    """
+    Hash everything the text of a PDF page depends on (None if it cannot be read).
+
+    Covers the content streams, the rotation and the resolved resources: fonts with
+    their encodings and ToUnicode maps, and XObjects. Streams are hashed as stored,
+    so digesting a scanned page does not decode its images.
+
+    Args:
+        page: PageObject of the page
+        memo: Digests of indirect objects already hashed in the same document
+    """
+    try:
+        digest = hashlib.sha256()
+        _hash_pdf_object(page.raw_get("/Contents") if "/Contents" in page else None, digest, memo)
+        digest.update(str(page.get("/Rotate", 0)).encode())
+        _hash_pdf_object(page.get("/Resources"), digest, memo)
+        return digest.hexdigest()
+    except Exception:
+        return None
+
+
+def _extract_pages(reader, pages: List[int], file_path) -> List[tuple]:
+    """
+    Extract the text of some pages of a PDF.
+
+    Args:
+        reader: PdfReader of the PDF
+        pages: Page numbers to extract
+        file_path: Path of the PDF, for log messages
+
+    Returns:
+        List of page numbers and their text (None for pages that failed)
+    """
+    extracted = []
+    for page in pages:
+        try:
+            extracted.append((page, reader.pages[page].extract_text() or ""))
+        except Exception as e:
+            logger.warning(f"Could not extract page {page + 1} of {file_path}: {e}")
+            extracted.append((page, None))
+    return extracted
+
+
+def _extract_page_range(file_path: str, pages: List[int]) -> List[tuple]:
+    """Extract the text of some pages of a PDF in a worker process."""
+    import PyPDF2
+
+    return _extract_pages(PyPDF2.PdfReader(file_path), pages, file_path)
+
+
+def _notebook_cells(events, include_outputs: bool = False):
+    """
+    Collect the cells of a notebook from a stream of JSON events.
+
+    Only cell types, sources and, if requested, text outputs are kept; images,
+    other rich outputs and attachments are skipped as they stream past.
+
+    Args:
+        events: Tuples of prefix, event and value of the notebook
+        include_outputs: Also collect the text outputs of code cells
+
+    Returns:
+        Tuple of the markdown cell sources, the code cell sources and the text
+        outputs of the code cells
+    """
+    output_prefixes = {
+        "cells.item.outputs.item.text", "cells.item.outputs.item.text.item",
+        "cells.item.outputs.item.data.text/plain", "cells.item.outputs.item.data.text/plain.item",
+    }
+    markdown_cells = []
+    code_cells = []
+    outputs = []
+    cell_type = ""
+    source = []
+    output = []
+
+    for prefix, event, value in events:
+        if prefix == "cells.item":
+            if event == "start_map":
+                cell_type, source, output = "", [], []
+            elif event == "end_map":
+                if cell_type == "markdown":
+                    markdown_cells.append("".join(source))
+                elif cell_type == "code":
+                    code_cells.append("".join(source))
+                    outputs.append("".join(output))
+        elif event != "string":
+            continue
+        elif prefix == "cells.item.cell_type":
+            cell_type = value
+        elif prefix in ("cells.item.source", "cells.item.source.item"):
+            source.append(value)
+        elif include_outputs and prefix in output_prefixes:
+            output.append(value)
+
+    return markdown_cells, code_cells, outputs
+
 
 class FileProcessor:
     """Process files from various sources."""
 
-    def process_file(self, file_data: Dict[str, Any]) -> Dict[str, Any]:
+    def __init__(
+        self,
+        page_cache=None,
+        include_outputs: bool = False,
+        drop_base64: bool = False,
+        keep_structured_data: Optional[bool] = None,
+    ):
+        """
+        Initialize the file processor.
+
+        Args:
+            page_cache: PDFPageCache for extracted PDF pages (None uses the shared cache when
+                PDF_PAGE_CACHE_ENABLED, False disables caching)
+            include_outputs: Include the text outputs of notebook code cells (images and other
+                rich outputs are always dropped)
+            drop_base64: Replace base64 data embedded in JSON files with a short placeholder
+            keep_structured_data: Return the parsed object of JSON files as "structured_data"
+                (None keeps it for files smaller than JSON_STREAMING_MIN_BYTES; larger files are
+                then streamed without it)
+        """
+        if page_cache is None and PDF_PAGE_CACHE_ENABLED:
+            page_cache = get_pdf_page_cache()
+        self.page_cache = page_cache or None
+        self.include_outputs = include_outputs
+        self.drop_base64 = drop_base64
+        self.keep_structured_data = keep_structured_data
+
+    def process_file(self, file_data: Dict[str, Any], page_executor=None) -> Dict[str, Any]:
         """
         Process a single file from a repository.
 
         Args:
             file_data: Dictionary containing file information
+            page_executor: Process pool PDF pages are extracted in (None starts one for large PDFs)
 
         Returns:
             Dictionary with processed text and metadata
@@ -51,7 +240,7 @@ class FileProcessor:
             elif extension == ".ipynb":
                 return self.process_notebook(local_path, file_data)
             elif extension == ".pdf":
-                return self.process_pdf(local_path, file_data)
+                return self.process_pdf(local_path, file_data, page_executor=page_executor)
             else:
                 # Default to text processing
                 file_text = local_path.read_text(encoding="utf-8", errors="replace")
@@ -67,29 +256,140 @@ class FileProcessor:
     def process_files(
         self,
         file_data_list: List[Dict[str, Any]],
-        max_workers: int = 4,
+        max_workers: Optional[int] = None,
         progress_callback: Callable = None,
+        ordered: bool = True,
+        chunk_size: int = PARALLEL_CHUNK_SIZE,
+        use_processes: bool = True,
     ) -> List[Dict[str, Any]]:
         """
         Process multiple files in parallel.
 
+        Notebooks and JSON files are parsed in a process pool, submitted in chunks;
+        the pages of PDFs are extracted in the same pool, so one large PDF is spread
+        over every worker. Other files are read in a thread pool. A file that fails,
+        or whose worker fails, gets a result with an "error" entry instead of
+        aborting the batch.
+
         Args:
             file_data_list: List of file data dictionaries
-            max_workers: Maximum number of parallel workers
-            progress_callback: Callback function to report progress
+            max_workers: Maximum number of parallel workers (defaults to PARALLEL_MAX_WORKERS,
+                or the CPU count - 1)
+            progress_callback: Callback function to report progress, called with the number
+                of processed files and the total
+            ordered: Return results in the order of file_data_list (False returns them
+                in completion order)
+            chunk_size: Maximum number of files sent to a worker process at once
+            use_processes: Use a process pool for CPU-bound files (False uses threads only)
 
         Returns:
             List of dictionaries with processed text and metadata
         """
-        logger.info(f"Processing {len(file_data_list)} files")
+        total = len(file_data_list)
+        if max_workers is None:
+            max_workers = PARALLEL_MAX_WORKERS or max(1, (os.cpu_count() or 1) - 1)
 
-        # Process files sequentially to avoid parallel processing complexities
-        results = []
-        for i, file_data in enumerate(file_data_list):
-            results.append(self.process_file(file_data))
-            if progress_callback:
-                progress_callback(i + 1, len(file_data_list))
+        # Starting worker processes only pays off with several CPU-bound files
+        cpu_bound = []
+        if use_processes and max_workers > 1:
+            cpu_bound = [index for index, file_data in enumerate(file_data_list) if self._is_cpu_bound(file_data)]
+            if len(cpu_bound) < 2:
+                cpu_bound = []
+        # PDFs are opened in a thread and only their pages are sent to the worker processes
+        pdfs = [index for index in cpu_bound if self._is_pdf(file_data_list[index])]
+        in_process = set(cpu_bound) - set(pdfs)
+        cpu_bound = [index for index in cpu_bound if index in in_process]
+        threaded = [index for index in range(total) if index not in in_process and index not in pdfs]
+
+        logger.info(
+            f"Processing {total} files with {max_workers} workers "
+            f"({len(cpu_bound)} in worker processes, {len(pdfs)} PDFs by page, {len(threaded)} in threads)"
+        )
+
+        # Small chunks keep every worker busy; large ones cut the inter-process overhead
+        chunk_size = max(1, min(chunk_size, -(-len(cpu_bound) // max_workers)))
+        chunks = [cpu_bound[start:start + chunk_size] for start in range(0, len(cpu_bound), chunk_size)]
+
+        results = [None] * total if ordered else []
+        processed = 0
+        process_pool = (
+            # Spawned workers do not inherit the caller's threads and locks
+            ProcessPoolExecutor(max_workers=max_workers if pdfs else min(max_workers, len(chunks)),
+                                mp_context=multiprocessing.get_context("spawn"))
+            if chunks or pdfs else nullcontext()
+        )
+        with ThreadPoolExecutor(max_workers=max_workers) as thread_pool, process_pool:
+            futures = {
+                thread_pool.submit(self._process_batch, [file_data_list[index]]): [index]
+                for index in threaded
+            }
+            for index in pdfs:
+                futures[thread_pool.submit(self._process_batch, [file_data_list[index]], process_pool)] = [index]
+            for chunk in chunks:
+                futures[process_pool.submit(self._process_batch, [file_data_list[index] for index in chunk])] = chunk
+
+            for future in as_completed(futures):
+                indexes = futures[future]
+                try:
+                    batch_results = future.result()
+                except Exception as e:
+                    # The worker itself failed (e.g. it crashed or the data could not be sent to it)
+                    logger.error(f"Worker failed processing {len(indexes)} files: {e}")
+                    batch_results = [
+                        self._error_result(file_data_list[index], f"Worker failed: {str(e)}") for index in indexes
+                    ]
+
+                for index, result in zip(indexes, batch_results):
+                    if ordered:
+                        results[index] = result
+                    else:
+                        results.append(result)
+                processed += len(indexes)
+                if progress_callback:
+                    progress_callback(processed, total)
+
+        return results
+
+    @staticmethod
+    def _is_cpu_bound(file_data: Dict[str, Any]) -> bool:
+        """Check whether a file is parsed in a worker process."""
+        local_path = file_data.get("local_path")
+        return isinstance(local_path, (str, Path)) and Path(local_path).suffix.lower() in CPU_BOUND_EXTENSIONS
+
+    @staticmethod
+    def _is_pdf(file_data: Dict[str, Any]) -> bool:
+        """Check whether a file is a PDF."""
+        return Path(file_data["local_path"]).suffix.lower() == ".pdf"
+
+    @staticmethod
+    def _error_result(file_data: Dict[str, Any], error_msg: str) -> Dict[str, Any]:
+        """Build the result of a file that could not be processed."""
+        return {"metadata": dict(file_data), "error": error_msg}
 
+    def _process_batch(self, file_data_list: List[Dict[str, Any]], page_executor=None) -> List[Dict[str, Any]]:
+        """
+        Process files one by one, isolating errors per file.
+
+        Runs in worker threads and processes.
+
+        Args:
+            file_data_list: List of file data dictionaries
+            page_executor: Process pool PDF pages are extracted in
+
+        Returns:
+            List of dictionaries with processed text and metadata
+        """
+        results = []
+        for file_data in file_data_list:
+            try:
+                if page_executor is not None:
+                    results.append(self.process_file(file_data, page_executor=page_executor))
+                else:
+                    results.append(self.process_file(file_data))
+            except Exception as e:
+                error_msg = f"Error processing file {file_data.get('path', 'unknown')}: {str(e)}"
+                logger.error(error_msg)
+                results.append(self._error_result(file_data, error_msg))
         return results
 
     def process_markdown(
@@ -101,19 +401,39 @@ class FileProcessor:
         result["metadata"]["format"] = "markdown"
         return result
 
+    @staticmethod
+    def _is_large(file_path: Path) -> bool:
+        """Check whether a file is large enough to be parsed incrementally."""
+        try:
+            return file_path.stat().st_size >= JSON_STREAMING_MIN_BYTES
+        except OSError:
+            return False
+
     def process_json(
         self, file_path: Path, file_data: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Process JSON files."""
+        """
+        Process JSON files.
+
+        Large files are streamed into their indented text without keeping the
+        parsed object, unless keep_structured_data is set.
+        """
         result = {"metadata": file_data.copy()}
         try:
-            content = json.loads(
-                file_path.read_text(encoding="utf-8", errors="replace")
-            )
-            result["text"] = json.dumps(content, indent=2)
-            result["structured_data"] = content
+            if self._is_large(file_path) and not self.keep_structured_data:
+                result["text"] = write_json(file_events(file_path), self.drop_base64)
+            else:
+                content = json.loads(
+                    file_path.read_text(encoding="utf-8", errors="replace")
+                )
+                if self.drop_base64:
+                    result["text"] = write_json(object_events(content), drop_base64=True)
+                else:
+                    result["text"] = json.dumps(content, indent=2)
+                if self.keep_structured_data is not False:
+                    result["structured_data"] = content
             result["metadata"]["format"] = "json"
-        except json.JSONDecodeError as e:
+        except JSON_ERRORS as e:
             result["text"] = file_path.read_text(encoding="utf-8", errors="replace")
             result["error"] = f"Invalid JSON: {str(e)}"
         return result
@@ -121,35 +441,41 @@ class FileProcessor:
     def process_notebook(
         self, file_path: Path, file_data: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Process Jupyter notebook files."""
+        """
+        Process Jupyter notebook files.
+
+        Large notebooks are streamed cell by cell, so outputs and attachments
+        are never held in memory as a whole.
+        """
         result = {"metadata": file_data.copy()}
         try:
-            notebook = json.loads(
-                file_path.read_text(encoding="utf-8", errors="replace")
-            )
+            if self._is_large(file_path):
+                events = file_events(file_path)
+            else:
+                events = object_events(json.loads(
+                    file_path.read_text(encoding="utf-8", errors="replace")
+                ))
 
             # Extract cells content
-            markdown_cells = []
-            code_cells = []
-
-            for cell in notebook.get("cells", []):
-                cell_type = cell.get("cell_type", "")
-                source = "".join(cell.get("source", []))
+            markdown_cells, code_cells, outputs = _notebook_cells(events, self.include_outputs)
 
-                if cell_type == "markdown":
-                    markdown_cells.append(source)
-                elif cell_type == "code":
-                    code_cells.append(source)
-
-            # Combine content
+            # Combine content, each code cell followed by its output
+            code_texts = code_cells
+            if self.include_outputs:
+                code_texts = [
+                    f"{code}\n\n{output}" if output else code
+                    for code, output in zip(code_cells, outputs)
+                ]
             combined_text = (
-                "\n\n".join(markdown_cells) + "\n\n" + "\n\n".join(code_cells)
+                "\n\n".join(markdown_cells) + "\n\n" + "\n\n".join(code_texts)
             )
             result["text"] = combined_text
             result["cells"] = {"markdown": markdown_cells, "code": code_cells}
+            if self.include_outputs:
+                result["cells"]["outputs"] = outputs
             result["metadata"]["format"] = "notebook"
 
-        except json.JSONDecodeError as e:
+        except JSON_ERRORS as e:
             result["text"] = file_path.read_text(encoding="utf-8", errors="replace")
             result["error"] = f"Invalid notebook JSON: {str(e)}"
         except Exception as e:
@@ -157,25 +483,69 @@ class FileProcessor:
 
         return result
 
-    def process_pdf(self, file_path: Path, file_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process PDF files."""
+    def process_pdf(self, file_path: Path, file_data: Dict[str, Any], page_executor=None) -> Dict[str, Any]:
+        """
+        Process PDF files.
+
+        Pages already in the page cache are not extracted again. The remaining
+        pages of large PDFs are extracted in parallel worker processes, in
+        ranges of PDF_PAGES_PER_TASK pages.
+
+        Args:
+            file_path: Path of the PDF
+            file_data: Dictionary containing file information
+            page_executor: Process pool to extract pages in (None starts one when at least
+                PDF_PARALLEL_MIN_PAGES pages need extracting)
+
+        Returns:
+            Dictionary with the text of the pages and metadata, including the page count
+            and the extraction time
+        """
         result = {"metadata": file_data.copy()}
         try:
             # Import here to avoid dependency if not needed
             try:
                 import PyPDF2
                 
-                # Extract text from PDF using PyPDF2
-                text_parts = []
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page_num in range(len(pdf_reader.pages)):
-                        page = pdf_reader.pages[page_num]
-                        text_parts.append(page.extract_text())
+                start = time.perf_counter()
+                reader = PyPDF2.PdfReader(str(file_path))
+                page_count = len(reader.pages)
+                
+                # Reuse cached pages: by file hash, then by page content for earlier
+                # versions of the same document
+                texts = {}
+                content_hashes = {}
+                if self.page_cache is not None:
+                    file_hash = self.page_cache.file_hash(file_path)
+                    source = self._pdf_source(file_path, file_data)
+                    texts = self.page_cache.get_pages(file_hash)
+                    missing = [page for page in range(page_count) if page not in texts]
+                    if missing:
+                        memo = {}
+                        content_hashes = {page: _page_digest(reader.pages[page], memo) for page in missing}
+                        texts.update(self.page_cache.find_by_content(
+                            {page: digest for page, digest in content_hashes.items() if digest}, source
+                        ))
+                cached_pages = len(texts)
+                
+                missing = [page for page in range(page_count) if page not in texts]
+                extracted = self._extract_pdf_pages(file_path, reader, missing, page_executor)
+                failed = [page for page, text in extracted.items() if text is None]
                 
-                result["text"] = "\n\n".join(text_parts)
+                if self.page_cache is not None and content_hashes:
+                    self.page_cache.put_pages(file_hash, [
+                        (page, content_hashes[page], texts.get(page, extracted.get(page)))
+                        for page in content_hashes if page not in failed
+                    ], source)
+                texts.update(extracted)
+                
+                result["text"] = "\n\n".join(texts[page] or "" for page in range(page_count))
                 result["metadata"]["format"] = "pdf"
-                result["metadata"]["page_count"] = len(pdf_reader.pages)
+                result["metadata"]["page_count"] = page_count
+                result["metadata"]["cached_pages"] = cached_pages
+                result["metadata"]["extraction_seconds"] = time.perf_counter() - start
+                if failed:
+                    result["metadata"]["failed_pages"] = [page + 1 for page in sorted(failed)]
                 
             except ImportError:
                 # Fallback if PyPDF2 is not installed
@@ -189,3 +559,56 @@ class FileProcessor:
             result["pdf_path"] = str(file_path)  # Still include the path for potential direct access
             
         return result
+
+    @staticmethod
+    def _pdf_source(file_path: Path, file_data: Dict[str, Any]) -> str:
+        """Identify the document a PDF is a version of: its URL, repository path or local path."""
+        if file_data.get("url"):
+            return file_data["url"]
+        if file_data.get("path"):
+            return f"{file_data.get('repo', '')}:{file_data['path']}"
+        return str(Path(file_path).resolve())
+
+    def _extract_pdf_pages(self, file_path: Path, reader, pages: List[int], page_executor=None) -> Dict[int, Any]:
+        """
+        Extract the text of PDF pages, in parallel for large PDFs.
+
+        Args:
+            file_path: Path of the PDF
+            reader: PdfReader of the PDF, used for small extractions
+            pages: Page numbers to extract
+            page_executor: Process pool to extract pages in
+
+        Returns:
+            Dictionary mapping page numbers to their text (None for pages that failed)
+        """
+        workers = PDF_PAGE_WORKERS or os.cpu_count() or 1
+        if page_executor is None and (len(pages) < PDF_PARALLEL_MIN_PAGES or workers < 2):
+            return dict(_extract_pages(reader, pages, file_path))
+
+        ranges = [pages[start:start + PDF_PAGES_PER_TASK] for start in range(0, len(pages), PDF_PAGES_PER_TASK)]
+        own_executor = None
+        if page_executor is None:
+            own_executor = page_executor = ProcessPoolExecutor(
+                max_workers=min(workers, len(ranges)), mp_context=multiprocessing.get_context("spawn")
+            )
+        
+        extracted = {}
+        try:
+            futures = {
+                page_executor.submit(_extract_page_range, str(file_path), page_range): page_range
+                for page_range in ranges
+            }
+            for future in as_completed(futures):
+                try:
+                    extracted.update(future.result())
+                except Exception as e:
+                    page_range = futures[future]
+                    logger.error(f"Could not extract pages {page_range[0] + 1}-{page_range[-1] + 1} of {file_path}: {e}")
+                    extracted.update((page, None) for page in page_range)
+        finally:
+            if own_executor is not None:
+                own_executor.shutdown()
+        
+        logger.info(f"Extracted {len(pages)} pages of {file_path} in {len(ranges)} ranges")
+        return extracted
@@ -0,0 +1,140 @@
+import json
+import logging
+import re
+from typing import Any, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ijson is optional; it parses JSON incrementally, so large files are never
+# held in memory as a whole
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    IJSON_AVAILABLE = False
+    JSON_ERRORS = (json.JSONDecodeError,)
+
+# Strings at least this long that look like base64 are treated as embedded binary data
+BASE64_MIN_LENGTH = 256
+
+# Base64 may be wrapped into lines, but never contains spaces
+_BASE64 = re.compile(r"(?:data:[\w/+.-]+;base64,)?[A-Za-z0-9+/=\r\n]+")
+
+
+def is_base64(value: str) -> bool:
+    """
+    Check whether a string looks like embedded base64 data (e.g. an image).
+
+    Args:
+        value: String value from a JSON document
+
+    Returns:
+        True for long base64 strings and base64 data URIs
+    """
+    return len(value) >= BASE64_MIN_LENGTH and _BASE64.fullmatch(value) is not None
+
+
+def object_events(value: Any, prefix: str = "") -> Iterator[Tuple[str, str, Any]]:
+    """
+    Generate ijson.parse() style events from an already parsed JSON value.
+
+    Args:
+        value: Parsed JSON value
+        prefix: Path of the value ("" for the document)
+
+    Yields:
+        Tuples of prefix, event and value
+    """
+    if isinstance(value, dict):
+        yield prefix, "start_map", None
+        for key, item in value.items():
+            yield prefix, "map_key", key
+            yield from object_events(item, f"{prefix}.{key}" if prefix else key)
+        yield prefix, "end_map", None
+    elif isinstance(value, list):
+        yield prefix, "start_array", None
+        item_prefix = f"{prefix}.item" if prefix else "item"
+        for item in value:
+            yield from object_events(item, item_prefix)
+        yield prefix, "end_array", None
+    elif value is None:
+        yield prefix, "null", None
+    elif isinstance(value, bool):
+        yield prefix, "boolean", value
+    elif isinstance(value, str):
+        yield prefix, "string", value
+    else:
+        yield prefix, "number", value
+
+
+def file_events(file_path) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Parse a JSON file into a stream of events.
+
+    Uses ijson when installed, so memory stays bounded by the largest single
+    value; otherwise the file is parsed in memory.
+
+    Args:
+        file_path: Path of the JSON file
+
+    Yields:
+        Tuples of prefix, event and value, as produced by ijson.parse()
+
+    Raises:
+        One of JSON_ERRORS if the file is not valid JSON
+    """
+    if IJSON_AVAILABLE:
+        with open(file_path, "rb") as file:
+            yield from ijson.parse(file, use_float=True)
+    else:
+        logger.debug(f"ijson not installed, parsing {file_path} in memory")
+        with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+            value = json.load(file)
+        yield from object_events(value)
+
+
+def write_json(events: Iterator[Tuple[str, str, Any]], drop_base64: bool = False) -> str:
+    """
+    Serialize a stream of events as indented JSON, like json.dumps(value, indent=2).
+
+    Args:
+        events: Tuples of prefix, event and value
+        drop_base64: Replace embedded base64 data with a short placeholder
+
+    Returns:
+        JSON text
+    """
+    parts = []
+    # Open containers: [is_map, number of entries written]
+    stack = []
+    after_key = False
+
+    for _, event, value in events:
+        if event == "map_key":
+            parts.append(("," if stack[-1][1] else "") + "\n" + "  " * len(stack) + json.dumps(value) + ": ")
+            stack[-1][1] += 1
+            after_key = True
+            continue
+
+        if event in ("end_map", "end_array"):
+            is_map, count = stack.pop()
+            parts.append(("\n" + "  " * len(stack) if count else "") + ("}" if is_map else "]"))
+            continue
+
+        # A value: array items start on their own line
+        if stack and not after_key:
+            parts.append(("," if stack[-1][1] else "") + "\n" + "  " * len(stack))
+            stack[-1][1] += 1
+        after_key = False
+
+        if event in ("start_map", "start_array"):
+            parts.append("{" if event == "start_map" else "[")
+            stack.append([event == "start_map", 0])
+        elif event == "string" and drop_base64 and is_base64(value):
+            parts.append(json.dumps(f"[base64 data: {len(value)} characters]"))
+        else:
+            parts.append(json.dumps(value))
+
+    return "".join(parts)
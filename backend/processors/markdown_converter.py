@@ -1,10 +1,17 @@
 import logging
 import re
 import os
+import time
 from typing import Optional, Dict, Any, Union
 from pathlib import Path
 import importlib
 
+from config.settings import (
+    MARKDOWN_BATCH_SIZE, MARKDOWN_MAX_NEW_TOKENS, MARKDOWN_CHUNK_TOKENS, MARKDOWN_CACHE_ENABLED,
+    MARKDOWN_QUANTIZE, MARKDOWN_NUM_THREADS, MARKDOWN_ROUTING_ENABLED
+)
+from processors.conversion_router import ConversionRouter, HEURISTIC, MODEL
+
 logger = logging.getLogger(__name__)
 
 # HTML cleaning patterns
@@ -16,24 +23,81 @@ LINK_PATTERN = r"<[ ]*link.*?>"
 BASE64_IMG_PATTERN = r'<img[^>]+src="data:image/[^;]+;base64,[^"]+"[^>]*>'
 SVG_PATTERN = r"(<svg[^>]*>)(.*?)(<\/svg>)"
 
+# Single-pass cleaner: one scan finds the start of every construct clean_html handles,
+# and only the matched constructs are searched for their end
+# (the lookahead rejects most other tags on their first character, which keeps the scan fast)
+_CLEAN_CANDIDATE = re.compile(r"<(?=[ sSmMlL!iI])[ ]*(?:(script|style)|(meta|link)|(!--)|(svg)|(img))", re.IGNORECASE)
+_CLOSING_TAG = {
+    "script": re.compile(r"/[ ]*script[ ]*>", re.IGNORECASE),
+    "style": re.compile(r"/[ ]*style[ ]*>", re.IGNORECASE),
+}
+_COMMENT_END = re.compile(r"--[ ]*>")
+_BASE64_IMG_REGEX = re.compile(BASE64_IMG_PATTERN)
+_SVG_REGEX = re.compile(SVG_PATTERN, re.DOTALL)
+
+# Split points for long pages, tried in order: sections and headings, then block elements
+CHUNK_BOUNDARIES = [
+    re.compile(r"(?=<(?:h[1-6]|section|article|hr)\b)", re.IGNORECASE),
+    re.compile(r"(?=<(?:p|div|li|tr|pre|table|ul|ol|dl|blockquote|figure)\b)", re.IGNORECASE),
+]
+
+
+def _length_buckets(lengths, batch_size):
+    """
+    Group items into batches of similar length.
+    
+    Args:
+        lengths: Token length of each item
+        batch_size: Maximum number of items per batch
+        
+    Returns:
+        List of batches, each a list of item indices, shortest items first
+    """
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index])
+    return [order[start:start + batch_size] for start in range(0, len(order), max(1, batch_size))]
+
 
 class HTMLMarkdownConverter:
     """
     Converter for HTML to Markdown using the ReaderLM-v2 model from Jina AI.
     """
 
-    def __init__(self, model_path: str = "jinaai/ReaderLM-v2", device: str = None):
+    def __init__(
+        self,
+        model_path: str = "jinaai/ReaderLM-v2",
+        device: str = None,
+        cache=None,
+        quantize: bool = MARKDOWN_QUANTIZE,
+        num_threads: Optional[int] = MARKDOWN_NUM_THREADS,
+        router=None
+    ):
         """
         Initialize the HTML to Markdown converter.
         
         Args:
             model_path: Path or name of the model to use (default: jinaai/ReaderLM-v2)
             device: Device to run the model on ('cuda' or 'cpu', defaults to CUDA if available)
+            cache: ConversionCache for model conversions (defaults to the shared cache
+                when MARKDOWN_CACHE_ENABLED is set; False disables caching)
+            quantize: Whether to quantize the model's linear layers to int8 when running on CPU
+            num_threads: Number of CPU threads used for inference (None keeps the torch default)
+            router: ConversionRouter that sends simple pages to the rule-based converter
+                (created when MARKDOWN_ROUTING_ENABLED is set; False sends every page to the model)
         """
         self.model_path = model_path
         self.device = device or self._get_default_device()
+        self.quantize = quantize
+        self.num_threads = num_threads
+        if cache is None and MARKDOWN_CACHE_ENABLED:
+            from processors.conversion_cache import get_conversion_cache
+            cache = get_conversion_cache()
+        self.cache = cache
+        if router is None and MARKDOWN_ROUTING_ENABLED:
+            router = ConversionRouter()
+        self.router = router
         self.model = None
         self.tokenizer = None
+        self.load_attempted = False  # A failed load is not retried for every document
         
         # Check if transformers is installed
         try:
@@ -58,6 +122,8 @@ class HTMLMarkdownConverter:
         Returns:
             bool: Whether the model was loaded successfully
         """
+        self.load_attempted = True
+        
         if not self.transformers_available:
             logger.error("Cannot load model: transformers package not installed")
             return False
@@ -68,6 +134,12 @@ class HTMLMarkdownConverter:
             logger.info(f"Loading ReaderLM-v2 model on {self.device}...")
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_path)
             self.model = AutoModelForCausalLM.from_pretrained(self.model_path).to(self.device)
+            self._configure_cpu_inference()
+            
+            # Decoder-only models continue from the last position, so batches are padded on the left
+            self.tokenizer.padding_side = "left"
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
             
             logger.info("Model loaded successfully")
             return True
@@ -76,6 +148,33 @@ class HTMLMarkdownConverter:
             logger.error(f"Failed to load model: {e}")
             return False
     
+    @property
+    def model_id(self) -> str:
+        """Identifier of the model variant, which distinguishes quantized conversions."""
+        return f"{self.model_path}:int8" if self.quantize and self.device == "cpu" else self.model_path
+    
+    def _configure_cpu_inference(self):
+        """Apply the CPU thread count and dynamic int8 quantization to the loaded model."""
+        if self.device != "cpu":
+            if self.quantize:
+                logger.warning(f"int8 quantization is only supported on CPU; running in full precision on {self.device}")
+            return
+        
+        import torch
+        
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        
+        if self.quantize:
+            try:
+                from torch.ao.quantization import quantize_dynamic
+            except ImportError:
+                from torch.quantization import quantize_dynamic
+            
+            # Weights of linear layers are stored as int8; activations are quantized on the fly
+            self.model = quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info(f"Quantized linear layers to int8 ({torch.get_num_threads()} threads)")
+    
     def clean_html(self, html: str, clean_svg: bool = True, clean_base64: bool = True) -> str:
         """
         Clean HTML content by removing scripts, styles, comments, etc.
@@ -88,30 +187,54 @@ class HTMLMarkdownConverter:
         Returns:
             Cleaned HTML string
         """
-        # Remove scripts
-        html = re.sub(SCRIPT_PATTERN, "", html, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL)
-        
-        # Remove styles
-        html = re.sub(STYLE_PATTERN, "", html, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL)
-        
-        # Remove meta tags
-        html = re.sub(META_PATTERN, "", html, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL)
-        
-        # Remove comments
-        html = re.sub(COMMENT_PATTERN, "", html, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL)
-        
-        # Remove link tags
-        html = re.sub(LINK_PATTERN, "", html, flags=re.IGNORECASE | re.MULTILINE | re.DOTALL)
-        
-        # Clean SVG content if requested
-        if clean_svg:
-            html = self.replace_svg(html)
-        
-        # Clean base64 images if requested
-        if clean_base64:
-            html = self.replace_base64_images(html)
+        # Scripts, styles, meta and link tags and comments are removed, and SVG
+        # content and base64 images replaced, in a single scan of the document
+        parts = []
+        position = 0  # End of the text already copied to parts
+        search_from = 0
+        while True:
+            match = _CLEAN_CANDIDATE.search(html, search_from)
+            if not match:
+                break
+            start = match.start()
+            kind = match.lastindex
+            end = None
+            replacement = ""
+            
+            if kind == 1:
+                # Script or style element, up to its closing tag
+                closing = _CLOSING_TAG[match.group(1).lower()].search(html, match.end())
+                end = closing.end() if closing else None
+            elif kind == 2:
+                # Meta or link tag
+                close = html.find(">", match.end())
+                end = close + 1 if close != -1 else None
+            elif kind == 3:
+                closing = _COMMENT_END.search(html, match.end())
+                end = closing.end() if closing else None
+            elif kind == 4 and clean_svg and html.startswith("<svg", start):
+                open_end = html.find(">", start)
+                close = html.find("</svg>", open_end) if open_end != -1 else -1
+                if close != -1:
+                    end = close + len("</svg>")
+                    replacement = f"{html[start:open_end + 1]}this is a placeholder</svg>"
+            elif kind == 5 and clean_base64:
+                image = _BASE64_IMG_REGEX.match(html, start)
+                if image:
+                    end = image.end()
+                    replacement = '<img src="#"/>'
+            
+            if end is None:
+                search_from = match.end()
+                continue
+            parts.append(html[position:start])
+            parts.append(replacement)
+            position = search_from = end
         
-        return html
+        if not parts:
+            return html
+        parts.append(html[position:])
+        return "".join(parts)
     
     def replace_svg(self, html: str, new_content: str = "this is a placeholder") -> str:
         """
@@ -124,12 +247,7 @@ class HTMLMarkdownConverter:
         Returns:
             HTML with SVG content replaced
         """
-        return re.sub(
-            SVG_PATTERN,
-            lambda match: f"{match.group(1)}{new_content}{match.group(3)}",
-            html,
-            flags=re.DOTALL
-        )
+        return _SVG_REGEX.sub(lambda match: f"{match.group(1)}{new_content}{match.group(3)}", html)
     
     def replace_base64_images(self, html: str, new_image_src: str = "#") -> str:
         """
@@ -142,7 +260,7 @@ class HTMLMarkdownConverter:
         Returns:
             HTML with base64 images replaced
         """
-        return re.sub(BASE64_IMG_PATTERN, f'<img src="{new_image_src}"/>', html)
+        return _BASE64_IMG_REGEX.sub(f'<img src="{new_image_src}"/>', html)
     
     def create_prompt(self, html: str, instruction: str = None, schema: str = None) -> str:
         """
@@ -179,13 +297,48 @@ class HTMLMarkdownConverter:
             messages, tokenize=False, add_generation_prompt=True
         )
     
+    def _generate(self, prompts: list, max_tokens: int, temperature: float) -> list:
+        """
+        Run the model on a batch of prompts.
+        
+        Args:
+            prompts: Formatted prompts, ideally of similar token length
+            max_tokens: Maximum number of new tokens to generate per prompt
+            temperature: Temperature for generation (0.0 = deterministic)
+            
+        Returns:
+            List with the model's response to each prompt
+        """
+        import torch
+        
+        # Pad to the longest prompt; the attention mask hides the padding from the model
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True).to(self.device)
+        
+        with torch.no_grad():
+            outputs = self.model.generate(
+                inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                max_new_tokens=max_tokens,
+                temperature=temperature,
+                do_sample=(temperature > 0),
+                repetition_penalty=1.08,
+                pad_token_id=self.tokenizer.pad_token_id
+            )
+        
+        # Decode only the generated tokens, which follow the padded prompt
+        generated = outputs[:, inputs["input_ids"].shape[1]:]
+        texts = self.tokenizer.batch_decode(generated, skip_special_tokens=True)
+        return [text.split("[/INST]")[-1].strip() for text in texts]
+    
     def html_to_markdown(
         self, 
         html: str, 
         clean_html: bool = True, 
         custom_instruction: str = None, 
         max_tokens: int = 4096,
-        temperature: float = 0.0
+        temperature: float = 0.0,
+        soup: Any = None,
+        chunk_tokens: int = MARKDOWN_CHUNK_TOKENS
     ) -> str:
         """
         Convert HTML to Markdown using the ReaderLM-v2 model.
@@ -194,113 +347,231 @@ class HTMLMarkdownConverter:
             html: HTML content to convert
             clean_html: Whether to clean the HTML before conversion
             custom_instruction: Optional custom instruction for the model
-            max_tokens: Maximum number of new tokens to generate
+            max_tokens: Maximum number of new tokens to generate (per chunk for long pages)
             temperature: Temperature for generation (0.0 = deterministic)
+            soup: Already parsed HTML, used by the fallback method instead of parsing again
+            chunk_tokens: Token budget of the HTML in one model call; longer pages are
+                split at section and heading boundaries and converted chunk by chunk
             
         Returns:
             Markdown string
         """
+        # Clean the HTML if requested
+        cleaned = self.clean_html(html) if clean_html else html
+        
+        # Simple pages are converted by the rules; custom instructions always need the model
+        if self.router and not custom_instruction:
+            start_time = time.time()
+            if self.router.route(cleaned) == HEURISTIC:
+                markdown = self._fallback_html_to_markdown(html, soup=soup)
+                self.router.record(HEURISTIC, time.time() - start_time, len(cleaned))
+                return markdown
+        
+        # Reuse an earlier conversion of the same content before touching the model
+        cache_key = self._cache_key(cleaned, custom_instruction, max_tokens, temperature, chunk_tokens)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
         if not self.model or not self.tokenizer:
+            if self.load_attempted:
+                return self._fallback_html_to_markdown(html, soup=soup)
+            
             loaded = self.load_model()
             if not loaded:
                 logger.error("Failed to load model. Using fallback method.")
-                return self._fallback_html_to_markdown(html)
+                return self._fallback_html_to_markdown(html, soup=soup)
         
         try:
-            import torch
-            
-            # Clean the HTML if requested
-            if clean_html:
-                html = self.clean_html(html)
-            
-            # Create the prompt
-            input_prompt = self.create_prompt(html, instruction=custom_instruction)
-            
-            # Encode the prompt
-            inputs = self.tokenizer.encode(input_prompt, return_tensors="pt").to(self.device)
-            
-            # Generate the markdown
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs,
-                    max_new_tokens=max_tokens,
-                    temperature=temperature,
-                    do_sample=(temperature > 0),
-                    repetition_penalty=1.08
-                )
-            
-            # Decode the output
-            output_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
-            # Extract just the assistant's response
-            # This removes the input prompt from the response
-            assistant_response = output_text.split("[/INST]")[-1].strip()
-            
-            return assistant_response
+            # Generate the markdown, chunk by chunk for long pages
+            start_time = time.time()
+            markdown = self._convert_with_model(
+                [cleaned], custom_instruction, max_tokens, temperature, MARKDOWN_BATCH_SIZE, chunk_tokens
+            )[0]
+            if markdown is None:
+                raise RuntimeError("model generation failed")
+            if self.router:
+                self.router.record(MODEL, time.time() - start_time, len(cleaned))
+            if cache_key:
+                self.cache.put(cache_key, markdown)
+            return markdown
             
         except Exception as e:
             logger.error(f"Error converting HTML to Markdown with model: {e}")
             logger.info("Falling back to basic HTML to Markdown conversion")
-            return self._fallback_html_to_markdown(html)
+            return self._fallback_html_to_markdown(html, soup=soup)
     
-    def _fallback_html_to_markdown(self, html: str) -> str:
+    def _cache_key(
+        self, html: str, instruction: Optional[str], max_tokens: int, temperature: float, chunk_tokens: int
+    ) -> Optional[str]:
         """
-        Fallback method to convert HTML to Markdown using BeautifulSoup if the model fails.
+        Get the conversion cache key of a model conversion.
+        
+        Returns:
+            Cache key, or None if caching is disabled or the output is sampled (temperature > 0)
+        """
+        if not self.cache or temperature > 0:
+            return None
+        params = {"max_tokens": max_tokens, "temperature": temperature, "chunk_tokens": chunk_tokens}
+        return self.cache.make_key(html, instruction, self.model_id, params)
+    
+    def _count_tokens(self, texts: list) -> list:
+        """Count the tokens of each text (estimated from its length without a tokenizer)."""
+        if not texts:
+            return []
+        if not self.tokenizer:
+            return [len(text) // 4 + 1 for text in texts]
+        return [len(input_ids) for input_ids in self.tokenizer(texts)["input_ids"]]
+    
+    def split_html(self, html: str, max_tokens: int = MARKDOWN_CHUNK_TOKENS) -> list:
+        """
+        Split HTML into pieces of at most max_tokens tokens.
+        
+        Pages are split before sections and headings first, and only pieces
+        that are still too long are split again before block elements and,
+        as a last resort, at tag or word boundaries.
+        
+        Args:
+            html: Cleaned HTML content
+            max_tokens: Token budget of each piece
+            
+        Returns:
+            List of HTML pieces in document order
+        """
+        if self._count_tokens([html])[0] <= max_tokens:
+            return [html]
+        
+        chunks = []
+        current = []
+        current_tokens = 0
+        for segment, tokens in self._split_segments(html, max_tokens, CHUNK_BOUNDARIES):
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append("".join(current))
+                current = []
+                current_tokens = 0
+            current.append(segment)
+            current_tokens += tokens
+        if current:
+            chunks.append("".join(current))
+        return chunks
+    
+    def _split_segments(self, html: str, max_tokens: int, boundaries: list) -> list:
+        """
+        Split HTML at the first boundary pattern, recursing into segments over the budget.
+        
+        Returns:
+            List of (segment, token_count) tuples
+        """
+        if not boundaries:
+            return self._hard_split(html, max_tokens)
+        
+        pieces = [piece for piece in boundaries[0].split(html) if piece]
+        segments = []
+        for piece, tokens in zip(pieces, self._count_tokens(pieces)):
+            if tokens > max_tokens:
+                segments.extend(self._split_segments(piece, max_tokens, boundaries[1:]))
+            else:
+                segments.append((piece, tokens))
+        return segments
+    
+    def _hard_split(self, html: str, max_tokens: int) -> list:
+        """Split HTML without structural boundaries into budget-sized runs, preferring tag and word ends."""
+        total_tokens = self._count_tokens([html])[0]
+        # Leave headroom because token density varies along the text
+        size = max(1, int(len(html) * max_tokens / max(total_tokens, 1) * 0.9))
+        segments = []
+        start = 0
+        while start < len(html):
+            end = min(start + size, len(html))
+            if end < len(html):
+                cut = max(html.rfind(">", start, end), html.rfind(" ", start, end))
+                if cut > start + size // 2:
+                    end = cut + 1
+            segments.append(html[start:end])
+            start = end
+        return list(zip(segments, self._count_tokens(segments)))
+    
+    def _convert_with_model(
+        self,
+        htmls: list,
+        instruction: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        batch_size: int,
+        chunk_tokens: int
+    ) -> list:
+        """
+        Convert cleaned HTML documents with the model.
+        
+        Long documents are split into chunks; all chunks are generated in
+        length-bucketed batches and stitched back together in order.
+        
+        Args:
+            htmls: Cleaned HTML documents
+            instruction: Optional custom instruction for the model
+            max_tokens: Maximum number of new tokens to generate per chunk
+            temperature: Temperature for generation (0.0 = deterministic)
+            batch_size: Maximum number of chunks generated together
+            chunk_tokens: Token budget of the HTML in each chunk
+            
+        Returns:
+            List with the markdown of each document, or None where generation failed
+        """
+        pieces = []  # (document index, prompt)
+        for index, html in enumerate(htmls):
+            chunks = self.split_html(html, chunk_tokens)
+            if len(chunks) > 1:
+                logger.info(f"Converting a page of {len(html)} characters in {len(chunks)} chunks")
+            pieces.extend((index, self.create_prompt(chunk, instruction=instruction)) for chunk in chunks)
+        
+        outputs = [None] * len(pieces)
+        for batch in _length_buckets(self._count_tokens([prompt for _, prompt in pieces]), batch_size):
+            try:
+                markdowns = self._generate([pieces[i][1] for i in batch], max_tokens, temperature)
+            except Exception as e:
+                logger.error(f"Error converting a batch of {len(batch)} chunks with model: {e}")
+                continue
+            for i, markdown in zip(batch, markdowns):
+                outputs[i] = markdown
+        
+        parts = [[] for _ in htmls]
+        failed = set()
+        for (index, _), markdown in zip(pieces, outputs):
+            if markdown is None:
+                failed.add(index)
+            else:
+                parts[index].append(markdown)
+        return [None if index in failed else "\n\n".join(parts[index]) for index in range(len(htmls))]
+    
+    def _fallback_html_to_markdown(self, html: str, soup: Any = None) -> str:
+        """
+        Convert HTML to Markdown with the rule-based converter.
+        
+        Used for pages routed away from the model and as the fallback when the model fails.
         
         Args:
             html: HTML content to convert
+            soup: Already parsed HTML to convert instead of parsing html (left unmodified)
             
         Returns:
-            Basic Markdown conversion of the HTML
+            Markdown conversion of the HTML
         """
         try:
-            from bs4 import BeautifulSoup
+            from utils.html_parser import parse_html
+            from processors.rule_converter import add_title, soup_to_markdown
             
-            # Clean the HTML
-            html = self.clean_html(html)
-            
-            # Parse the HTML
-            soup = BeautifulSoup(html, 'html.parser')
+            if soup is None:
+                # Clean and parse the HTML
+                html = self.clean_html(html)
+                soup = parse_html(html)
             
             # Get the page title
             title = soup.find('title')
             title_text = title.text.strip() if title else "Untitled Page"
             
-            # Start markdown with title
-            markdown = f"# {title_text}\n\n"
-            
-            # Add headings
-            for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                level = int(heading.name[1])
-                markdown += f"{'#' * level} {heading.text.strip()}\n\n"
-            
-            # Add paragraphs
-            for p in soup.find_all('p'):
-                markdown += f"{p.text.strip()}\n\n"
-            
-            # Add lists
-            for ul in soup.find_all('ul'):
-                for li in ul.find_all('li'):
-                    markdown += f"* {li.text.strip()}\n"
-                markdown += "\n"
-            
-            for ol in soup.find_all('ol'):
-                for i, li in enumerate(ol.find_all('li')):
-                    markdown += f"{i+1}. {li.text.strip()}\n"
-                markdown += "\n"
-            
-            # Add links
-            for a in soup.find_all('a', href=True):
-                # If the link appears in the generated markdown, replace it with markdown link format
-                link_text = a.text.strip()
-                if link_text:
-                    href = a['href']
-                    markdown = markdown.replace(
-                        link_text, 
-                        f"[{link_text}]({href})"
-                    )
-            
-            return markdown
+            # Convert the body in document order; skip the title heading when the page repeats it
+            return add_title(soup_to_markdown(soup), title_text)
             
         except ImportError:
             logger.error("BeautifulSoup not installed. Using very basic conversion.")
@@ -347,8 +618,6 @@ class HTMLMarkdownConverter:
                 return "{}"
         
         try:
-            import torch
-            
             # Clean the HTML if requested
             if clean_html:
                 html = self.clean_html(html)
@@ -356,38 +625,36 @@ class HTMLMarkdownConverter:
             # Create the prompt with schema
             input_prompt = self.create_prompt(html, schema=schema)
             
-            # Encode the prompt
-            inputs = self.tokenizer.encode(input_prompt, return_tensors="pt").to(self.device)
-            
             # Generate the JSON
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    inputs,
-                    max_new_tokens=max_tokens, 
-                    temperature=temperature,
-                    do_sample=(temperature > 0),
-                    repetition_penalty=1.08
-                )
-            
-            # Decode the output
-            output_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
-            # Extract just the assistant's response
-            assistant_response = output_text.split("[/INST]")[-1].strip()
-            
-            return assistant_response
+            return self._generate([input_prompt], max_tokens, temperature)[0]
             
         except Exception as e:
             logger.error(f"Error converting HTML to JSON: {e}")
             return "{}"
     
-    def batch_convert_to_markdown(self, html_files: list, output_dir: Optional[str] = None) -> Dict[str, str]:
+    def batch_convert_to_markdown(
+        self,
+        html_files: list,
+        output_dir: Optional[str] = None,
+        batch_size: int = MARKDOWN_BATCH_SIZE,
+        max_tokens: int = MARKDOWN_MAX_NEW_TOKENS,
+        temperature: float = 0.0,
+        chunk_tokens: int = MARKDOWN_CHUNK_TOKENS
+    ) -> Dict[str, str]:
         """
         Batch convert multiple HTML files to Markdown.
         
+        Documents (and the chunks of long documents) are grouped by prompt
+        length and each group is generated in one padded model call, so
+        similar-sized pages share a forward pass.
+        
         Args:
             html_files: List of HTML file paths or (path, html_content) tuples
             output_dir: Optional directory to save output files
+            batch_size: Maximum number of documents generated together
+            max_tokens: Maximum number of new tokens to generate per document
+            temperature: Temperature for generation (0.0 = deterministic)
+            chunk_tokens: Token budget of the HTML in one model call
             
         Returns:
             Dictionary mapping input paths to output paths or markdown content
@@ -404,7 +671,8 @@ class HTMLMarkdownConverter:
             if not loaded:
                 logger.error("Failed to load model for batch conversion")
         
-        # Process each file
+        # Read every document; unreadable files are reported as None
+        documents = []
         for item in html_files:
             try:
                 # Handle both file paths and (path, content) tuples
@@ -414,10 +682,14 @@ class HTMLMarkdownConverter:
                     file_path = item
                     with open(file_path, 'r', encoding='utf-8') as f:
                         html_content = f.read()
-                
-                # Convert to markdown
-                markdown = self.html_to_markdown(html_content)
-                
+                results[file_path] = None
+                documents.append((file_path, html_content))
+            except Exception as e:
+                logger.error(f"Error processing {item}: {e}")
+                results[item] = None
+        
+        for file_path, markdown in self._convert_documents(documents, batch_size, max_tokens, temperature, chunk_tokens):
+            try:
                 # Save to file if output directory specified
                 if output_dir:
                     filename = os.path.basename(file_path)
@@ -436,4 +708,70 @@ class HTMLMarkdownConverter:
                 logger.error(f"Error processing {file_path}: {e}")
                 results[file_path] = None
         
-        return results
\ No newline at end of file
+        return results
+    
+    def _convert_documents(
+        self, documents: list, batch_size: int, max_tokens: int, temperature: float, chunk_tokens: int
+    ):
+        """
+        Convert documents in length-bucketed model batches.
+        
+        Args:
+            documents: List of (file_path, html_content) tuples
+            batch_size: Maximum number of prompts generated together
+            max_tokens: Maximum number of new tokens to generate per prompt
+            temperature: Temperature for generation (0.0 = deterministic)
+            chunk_tokens: Token budget of the HTML in one prompt
+            
+        Yields:
+            (file_path, markdown) tuples
+        """
+        if not self.model or not self.tokenizer:
+            # Without a model every document takes the fallback conversion
+            for file_path, html_content in documents:
+                yield file_path, self.html_to_markdown(html_content, max_tokens=max_tokens, temperature=temperature)
+            return
+        
+        cleaned = [self.clean_html(html_content) for _, html_content in documents]
+        markdowns = [None] * len(documents)
+        
+        # Simple pages are converted by the rules and never reach the model
+        if self.router:
+            for index, (file_path, html_content) in enumerate(documents):
+                start_time = time.time()
+                if self.router.route(cleaned[index], label=file_path) == HEURISTIC:
+                    markdowns[index] = self._fallback_html_to_markdown(html_content)
+                    self.router.record(HEURISTIC, time.time() - start_time, len(cleaned[index]))
+        
+        keys = [self._cache_key(html, None, max_tokens, temperature, chunk_tokens) for html in cleaned]
+        for index, key in enumerate(keys):
+            if markdowns[index] is None and key:
+                markdowns[index] = self.cache.get(key)
+        misses = [index for index, markdown in enumerate(markdowns) if markdown is None]
+        
+        if misses:
+            start_time = time.time()
+            converted = self._convert_with_model(
+                [cleaned[index] for index in misses], None, max_tokens, temperature, batch_size, chunk_tokens
+            )
+            if self.router:
+                # Batched generation time is shared evenly by the batch's pages
+                elapsed = (time.time() - start_time) / len(misses)
+                for index, markdown in zip(misses, converted):
+                    if markdown is not None:
+                        self.router.record(MODEL, elapsed, len(cleaned[index]))
+            for index, markdown in zip(misses, converted):
+                if markdown is None:
+                    # Retry documents of failed batches on their own
+                    markdown = self._convert_with_model(
+                        [cleaned[index]], None, max_tokens, temperature, 1, chunk_tokens
+                    )[0]
+                if markdown is None:
+                    logger.info(f"Falling back to basic HTML to Markdown conversion for {documents[index][0]}")
+                    markdown = self._fallback_html_to_markdown(documents[index][1])
+                elif keys[index]:
+                    self.cache.put(keys[index], markdown)
+                markdowns[index] = markdown
+        
+        for (file_path, _), markdown in zip(documents, markdowns):
+            yield file_path, markdown
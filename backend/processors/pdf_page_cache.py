@@ -0,0 +1,207 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from config.settings import PDF_PAGE_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
+# Max parameters per SQLite query
+_QUERY_BATCH = 500
+
+# Process-wide cache
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class PDFPageCache:
+    """
+    Persistent cache of text extracted from PDF pages.
+
+    Pages are stored by the hash of their file and their page number, so
+    re-running a build over unchanged files extracts nothing. Each page also
+    records its source document and a hash of its content and resources; when
+    a document changes, its unchanged pages are found by that hash and only
+    new or edited pages are extracted again. Content hashes are only matched
+    within the same source, never across documents.
+    """
+
+    def __init__(self, db_path=None):
+        """
+        Initialize the cache. The database is opened on first use.
+
+        Args:
+            db_path: Path of the SQLite database (defaults to PDF_PAGE_CACHE_PATH)
+        """
+        self.db_path = Path(db_path) if db_path else PDF_PAGE_CACHE_PATH
+        self._conn = None
+        self._lock = threading.Lock()
+
+        # Statistics for this process
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # Worker processes open their own connection
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def file_hash(file_path) -> str:
+        """
+        Hash the contents of a file.
+
+        Args:
+            file_path: Path of the file
+
+        Returns:
+            Hex digest of the file
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _connection(self):
+        """Open the database and create the table if needed."""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None,
+                                         check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS pdf_pages (
+                    file_hash TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    source TEXT,
+                    content_hash TEXT,
+                    text TEXT NOT NULL,
+                    PRIMARY KEY (file_hash, page)
+                );
+                CREATE INDEX IF NOT EXISTS pdf_pages_by_content ON pdf_pages (source, content_hash);
+            """)
+        return self._conn
+
+    def get_pages(self, file_hash: str) -> Dict[int, str]:
+        """
+        Look up the cached pages of a file.
+
+        Args:
+            file_hash: Hash from file_hash()
+
+        Returns:
+            Dictionary mapping page numbers to their text
+        """
+        with self._lock:
+            try:
+                rows = self._connection().execute(
+                    "SELECT page, text FROM pdf_pages WHERE file_hash = ?", (file_hash,)
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"PDF page cache lookup failed: {e}")
+                rows = []
+            self.hits += len(rows)
+            return dict(rows)
+
+    def find_by_content(self, content_hashes: Dict[int, str], source: str) -> Dict[int, str]:
+        """
+        Look up pages of earlier versions of a document by the hash of their content.
+
+        Args:
+            content_hashes: Dictionary mapping page numbers to content hashes
+            source: Document the pages belong to (e.g. its URL or repository path)
+
+        Returns:
+            Dictionary mapping the page numbers that were found to their text
+        """
+        pages_by_hash = {}
+        for page, content_hash in content_hashes.items():
+            pages_by_hash.setdefault(content_hash, []).append(page)
+        hashes = list(pages_by_hash)
+
+        found = {}
+        with self._lock:
+            try:
+                conn = self._connection()
+                for start in range(0, len(hashes), _QUERY_BATCH):
+                    batch = hashes[start:start + _QUERY_BATCH]
+                    rows = conn.execute(
+                        "SELECT content_hash, text FROM pdf_pages "
+                        f"WHERE source = ? AND content_hash IN ({','.join('?' * len(batch))})",
+                        [source] + batch
+                    )
+                    for content_hash, text in rows:
+                        for page in pages_by_hash[content_hash]:
+                            found[page] = text
+            except sqlite3.Error as e:
+                logger.warning(f"PDF page cache lookup failed: {e}")
+            self.hits += len(found)
+            self.misses += len(content_hashes) - len(found)
+            return found
+
+    def put_pages(self, file_hash: str, pages: Iterable[Tuple[int, Optional[str], str]], source: Optional[str] = None):
+        """
+        Store extracted pages of a file.
+
+        Args:
+            file_hash: Hash from file_hash()
+            pages: Tuples of page number, content hash (None if unknown) and text
+            source: Document the file is a version of (None if unknown)
+        """
+        with self._lock:
+            try:
+                self._connection().executemany(
+                    "INSERT OR REPLACE INTO pdf_pages (file_hash, page, source, content_hash, text) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(file_hash, page, source, content_hash, text) for page, content_hash, text in pages]
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"PDF page cache write failed: {e}")
+
+    def clear(self):
+        """Remove every cached page."""
+        with self._lock:
+            self._connection().execute("DELETE FROM pdf_pages")
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with the cached files and pages, and page hits and misses
+        """
+        with self._lock:
+            try:
+                files, pages = self._connection().execute(
+                    "SELECT COUNT(DISTINCT file_hash), COUNT(*) FROM pdf_pages"
+                ).fetchone()
+            except sqlite3.Error:
+                files, pages = None, None
+            return {"files": files, "pages": pages, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def get_pdf_page_cache() -> PDFPageCache:
+    """Get or create the process-wide PDF page cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PDFPageCache()
+        return _cache
@@ -0,0 +1,302 @@
+import logging
+import re
+from urllib.parse import urljoin
+
+from bs4 import NavigableString
+from bs4.element import Comment, Declaration, Doctype, ProcessingInstruction
+
+logger = logging.getLogger(__name__)
+
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+# Elements that start a new Markdown block
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "body", "dd", "details", "dialog", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hgroup", "hr", "html", "li", "main", "nav", "ol", "p", "pre", "section", "summary", "table", "ul",
+}
+
+# Elements whose content is not part of the page text
+SKIPPED_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "head", "title", "meta", "link",
+    "button", "select", "textarea", "input", "object", "embed", "math",
+}
+
+_NON_TEXT = (Comment, Declaration, Doctype, ProcessingInstruction)
+_WHITESPACE = re.compile(r"\s+")
+_LANGUAGE_CLASS = re.compile(r"^(?:language|lang)-(.+)$")
+_LIST_ITEM = re.compile(r"^(?:\*|[0-9]+\.) ")
+
+
+def _collapse(text):
+    """Collapse whitespace runs the way browsers render them."""
+    return _WHITESPACE.sub(" ", text)
+
+
+def _wrap(text, marker):
+    """Wrap inline text in a Markdown marker, keeping surrounding whitespace outside it."""
+    stripped = text.strip()
+    if not stripped:
+        return text
+    lead = " " if text[:1].isspace() else ""
+    trail = " " if text[-1:].isspace() else ""
+    return f"{lead}{marker}{stripped}{marker}{trail}"
+
+
+class _MarkdownWriter:
+    """Single-traversal HTML to Markdown renderer."""
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url
+
+    def _url(self, href):
+        return urljoin(self.base_url, href) if self.base_url else href
+
+    # Block content
+
+    def blocks(self, node):
+        """Render the children of a node as a list of Markdown blocks in document order."""
+        out = []
+        inline = []
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                if not isinstance(child, _NON_TEXT):
+                    inline.append(_collapse(str(child)))
+                continue
+            name = child.name
+            if name in SKIPPED_TAGS:
+                continue
+            if name in BLOCK_TAGS:
+                self._flush(inline, out)
+                self._block(child, out)
+            else:
+                inline.append(self.inline(child))
+        self._flush(inline, out)
+        return out
+
+    @staticmethod
+    def _flush(inline, out):
+        """Turn buffered inline content into a paragraph; line breaks become hard breaks."""
+        if inline:
+            lines = [line.strip() for line in "".join(inline).split("\n")]
+            text = "  \n".join(line for line in lines if line)
+            if text:
+                out.append(text)
+            inline.clear()
+
+    def _block(self, node, out):
+        name = node.name
+        if name in HEADINGS:
+            text = self.inline(node).replace("\n", " ").strip()
+            if text:
+                out.append(f"{'#' * HEADINGS[name]} {text}")
+        elif name == "pre":
+            out.append(self._code_block(node))
+        elif name in ("ul", "ol"):
+            rendered = self._list(node)
+            if rendered:
+                out.append(rendered)
+        elif name == "table":
+            out.extend(self._table(node))
+        elif name == "blockquote":
+            inner = "\n\n".join(self.blocks(node))
+            if inner:
+                out.append("\n".join(f"> {line}".rstrip() for line in inner.split("\n")))
+        elif name == "hr":
+            out.append("---")
+        elif name == "dt":
+            text = self.inline(node).strip()
+            if text:
+                out.append(f"**{text}**")
+        else:
+            out.extend(self.blocks(node))
+
+    def _code_block(self, pre):
+        """Render a preformatted block as a fenced code block, keeping its whitespace."""
+        language = ""
+        code = pre.find("code")
+        for element in (code, pre):
+            for css_class in (element.get("class") or []) if element is not None else []:
+                match = _LANGUAGE_CLASS.match(css_class)
+                if match:
+                    language = match.group(1)
+                    break
+            if language:
+                break
+
+        text = pre.get_text().strip("\n")
+        fence = "```"
+        while fence in text:
+            fence += "`"
+        return f"{fence}{language}\n{text}\n{fence}"
+
+    def _list(self, node):
+        """Render a list; nested lists and multi-paragraph items are indented under their item."""
+        ordered = node.name == "ol"
+        start = node.get("start", "1")
+        number = int(start) if str(start).isdigit() else 1
+        items = []
+        for child in node.children:
+            name = getattr(child, "name", None)
+            if name in ("ul", "ol") and items:
+                # A list nested directly in a list belongs to the previous item
+                nested = self._list(child)
+                if nested:
+                    items[-1] += "\n" + "\n".join(f"   {line}" if line else line for line in nested.split("\n"))
+                continue
+            if name != "li":
+                continue
+
+            marker = f"{number}." if ordered else "*"
+            number += 1
+            # Paragraphs in an item are separated by a blank line, nested lists follow directly
+            body = ""
+            for block in self.blocks(child):
+                if body:
+                    body += "\n" if _LIST_ITEM.match(block) else "\n\n"
+                body += block
+            indent = " " * (len(marker) + 1)
+            lines = body.split("\n") if body else [""]
+            item = f"{marker} {lines[0]}".rstrip()
+            for line in lines[1:]:
+                item += "\n" + (indent + line if line else line)
+            items.append(item)
+        return "\n".join(items)
+
+    def _rows(self, table):
+        """Rows of a table, without the rows of nested tables."""
+        for child in table.children:
+            name = getattr(child, "name", None)
+            if name == "tr":
+                yield child
+            elif name in ("thead", "tbody", "tfoot"):
+                for row in child.children:
+                    if getattr(row, "name", None) == "tr":
+                        yield row
+
+    def _table(self, table):
+        """Render a table as a pipe table; single-column layout tables become plain blocks."""
+        rows = []
+        cell_blocks = []
+        for row in self._rows(table):
+            cells = []
+            for cell in row.children:
+                if getattr(cell, "name", None) not in ("td", "th"):
+                    continue
+                blocks = self.blocks(cell)
+                cell_blocks.append(blocks)
+                text = " ".join(blocks).replace("\n", " ").replace("|", "\\|").strip()
+                cells.append(text)
+                span = cell.get("colspan", "1")
+                if str(span).isdigit() and int(span) > 1:
+                    cells.extend([""] * (int(span) - 1))
+            if cells:
+                rows.append(cells)
+
+        if not rows:
+            return []
+        width = max(len(cells) for cells in rows)
+        if width == 1:
+            return [block for blocks in cell_blocks for block in blocks]
+
+        lines = []
+        for index, cells in enumerate(rows):
+            cells = cells + [""] * (width - len(cells))
+            lines.append("| " + " | ".join(cells) + " |")
+            if index == 0:
+                lines.append("|" + " --- |" * width)
+        return ["\n".join(lines)]
+
+    # Inline content
+
+    def inline(self, node):
+        """Render a node as inline Markdown."""
+        if isinstance(node, NavigableString):
+            return "" if isinstance(node, _NON_TEXT) else _collapse(str(node))
+
+        name = node.name
+        if name in SKIPPED_TAGS:
+            return ""
+        if name == "br":
+            return "\n"
+        if name == "img":
+            return self._image(node)
+        if name in ("code", "kbd", "samp", "tt"):
+            text = _collapse(node.get_text()).strip()
+            if not text:
+                return ""
+            ticks = "``" if "`" in text else "`"
+            return f"{ticks}{text}{ticks}"
+
+        inner = "".join(self.inline(child) for child in node.children)
+        if name == "a":
+            return self._link(node, inner)
+        if name in ("strong", "b"):
+            return _wrap(inner, "**")
+        if name in ("em", "i"):
+            return _wrap(inner, "*")
+        if name in ("del", "s", "strike"):
+            return _wrap(inner, "~~")
+        if name in BLOCK_TAGS:
+            # Block inside inline content (e.g. a <div> in a link)
+            return f" {inner} "
+        return inner
+
+    def _link(self, node, inner):
+        href = (node.get("href") or "").strip()
+        text = inner.replace("\n", " ").strip()
+        if not text or not href or href.startswith(("#", "javascript:")):
+            return inner
+        lead = " " if inner[:1].isspace() else ""
+        trail = " " if inner[-1:].isspace() else ""
+        return f"{lead}[{text}]({self._url(href)}){trail}"
+
+    def _image(self, node):
+        src = (node.get("src") or "").strip()
+        alt = _collapse(node.get("alt") or "").strip()
+        if not src or src == "#" or src.startswith("data:"):
+            return alt
+        return f"![{alt}]({self._url(src)})"
+
+
+def add_title(markdown, title):
+    """
+    Put a page title heading above its markdown, unless the markdown already starts with it.
+
+    Args:
+        markdown: Markdown of the page body
+        title: Page title
+
+    Returns:
+        str: Markdown starting with a "# title" heading
+    """
+    heading = f"# {title}"
+    if markdown == heading or markdown.startswith(heading + "\n"):
+        return markdown
+    return f"{heading}\n\n{markdown}" if markdown else heading
+
+
+def soup_to_markdown(soup, base_url=None):
+    """
+    Convert parsed HTML to Markdown in a single traversal.
+
+    Keeps document order, headings, paragraphs, fenced code blocks (with
+    their language), pipe tables, nested lists, block quotes, emphasis,
+    inline code, links and images. Scripts, styles and other non-content
+    elements are skipped, so the soup does not have to be cleaned first
+    and is left unmodified.
+
+    Args:
+        soup: BeautifulSoup document or element
+        base_url: URL relative links and images are resolved against (None keeps them as-is)
+
+    Returns:
+        str: Markdown of the page body (the title is not included)
+    """
+    root = soup.body or soup
+    writer = _MarkdownWriter(base_url)
+    try:
+        return "\n\n".join(writer.blocks(root))
+    except RecursionError:
+        logger.warning("HTML nested too deeply for structured conversion; using plain text")
+        return root.get_text(separator="\n\n", strip=True)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Utility script to compare full-precision and int8-quantized markdown conversion.
+
+Converts a sample corpus of HTML files with the ReaderLM-v2 model in both
+modes on CPU and reports the speed of each mode and how closely the
+quantized output matches the full-precision output.
+
+Usage:
+    python compare_quantization.py SAMPLE_DIR [--limit N] [--threads N] [--max-tokens N]
+
+Options:
+    SAMPLE_DIR        Directory with .html files to convert
+    --limit N         Number of sample files to use (default: 20)
+    --threads N       CPU threads for inference (default: torch default)
+    --max-tokens N    Maximum new tokens per document (default: 2048)
+    --model PATH      Model name or path (default: jinaai/ReaderLM-v2)
+"""
+
+import argparse
+import difflib
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from processors.markdown_converter import HTMLMarkdownConverter
+
+logger = logging.getLogger(__name__)
+
+
+def similarity(reference, candidate):
+    """
+    Line-based similarity of two markdown documents.
+
+    Args:
+        reference (str): Full-precision output
+        candidate (str): Quantized output
+
+    Returns:
+        float: Ratio between 0 (nothing in common) and 1 (identical)
+    """
+    return difflib.SequenceMatcher(None, reference.splitlines(), candidate.splitlines(), autojunk=False).ratio()
+
+
+def run_mode(converter, samples, max_tokens):
+    """
+    Convert every sample with one converter.
+
+    Args:
+        converter: HTMLMarkdownConverter with its model loaded
+        samples (list): HTML documents
+        max_tokens (int): Maximum new tokens per document
+
+    Returns:
+        tuple: List of markdown outputs and the seconds spent per document
+    """
+    outputs = []
+    timings = []
+    for html in samples:
+        start = time.perf_counter()
+        outputs.append(converter.html_to_markdown(html, max_tokens=max_tokens))
+        timings.append(time.perf_counter() - start)
+    return outputs, timings
+
+
+def summarize(full_outputs, full_timings, quantized_outputs, quantized_timings):
+    """
+    Build the comparison report of the two modes.
+
+    Returns:
+        dict: Seconds per document for each mode, speedup, mean and minimum
+            similarity and the share of identical outputs
+    """
+    scores = [similarity(ref, out) for ref, out in zip(full_outputs, quantized_outputs)]
+    full_time = sum(full_timings) / len(full_timings)
+    quantized_time = sum(quantized_timings) / len(quantized_timings)
+    return {
+        "documents": len(scores),
+        "full_precision_seconds_per_doc": full_time,
+        "quantized_seconds_per_doc": quantized_time,
+        "speedup": full_time / quantized_time if quantized_time else 0.0,
+        "mean_similarity": sum(scores) / len(scores),
+        "min_similarity": min(scores),
+        "identical_outputs": sum(ref == out for ref, out in zip(full_outputs, quantized_outputs)) / len(scores),
+    }
+
+
+def compare_modes(samples, model_path="jinaai/ReaderLM-v2", num_threads=None, max_tokens=2048):
+    """
+    Compare full-precision and quantized CPU conversion over a sample corpus.
+
+    Args:
+        samples (list): HTML documents
+        model_path (str): Model name or path
+        num_threads (int): CPU threads for inference (None keeps the torch default)
+        max_tokens (int): Maximum new tokens per document
+
+    Returns:
+        dict: Report from summarize() plus the model load time of each mode
+    """
+    results = {}
+    for quantize in (False, True):
+        # The conversion cache is disabled so every document is generated
+        converter = HTMLMarkdownConverter(model_path, device="cpu", cache=False,
+                                          quantize=quantize, num_threads=num_threads)
+        start = time.perf_counter()
+        if not converter.load_model():
+            raise RuntimeError(f"Could not load {model_path}")
+        load_time = time.perf_counter() - start
+
+        # Warm up so one-off initialization is not attributed to the first document
+        converter.html_to_markdown(samples[0], max_tokens=16)
+        results[quantize] = run_mode(converter, samples, max_tokens) + (load_time,)
+        logger.info(f"{'int8' if quantize else 'fp32'}: converted {len(samples)} documents")
+        del converter
+
+    report = summarize(results[False][0], results[False][1], results[True][0], results[True][1])
+    report["full_precision_load_seconds"] = results[False][2]
+    report["quantized_load_seconds"] = results[True][2]
+    return report
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    parser = argparse.ArgumentParser(description="Compare full-precision and int8 markdown conversion on CPU")
+    parser.add_argument("sample_dir", help="Directory with .html files to convert")
+    parser.add_argument("--limit", type=int, default=20, help="Number of sample files to use")
+    parser.add_argument("--threads", type=int, default=None, help="CPU threads for inference")
+    parser.add_argument("--max-tokens", type=int, default=2048, help="Maximum new tokens per document")
+    parser.add_argument("--model", default="jinaai/ReaderLM-v2", help="Model name or path")
+
+    args = parser.parse_args()
+
+    paths = sorted(Path(args.sample_dir).glob("*.html"))[:args.limit]
+    if not paths:
+        logger.error(f"No .html files found in {args.sample_dir}")
+        sys.exit(1)
+    samples = [path.read_text(encoding="utf-8", errors="replace") for path in paths]
+
+    report = compare_modes(samples, model_path=args.model, num_threads=args.threads, max_tokens=args.max_tokens)
+
+    print(f"Documents:              {report['documents']}")
+    print(f"Full precision:         {report['full_precision_seconds_per_doc']:.2f} s/doc "
+          f"(load {report['full_precision_load_seconds']:.1f} s)")
+    print(f"int8 quantized:         {report['quantized_seconds_per_doc']:.2f} s/doc "
+          f"(load {report['quantized_load_seconds']:.1f} s)")
+    print(f"Speedup:                {report['speedup']:.2f}x")
+    print(f"Mean similarity:        {report['mean_similarity']:.3f} (min {report['min_similarity']:.3f})")
+    print(f"Identical outputs:      {report['identical_outputs'] * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import logging
+
+from bs4 import BeautifulSoup
+
+from config.settings import HTML_PARSER
+
+logger = logging.getLogger(__name__)
+
+# lxml is optional; it builds BeautifulSoup trees several times faster than
+# the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+def get_parser_name():
+    """
+    Get the BeautifulSoup tree builder used for HTML pages.
+
+    Returns:
+        str: HTML_PARSER if configured, otherwise 'lxml' when installed, else 'html.parser'
+    """
+    if HTML_PARSER:
+        return HTML_PARSER
+    return "lxml" if LXML_AVAILABLE else "html.parser"
+
+
+def parse_html(html, parser=None):
+    """
+    Parse an HTML document with the configured parser backend.
+
+    Args:
+        html: HTML content to parse
+        parser: Tree builder to use instead of the configured one
+
+    Returns:
+        BeautifulSoup: Parsed document
+    """
+    parser = parser or get_parser_name()
+    try:
+        return BeautifulSoup(html, parser)
+    except Exception as e:
+        if parser == "html.parser":
+            raise
+        logger.warning(f"HTML parser '{parser}' failed ({e}), using html.parser")
+        return BeautifulSoup(html, "html.parser")
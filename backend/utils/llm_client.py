@@ -124,7 +124,8 @@ class LLMClient:
             @agents.function_tool
             async def crawl_website(url: str, recursive: bool = False, max_pages: int = 10, 
                                    user_instructions: str = None, max_depth: int = None,
-                                   content_filters: list = None, url_patterns: list = None) -> str:
+                                   content_filters: list = None, url_patterns: list = None,
+                                   num_workers: int = 1) -> str:
                 """
                 Crawl a website to extract information.
                 
@@ -136,6 +137,7 @@ class LLMClient:
                     max_depth: Maximum link depth to crawl (None for unlimited)
                     content_filters: List of keywords to filter content by (only keep pages containing these terms)
                     url_patterns: List of regex patterns to filter URLs (only follow URLs matching these patterns)
+                    num_workers: Number of crawler processes for large crawls (1 crawls in-process)
                 
                 Returns:
                     A summary of the crawled content
@@ -160,7 +162,8 @@ class LLMClient:
                         use_ai_guidance=use_ai,
                         max_depth=max_depth,
                         content_filters=content_filters,
-                        url_patterns=url_patterns
+                        url_patterns=url_patterns,
+                        num_workers=num_workers
                     )
                     
                     # Summarize the results
@@ -0,0 +1,373 @@
+import base64
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from config.settings import CRAWL_ARCHIVE_DIR, CRAWL_ARCHIVE_COMPRESSION, CRAWL_ARCHIVE_MAX_FILE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# zstandard is optional; it compresses faster and smaller than gzip
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+_EXTENSIONS = {"gzip": ".warc.gz", "zstd": ".warc.zst"}
+_INDEX_EXTENSION = ".cdxj"
+
+
+def _warc_date(timestamp=None):
+    """Format a UNIX time as a WARC-Date."""
+    return datetime.fromtimestamp(timestamp or time.time(), tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _digest(data):
+    """Return the WARC digest of a byte string."""
+    return "sha1:" + base64.b32encode(hashlib.sha1(data).digest()).decode("ascii")
+
+
+def _read_record(stream):
+    """
+    Read one WARC record from a decompressed stream.
+
+    Returns:
+        dict: Record with 'headers' and 'content' (bytes), or None at the end of the stream
+    """
+    line = stream.readline()
+    while line in (b"\r\n", b"\n"):
+        line = stream.readline()
+    if not line:
+        return None
+    if not line.startswith(b"WARC/"):
+        raise ValueError(f"Not a WARC record: {line[:40]!r}")
+
+    headers = {}
+    for line in iter(stream.readline, b""):
+        line = line.rstrip(b"\r\n")
+        if not line:
+            break
+        name, _, value = line.decode("utf-8").partition(":")
+        headers[name.strip()] = value.strip()
+
+    content = stream.read(int(headers.get("Content-Length", 0)))
+    stream.read(4)  # Record separator
+    return {"headers": headers, "content": content}
+
+
+def parse_http_response(content):
+    """
+    Split an archived HTTP response into its status, headers and body.
+
+    Args:
+        content: Content of a response record
+
+    Returns:
+        tuple: (status code, headers dict, body bytes)
+    """
+    head, _, body = content.partition(b"\r\n\r\n")
+    lines = head.decode("iso-8859-1").split("\r\n")
+    parts = lines[0].split(" ", 2)
+    status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else None
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name:
+            headers[name.strip()] = value.strip()
+    return status, headers, body
+
+
+class CrawlArchive:
+    """
+    Append-only, compressed WARC archive of crawled pages.
+
+    Each crawled page becomes three WARC/1.1 records: a 'response' record
+    with the HTTP status, headers and HTML as fetched (or rendered), a
+    'metadata' record with the page's title, links and crawl details, and a
+    'conversion' record with the markdown made from it. Every record is a
+    separate gzip member (or zstd frame), so an archive file decompresses
+    as one stream for sequential reprocessing, and any record can be read on
+    its own from its offset.
+
+    Offsets are appended to a CDXJ-style index file next to each archive
+    file ('<url> <timestamp> <json>'), which gives random access by URL
+    without refetching. Files are rotated once they reach max_file_size and
+    carry the process ID in their name, so several crawler processes can
+    write to the same directory.
+    """
+
+    def __init__(self, archive_dir=None, prefix="crawl", compression=CRAWL_ARCHIVE_COMPRESSION,
+                 max_file_size=CRAWL_ARCHIVE_MAX_FILE_SIZE):
+        """
+        Initialize the archive.
+
+        Args:
+            archive_dir: Directory of archive files (defaults to CRAWL_ARCHIVE_DIR)
+            prefix: File name prefix of new archive files
+            compression: 'gzip' or 'zstd' (zstd needs the zstandard package)
+            max_file_size: Size in bytes after which a new archive file is started
+        """
+        if compression not in _EXTENSIONS:
+            raise ValueError(f"Unknown archive compression '{compression}', expected 'gzip' or 'zstd'")
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed, writing gzip archives instead")
+            compression = "gzip"
+
+        self.archive_dir = Path(archive_dir) if archive_dir else CRAWL_ARCHIVE_DIR
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.compression = compression
+        self.max_file_size = max_file_size
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._index_file = None
+        self._path = None
+        self._index = None  # url -> {record type: (file name, offset, length)}
+
+    # Writing
+
+    def _compress(self, data):
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor().compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    def _open_file(self):
+        """Start a new archive file."""
+        self.close()
+        stamp = time.strftime("%Y%m%d%H%M%S", time.gmtime())
+        name = f"{self.prefix}-{stamp}-{os.getpid()}-{uuid.uuid4().hex[:8]}{_EXTENSIONS[self.compression]}"
+        self._path = self.archive_dir / name
+        self._file = open(self._path, "ab")
+        self._index_file = open(self._path.with_name(name + _INDEX_EXTENSION), "a", encoding="utf-8")
+
+    def _write_record(self, record_type, url, content, content_type, extra_headers=None, timestamp=None):
+        """
+        Append one record to the current archive file. Must hold the lock.
+
+        Returns:
+            str: WARC-Record-ID of the record
+        """
+        if self._file is None or self._file.tell() >= self.max_file_size:
+            self._open_file()
+
+        record_id = f"<urn:uuid:{uuid.uuid4()}>"
+        headers = [
+            ("WARC-Type", record_type),
+            ("WARC-Record-ID", record_id),
+            ("WARC-Date", _warc_date(timestamp)),
+            ("WARC-Target-URI", url),
+            ("Content-Type", content_type),
+            ("WARC-Block-Digest", _digest(content)),
+        ]
+        headers.extend(extra_headers or [])
+        headers.append(("Content-Length", str(len(content))))
+
+        head = "WARC/1.1\r\n" + "".join(f"{name}: {value}\r\n" for name, value in headers) + "\r\n"
+        compressed = self._compress(head.encode("utf-8") + content + b"\r\n\r\n")
+
+        offset = self._file.tell()
+        self._file.write(compressed)
+
+        location = (self._path.name, offset, len(compressed))
+        self._index_file.write(f"{url} {time.strftime('%Y%m%d%H%M%S', time.gmtime(timestamp))} " + json.dumps({
+            "type": record_type, "file": location[0], "offset": offset, "length": location[2]
+        }) + "\n")
+        if self._index is not None:
+            self._index.setdefault(url, {})[record_type] = location
+        return record_id
+
+    def write_page(self, page_data, markdown):
+        """
+        Archive a crawled page: its HTTP response, metadata and markdown.
+
+        Pages without HTML (e.g. 304 responses served from the crawl cache)
+        only get metadata and conversion records.
+
+        Args:
+            page_data: Page data from WebCrawler.fetch_page, before its HTML is released
+            markdown: Markdown converted from the page
+        """
+        url = page_data["url"]
+        timestamp = time.time()
+        metadata = {
+            "title": page_data.get("title"),
+            "meta_description": page_data.get("meta_description"),
+            "canonical_url": page_data.get("canonical_url"),
+            "depth": page_data.get("depth"),
+            "fetched_at": page_data.get("fetched_at"),
+            "links": page_data.get("links"),
+        }
+
+        try:
+            with self._lock:
+                response_id = None
+                if page_data.get("html") is not None:
+                    status = page_data.get("status_code") or 200
+                    http_head = f"HTTP/1.1 {status} \r\n" + "".join(
+                        f"{name}: {value}\r\n" for name, value in (page_data.get("response_headers") or {}).items()
+                        # The archived body is decoded text, not the transferred bytes
+                        if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+                    ) + "\r\n"
+                    response_id = self._write_record(
+                        "response", url,
+                        http_head.encode("iso-8859-1", errors="replace") + page_data["html"].encode("utf-8"),
+                        "application/http; msgtype=response", timestamp=timestamp
+                    )
+
+                refers_to = [("WARC-Refers-To", response_id)] if response_id else []
+                concurrent_to = [("WARC-Concurrent-To", response_id)] if response_id else []
+                self._write_record("metadata", url, json.dumps(metadata).encode("utf-8"),
+                                   "application/json", concurrent_to, timestamp=timestamp)
+                self._write_record("conversion", url, (markdown or "").encode("utf-8"),
+                                   "text/markdown; charset=utf-8", refers_to, timestamp=timestamp)
+                self._file.flush()
+                self._index_file.flush()
+        except Exception as e:
+            logger.error(f"Error archiving {url}: {e}")
+
+    def close(self):
+        """Close the current archive file; the next write starts a new one."""
+        for handle in (self._file, self._index_file):
+            if handle:
+                handle.close()
+        self._file = None
+        self._index_file = None
+
+    # Reading
+
+    def archive_files(self):
+        """Get the archive files in the directory, oldest first."""
+        files = [p for ext in _EXTENSIONS.values() for p in self.archive_dir.glob(f"*{ext}")]
+        return sorted(files, key=lambda p: (p.stat().st_mtime, p.name))
+
+    def _load_index(self):
+        """Build the URL index from the index files; later records win."""
+        index = {}
+        index_files = sorted(self.archive_dir.glob(f"*{_INDEX_EXTENSION}"), key=lambda p: (p.stat().st_mtime, p.name))
+        for index_file in index_files:
+            try:
+                with open(index_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        url, _, rest = line.partition(" ")
+                        _, _, data = rest.partition(" ")
+                        entry = json.loads(data)
+                        index.setdefault(url, {})[entry["type"]] = (entry["file"], entry["offset"], entry["length"])
+            except Exception as e:
+                logger.warning(f"Error reading archive index {index_file}: {e}")
+        return index
+
+    def _decompress_stream(self, path):
+        """Open an archive file as one decompressed stream."""
+        if path.name.endswith(_EXTENSIONS["zstd"]):
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError(f"zstandard is needed to read {path.name}")
+            raw = open(path, "rb")
+            return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True))
+        return gzip.open(path, "rb")
+
+    def _read_at(self, file_name, offset, length):
+        """Read and decompress the record at an offset."""
+        path = self.archive_dir / file_name
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        if path.name.endswith(_EXTENSIONS["zstd"]):
+            data = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            data = gzip.decompress(data)
+        return _read_record(io.BytesIO(data))
+
+    def get_record(self, url, record_type="conversion"):
+        """
+        Read the latest record of a type for a URL.
+
+        Args:
+            url: URL of the page
+            record_type: 'response', 'metadata' or 'conversion'
+
+        Returns:
+            dict: Record with 'headers' and 'content', or None if the URL is not archived
+        """
+        with self._lock:
+            if self._index is None:
+                self._index = self._load_index()
+            location = self._index.get(url, {}).get(record_type)
+            if self._file:
+                self._file.flush()
+        if not location:
+            return None
+        return self._read_at(*location)
+
+    def get_markdown(self, url):
+        """Get the archived markdown of a URL, or None."""
+        record = self.get_record(url, "conversion")
+        return record["content"].decode("utf-8") if record else None
+
+    def get_html(self, url):
+        """Get the archived HTML of a URL, or None."""
+        record = self.get_record(url, "response")
+        if not record:
+            return None
+        _, _, body = parse_http_response(record["content"])
+        return body.decode("utf-8", errors="replace")
+
+    def iter_records(self, record_types=None):
+        """
+        Read every record of the archive sequentially.
+
+        Args:
+            record_types: Record types to yield (all if None)
+
+        Yields:
+            dict: Records with 'headers' and 'content'
+        """
+        with self._lock:
+            if self._file:
+                self._file.flush()
+        for path in self.archive_files():
+            with self._decompress_stream(path) as stream:
+                while True:
+                    record = _read_record(stream)
+                    if record is None:
+                        break
+                    if record_types is None or record["headers"].get("WARC-Type") in record_types:
+                        yield record
+
+    def iter_pages(self):
+        """
+        Read the archived pages sequentially, e.g. to convert them again with another model.
+
+        Yields:
+            dict: Page with 'url', 'status_code', 'headers', 'html', 'metadata' and 'markdown'
+        """
+        page = None
+        for record in self.iter_records():
+            headers = record["headers"]
+            url = headers.get("WARC-Target-URI")
+            record_type = headers.get("WARC-Type")
+
+            # A page's records are written together and start with its response (if any)
+            if page is None or page["url"] != url or record_type == "response":
+                if page:
+                    yield page
+                page = {"url": url, "status_code": None, "headers": {}, "html": None, "metadata": {}, "markdown": None}
+
+            if record_type == "response":
+                page["status_code"], page["headers"], body = parse_http_response(record["content"])
+                page["html"] = body.decode("utf-8", errors="replace")
+            elif record_type == "metadata":
+                page["metadata"] = json.loads(record["content"] or b"{}")
+            elif record_type == "conversion":
+                page["markdown"] = record["content"].decode("utf-8")
+        if page:
+            yield page
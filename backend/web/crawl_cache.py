@@ -0,0 +1,290 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config.settings import CRAWL_CACHE_DIR, CRAWL_CACHE_MAX_AGE, CRAWL_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlCache:
+    """
+    Persistent validator cache used to skip unchanged pages on re-crawls.
+
+    For every URL the cache keeps the ETag/Last-Modified validators returned
+    by the server, a hash of the fetched HTML and the markdown produced from
+    it. Re-crawls send conditional requests with the stored validators and
+    reuse the cached markdown when the server answers 304 or the content hash
+    is unchanged.
+
+    Entries are rows of a SQLite table written one URL at a time, so
+    concurrent crawls sharing the cache never overwrite each other's pages.
+    Pages not crawled for max_age seconds are dropped, and the oldest pages
+    are evicted once the cache grows beyond max_bytes.
+    """
+
+    def __init__(self, cache_dir=None, reuse=True, max_age=CRAWL_CACHE_MAX_AGE, max_bytes=CRAWL_CACHE_MAX_BYTES):
+        """
+        Initialize the crawl cache. The database is opened on first use.
+
+        Args:
+            cache_dir: Directory to store the cache in (defaults to CRAWL_CACHE_DIR)
+            reuse: Use stored entries to skip unchanged pages; False only records pages,
+                e.g. on a first crawl that seeds the cache for later updates
+            max_age: Seconds after its last crawl a page is dropped (None keeps pages forever)
+            max_bytes: Maximum total size of the cached markdown and links in bytes
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else CRAWL_CACHE_DIR
+        self.reuse = reuse
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.db_path = self.cache_dir / "crawl_cache.sqlite3"
+
+        self._conn = None
+        self._lock = threading.Lock()
+
+        # Per-session statistics
+        self.stats = {
+            "not_modified": 0,  # Server answered 304
+            "unchanged": 0,  # Body fetched but content hash matched
+            "converted": 0,  # Page was (re)converted and stored
+            "evicted": 0,  # Pages dropped by the age and size bounds
+        }
+
+    def _connection(self):
+        """Open the database, create the table if needed and apply the cache bounds."""
+        if self._conn is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None,
+                                         check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    links TEXT,
+                    markdown TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS pages_by_age ON pages (fetched_at);
+            """)
+            self._evict(self._conn)
+        return self._conn
+
+    @staticmethod
+    def content_hash(html):
+        """Return a stable hash for the given HTML content."""
+        return hashlib.sha256((html or "").encode("utf-8", errors="replace")).hexdigest()
+
+    def _row(self, url, columns):
+        """Look up columns of the row of a URL, or None if the URL is not cached."""
+        with self._lock:
+            try:
+                return self._connection().execute(
+                    f"SELECT {columns} FROM pages WHERE url = ?", (url,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Crawl cache lookup failed: {e}")
+                return None
+
+    def get_entry(self, url):
+        """Return the cache entry for a URL, or None if the URL is not cached."""
+        row = self._row(url, "etag, last_modified, content_hash, links, fetched_at")
+        if row is None:
+            return None
+        etag, last_modified, content_hash, links, fetched_at = row
+        entry = {"content_hash": content_hash, "fetched_at": fetched_at}
+        if etag:
+            entry["etag"] = etag
+        if last_modified:
+            entry["last_modified"] = last_modified
+        if links is not None:
+            entry["links"] = json.loads(links)
+        return entry
+
+    def get_markdown(self, url):
+        """Return the cached markdown for a URL, or None if not available."""
+        row = self._row(url, "markdown")
+        return row[0] if row else None
+
+    def get_conditional_headers(self, url):
+        """
+        Build conditional request headers for a URL.
+
+        Headers are only returned when the converted markdown is cached, so
+        that a 304 response can be served from the cache.
+
+        Args:
+            url: URL to build headers for
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since headers (may be empty)
+        """
+        entry = self.get_entry(url) if self.reuse else None
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_unchanged_markdown(self, url, page_data):
+        """
+        Return cached markdown if the fetched page is unchanged.
+
+        A page is unchanged if the server answered 304 Not Modified or if the
+        fetched HTML hashes to the same value as the cached copy.
+
+        Args:
+            url: URL of the page
+            page_data: Result dictionary returned by WebCrawler.fetch_page
+
+        Returns:
+            str: Cached markdown, or None if the page must be converted
+        """
+        if not self.reuse:
+            return None
+        row = self._row(url, "content_hash, markdown")
+        if row is None:
+            return None
+        content_hash, markdown = row
+
+        if page_data.get("status") == "not_modified":
+            with self._lock:
+                self.stats["not_modified"] += 1
+            return markdown
+
+        if page_data.get("html") and content_hash == self.content_hash(page_data["html"]):
+            with self._lock:
+                self.stats["unchanged"] += 1
+            return markdown
+
+        return None
+
+    def store(self, url, html, markdown, response_headers=None, links=None):
+        """
+        Store validators, content hash, outlinks and markdown for a URL.
+
+        Args:
+            url: URL of the page
+            html: Fetched HTML (None when the server answered 304)
+            markdown: Converted markdown
+            response_headers: Response headers of the fetch
+            links: Absolute outlinks found on the page
+        """
+        headers = {k.lower(): v for k, v in (response_headers or {}).items()}
+
+        with self._lock:
+            try:
+                conn = self._connection()
+                # Read and write the row in one transaction, so concurrent
+                # crawls storing the same URL do not lose each other's fields
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = conn.execute(
+                        "SELECT etag, last_modified, content_hash, links, markdown FROM pages WHERE url = ?", (url,)
+                    ).fetchone()
+                    etag, last_modified, content_hash, stored_links, stored_markdown = row or (None,) * 5
+
+                    # A 304 response has no body; keep the previous hash and markdown in that case
+                    if html is not None:
+                        new_hash = self.content_hash(html)
+                        if new_hash != content_hash or stored_markdown is None:
+                            stored_markdown = markdown or ""
+                            self.stats["converted"] += 1
+                        content_hash = new_hash
+
+                    if stored_markdown is None:
+                        # Nothing to serve a later 304 from
+                        conn.execute("COMMIT")
+                        return
+
+                    etag = headers.get("etag") or etag
+                    last_modified = headers.get("last-modified") or last_modified
+                    if links is not None:
+                        stored_links = json.dumps(list(links))
+                    size = len(stored_markdown.encode("utf-8", errors="replace")) + len(stored_links or "")
+
+                    conn.execute(
+                        "INSERT OR REPLACE INTO pages "
+                        "(url, etag, last_modified, content_hash, links, markdown, size, fetched_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (url, etag, last_modified, content_hash, stored_links, stored_markdown, size, time.time())
+                    )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error as e:
+                logger.warning(f"Crawl cache write failed for {url}: {e}")
+
+    def _evict(self, conn):
+        """Drop pages older than max_age, then the oldest pages until the cache fits in max_bytes."""
+        evicted = 0
+        if self.max_age is not None:
+            evicted += conn.execute(
+                "DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            freed = 0
+            urls = []
+            for url, size in conn.execute("SELECT url, size FROM pages ORDER BY fetched_at"):
+                urls.append((url,))
+                freed += size
+                if freed >= excess:
+                    break
+            conn.executemany("DELETE FROM pages WHERE url = ?", urls)
+            evicted += len(urls)
+
+        if evicted:
+            self.stats["evicted"] += evicted
+            logger.info(f"Evicted {evicted} pages from the crawl cache")
+
+    def save(self):
+        """
+        Trim the cache to its age and size bounds at the end of a crawl.
+
+        Pages are written as they are stored, so nothing else is persisted here.
+        """
+        with self._lock:
+            try:
+                self._evict(self._connection())
+            except sqlite3.Error as e:
+                logger.error(f"Error trimming crawl cache: {e}")
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @property
+    def skipped_count(self):
+        """Number of pages whose conversion was skipped in this session."""
+        return self.stats["not_modified"] + self.stats["unchanged"]
+
+    def get_stats(self):
+        """Return cache statistics for the current session."""
+        stats = dict(self.stats)
+        stats["skipped"] = self.skipped_count
+        with self._lock:
+            try:
+                stats["cached_urls"] = self._connection().execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            except sqlite3.Error:
+                stats["cached_urls"] = None
+        return stats
@@ -0,0 +1,137 @@
+import json
+import logging
+import re
+import time
+from pathlib import Path
+
+from config.settings import CRAWL_CHECKPOINT_DIR
+
+logger = logging.getLogger(__name__)
+
+# Page fields that are too large or not serializable to checkpoint
+# (page links are checkpointed as part of the crawl's link graph)
+_EXCLUDED_PAGE_FIELDS = {"html", "soup", "markdown", "original_markdown", "links"}
+
+
+class CrawlCheckpointStore:
+    """
+    Local store for crawl checkpoints, keyed by TaskTracker task ID.
+
+    A checkpoint holds everything needed to continue a crawl without
+    refetching completed pages: the frontier queue, the visited set, canonical
+    aliases and a lightweight index of the pages crawled so far (markdown is
+    kept in the pages' local files, not in the checkpoint).
+    """
+
+    def __init__(self, checkpoint_dir=None):
+        """
+        Initialize the checkpoint store.
+
+        Args:
+            checkpoint_dir: Directory to store checkpoints in (defaults to CRAWL_CHECKPOINT_DIR)
+        """
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else CRAWL_CHECKPOINT_DIR
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, task_id):
+        """Return the checkpoint file path for a task."""
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]", "_", str(task_id))
+        return self.checkpoint_dir / f"{safe_id}.json"
+
+    def exists(self, task_id):
+        """Check whether a checkpoint exists for a task."""
+        return self._path(task_id).exists()
+
+    def save(self, task_id, state):
+        """
+        Atomically write a checkpoint for a task.
+
+        Args:
+            task_id: TaskTracker task ID
+            state: JSON-serializable crawl state
+        """
+        state = dict(state)
+        state["task_id"] = task_id
+        state["saved_at"] = time.strftime("%Y-%m-%d %H:%M:%S")
+
+        path = self._path(task_id)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            tmp_path.replace(path)
+            logger.debug(f"Saved crawl checkpoint for task {task_id}")
+        except Exception as e:
+            logger.error(f"Error saving crawl checkpoint for task {task_id}: {e}")
+
+    def load(self, task_id):
+        """
+        Load the checkpoint of a task.
+
+        Args:
+            task_id: TaskTracker task ID
+
+        Returns:
+            dict: Crawl state, or None if there is no readable checkpoint
+        """
+        path = self._path(task_id)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading crawl checkpoint for task {task_id}: {e}")
+            return None
+
+    def delete(self, task_id):
+        """Delete the checkpoint of a task, if any."""
+        try:
+            self._path(task_id).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.error(f"Error deleting crawl checkpoint for task {task_id}: {e}")
+            return False
+
+
+def page_index_entry(page_data):
+    """
+    Build the checkpoint index entry for a crawled page.
+
+    Args:
+        page_data: Page data dictionary produced by the crawler
+
+    Returns:
+        dict: Page data without HTML, soup, markdown or links
+    """
+    entry = {k: v for k, v in page_data.items() if k not in _EXCLUDED_PAGE_FIELDS}
+    if entry.get("local_path"):
+        # Resumed crawls may run from a different working directory
+        entry["local_path"] = str(Path(entry["local_path"]).resolve())
+    return entry
+
+
+def restore_page(entry):
+    """
+    Rebuild page data from a checkpoint index entry.
+
+    The markdown is read back from the page's local file.
+
+    Args:
+        entry: Index entry produced by page_index_entry
+
+    Returns:
+        dict: Page data, or None if the page's markdown file is missing
+    """
+    local_path = entry.get("local_path")
+    if not local_path or not Path(local_path).exists():
+        return None
+
+    page_data = dict(entry)
+    page_data["html"] = None
+    page_data["soup"] = None
+    page_data["markdown"] = Path(local_path).read_text(encoding="utf-8")
+    return page_data
@@ -6,16 +6,33 @@ import time
 import os
 import json
 from pathlib import Path
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse, urljoin, urldefrag
 from concurrent.futures import ThreadPoolExecutor
 import requests
-from urllib.robotparser import RobotFileParser
-from bs4 import BeautifulSoup
+from bs4 import Comment, NavigableString
 from playwright.sync_api import sync_playwright
 from utils.task_tracker import TaskTracker
+from utils.html_parser import parse_html
+from processors.rule_converter import add_title, soup_to_markdown
+from config.settings import NEAR_DUPLICATE_MAX_DISTANCE, CRAWL_CHECKPOINT_INTERVAL, CRAWL_MAX_RETRIES, CRAWL_MAX_PAGE_BYTES
+from web.near_duplicates import NearDuplicateIndex
+from web.url_normalizer import URLNormalizer
+from web.frontier import CrawlFrontier
+from web.link_graph import LinkGraph
+from web.politeness import PolitenessScheduler, THROTTLE_STATUS_CODES
+from web.robots_cache import get_robots_cache
+from web.render_options import RenderOptions
+from web.http_session import get_http_session, content_type_of, is_html_content_type, read_body, decode_html, ResponseTooLarge
+from web.crawl_checkpoint import CrawlCheckpointStore, page_index_entry, restore_page
 
 logger = logging.getLogger(__name__)
 
+# Elements whose text is page chrome rather than content
+NON_CONTENT_TAGS = {'nav', 'header', 'footer', 'aside', 'script', 'style', 'noscript', 'template'}
+
+# URL path extensions of HTML pages; links with other extensions are checked before rendering
+HTML_EXTENSIONS = {'.html', '.htm', '.xhtml', '.shtml', '.php', '.asp', '.aspx', '.jsp', '.cfm'}
+
 # Global executor for background tasks
 _global_executor = None
 
@@ -48,20 +65,35 @@ for sig in (signal.SIGINT, signal.SIGTERM):
 class WebCrawler:
     """Crawls websites and extracts content for dataset creation."""
 
-    def __init__(self, respect_robots_txt=True, rate_limit_delay=1.0):
+    def __init__(self, respect_robots_txt=True, rate_limit_delay=1.0, crawl_cache=None, url_normalizer=None,
+                 robots_cache=None, render_options=None, crawl_archive=None, document_downloader=None,
+                 use_playwright=True):
         """
         Initialize the web crawler.
         
         Args:
             respect_robots_txt: Whether to respect robots.txt rules
             rate_limit_delay: Delay between requests in seconds
+            crawl_cache: Optional CrawlCache used for conditional re-crawls
+            url_normalizer: URLNormalizer deciding which URLs are equivalent
+            robots_cache: RobotsCache to use instead of the process-wide one
+            render_options: RenderOptions for Playwright resource blocking and wait strategy
+            crawl_archive: Optional CrawlArchive that keeps the raw HTML and markdown of crawled pages
+            document_downloader: Optional DocumentDownloader for linked PDFs and other non-HTML
+                documents (without one, non-HTML responses are skipped)
+            use_playwright: Whether pages are rendered with Playwright by default
+                (False fetches them with plain HTTP requests)
         """
         self.task_tracker = TaskTracker()
         self.temp_dir = Path("./temp")
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         
-        # Store all visited URLs to avoid duplicates
+        # Store all visited URLs (by canonical key) to avoid duplicates
         self.visited_urls = set()
+        self.url_normalizer = url_normalizer or URLNormalizer()
+        
+        # Links between the pages of the last crawl
+        self.link_graph = LinkGraph(self.url_normalizer)
         
         # Configure default headers for requests
         self.user_agent = 'othertales-serper/1.0 (https://othertales.com/serper; contact@othertales.com)'
@@ -69,13 +101,32 @@ class WebCrawler:
             'User-Agent': self.user_agent
         }
         
+        # Shared keep-alive session; page bodies are capped while streaming
+        self.session = get_http_session()
+        self.max_page_bytes = CRAWL_MAX_PAGE_BYTES
+        
+        # Non-HTML documents found by the last crawl
+        self.document_downloader = document_downloader
+        self.documents = []
+        
         # Robots.txt handling
         self.respect_robots_txt = respect_robots_txt
-        self.robots_parsers = {}  # Cache for robots.txt parsers
+        self.robots_cache = robots_cache or get_robots_cache(self.user_agent)
+        self.robots_parsers = {}  # Parsers whose rate rules were applied to the scheduler
         
-        # Rate limiting
+        # Rate limiting: per-domain fetch times from robots.txt, latency and throttling responses
         self.rate_limit_delay = rate_limit_delay
-        self.domain_last_access = {}  # Track when we last accessed each domain
+        self.scheduler = PolitenessScheduler(default_delay=rate_limit_delay)
+        
+        # Validator cache for conditional re-crawls
+        self.crawl_cache = crawl_cache
+        
+        # WARC archive of fetched HTML and converted markdown
+        self.crawl_archive = crawl_archive
+        
+        # Browser rendering: blocked resources, wait strategy and render budget
+        self.use_playwright = use_playwright
+        self.render_options = render_options or RenderOptions()
         
         # Status display variables
         self.status_thread = None
@@ -122,7 +173,10 @@ class WebCrawler:
 
     def _get_robots_parser(self, url):
         """
-        Get or create a robots.txt parser for the given URL's domain.
+        Get the robots.txt parser for the given URL's domain.
+        
+        Parsers come from the shared robots.txt cache, so warm crawls do not
+        fetch robots.txt again.
         
         Args:
             url: URL to get robots parser for
@@ -130,29 +184,17 @@ class WebCrawler:
         Returns:
             RobotFileParser instance
         """
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc
-        
-        # Check if we already have a parser for this domain
-        if domain in self.robots_parsers:
-            return self.robots_parsers[domain]
-        
-        # Create a new parser
-        parser = RobotFileParser()
-        robots_url = f"{parsed_url.scheme}://{domain}/robots.txt"
-        
-        try:
-            parser.set_url(robots_url)
-            parser.read()
-            logger.info(f"Loaded robots.txt from {robots_url}")
-        except Exception as e:
-            logger.warning(f"Failed to fetch robots.txt from {robots_url}: {e}")
-            # Create an empty parser that allows everything
-            parser = RobotFileParser()
-            parser.parse(['User-agent: *', 'Allow: /'])
+        domain = urlparse(url).netloc
+        parser = self.robots_cache.get_parser(url)
         
-        # Cache the parser
-        self.robots_parsers[domain] = parser
+        # Honor Crawl-delay and Request-rate directives whenever the parser changes
+        if self.robots_parsers.get(domain) is not parser:
+            self.robots_parsers[domain] = parser
+            self.scheduler.set_robots_rules(
+                domain,
+                crawl_delay=parser.crawl_delay(self.user_agent),
+                request_rate=parser.request_rate(self.user_agent)
+            )
         return parser
     
     def _can_fetch(self, url):
@@ -178,25 +220,59 @@ class WebCrawler:
         Args:
             url: URL to apply rate limiting for
         """
-        # Extract domain
-        domain = urlparse(url).netloc
+        # Wait for the domain's next fetch slot
+        self.scheduler.wait(urlparse(url).netloc)
+    
+    def _record_response(self, url, result, status_code, latency, headers=None):
+        """
+        Report a fetch result to the politeness scheduler.
         
-        # Check if we need to wait
-        current_time = time.time()
-        if domain in self.domain_last_access:
-            last_access_time = self.domain_last_access[domain]
-            elapsed = current_time - last_access_time
+        Args:
+            url: URL that was fetched
+            result: Result dictionary of fetch_page, updated in place
+            status_code: HTTP status code of the response
+            latency: Response time in seconds
+            headers: Response headers
             
-            if elapsed < self.rate_limit_delay:
-                # Need to wait
-                wait_time = self.rate_limit_delay - elapsed
-                logger.debug(f"Rate limiting: waiting {wait_time:.2f}s for {domain}")
-                time.sleep(wait_time)
+        Returns:
+            bool: Whether the server asked the crawler to back off
+        """
+        headers = headers or {}
+        retry_after = headers.get("Retry-After") or headers.get("retry-after")
+        pause = self.scheduler.record_response(urlparse(url).netloc, status_code, latency, retry_after)
         
-        # Update last access time
-        self.domain_last_access[domain] = time.time()
+        result["status_code"] = status_code
+        if status_code in THROTTLE_STATUS_CODES:
+            result["throttled"] = True
+            result["retry_after"] = pause
+            result["error"] = f"Throttled by server (HTTP {status_code})"
+            return True
+        return False
     
-    def _extract_urls(self, soup, base_url, url_patterns=None, current_depth=0, max_depth=None):
+    def _get_page_links(self, soup, base_url):
+        """
+        Get all valid absolute links from a BeautifulSoup object.
+        
+        Args:
+            soup: BeautifulSoup object
+            base_url: URL of the page the soup was parsed from
+            
+        Returns:
+            list: Absolute URLs without fragments, one per canonical URL, in document order
+        """
+        links = []
+        seen = set()
+        for link in soup.find_all('a', href=True):
+            url = link['href']
+            if self._is_valid_url(url, base_url):
+                absolute_url = urldefrag(self._get_absolute_url(url, base_url))[0]
+                key = self.url_normalizer.canonicalize(absolute_url)
+                if key not in seen:
+                    seen.add(key)
+                    links.append(absolute_url)
+        return links
+
+    def _extract_urls(self, soup, base_url, url_patterns=None, current_depth=0, max_depth=None, links=None):
         """
         Extract all valid URLs from a BeautifulSoup object.
         
@@ -206,6 +282,7 @@ class WebCrawler:
             url_patterns: List of regex patterns for URLs to include
             current_depth: Current depth from start URL
             max_depth: Maximum depth to crawl
+            links: Precomputed page links to use instead of parsing the soup
             
         Returns:
             list: List of valid URLs
@@ -215,31 +292,42 @@ class WebCrawler:
             logger.info(f"Reached maximum depth ({max_depth}), stopping extraction of new URLs")
             return []
 
+        if links is None:
+            links = self._get_page_links(soup, base_url)
+
+        return self._filter_urls(links, url_patterns)
+
+    def _filter_urls(self, links, url_patterns=None):
+        """
+        Filter links by robots.txt rules and URL patterns.
+        
+        Args:
+            links: List of absolute URLs
+            url_patterns: List of regex patterns for URLs to include
+            
+        Returns:
+            list: List of URLs that may be crawled
+        """
         urls = []
-        for link in soup.find_all('a', href=True):
-            url = link['href']
-            if self._is_valid_url(url, base_url):
-                absolute_url = self._get_absolute_url(url, base_url)
+        for absolute_url in links:
+            # Check robots.txt permissions
+            if not self._can_fetch(absolute_url):
+                logger.debug(f"Skipping URL disallowed by robots.txt: {absolute_url}")
+                continue
+            
+            # Apply URL pattern filtering if specified
+            if url_patterns:
+                matches = False
+                for pattern in url_patterns:
+                    if re.search(pattern, absolute_url):
+                        matches = True
+                        break
                 
-                # Check robots.txt permissions
-                if not self._can_fetch(absolute_url):
-                    logger.debug(f"Skipping URL disallowed by robots.txt: {absolute_url}")
+                if not matches:
+                    logger.debug(f"Skipping URL that doesn't match patterns: {absolute_url}")
                     continue
-                
-                # Apply URL pattern filtering if specified
-                if url_patterns:
-                    import re
-                    matches = False
-                    for pattern in url_patterns:
-                        if re.search(pattern, absolute_url):
-                            matches = True
-                            break
-                    
-                    if not matches:
-                        logger.debug(f"Skipping URL that doesn't match patterns: {absolute_url}")
-                        continue
-                
-                urls.append(absolute_url)
+            
+            urls.append(absolute_url)
         
         # Remove duplicates while preserving order
         unique_urls = []
@@ -251,18 +339,23 @@ class WebCrawler:
                 
         return unique_urls
 
-    def fetch_page(self, url, use_playwright=True):
+    def fetch_page(self, url, use_playwright=None, conditional=True):
         """
         Fetch a web page using either requests or Playwright.
         
         Args:
             url: URL to fetch
-            use_playwright: Whether to use Playwright (for JavaScript rendering)
+            use_playwright: Whether to use Playwright (for JavaScript rendering);
+                None uses the crawler's use_playwright setting
+            conditional: Send the crawl cache's validators, so unchanged pages
+                are answered with 304 Not Modified
             
         Returns:
             dict: Dictionary with status, content, and soup object
         """
         logger.info(f"Fetching page: {url}")
+        if use_playwright is None:
+            use_playwright = self.use_playwright
         
         # Check robots.txt permissions
         if self.respect_robots_txt and not self._can_fetch(url):
@@ -286,8 +379,39 @@ class WebCrawler:
             "url": url,
             "fetched_at": time.strftime("%Y-%m-%d %H:%M:%S")
         }
-        
+
+        # Conditional request headers from previous crawls
+        conditional_headers = self.crawl_cache.get_conditional_headers(url) if self.crawl_cache and conditional else {}
+
         try:
+            if use_playwright and self._looks_like_document(url):
+                # Check the content type before opening a browser on a likely non-HTML link
+                response = self.session.head(url, headers=self.headers, timeout=30, allow_redirects=True)
+                content_type = content_type_of(response.headers)
+                if response.ok and not is_html_content_type(content_type):
+                    return self._handle_non_html(url, result, None, content_type)
+            
+            if use_playwright and conditional_headers:
+                # Probe with a conditional request before paying for a browser render
+                request_start = time.monotonic()
+                response = self.session.get(
+                    url, headers={**self.headers, **conditional_headers}, timeout=30, stream=True
+                )
+                if self._record_response(url, result, response.status_code,
+                                         time.monotonic() - request_start, response.headers):
+                    response.close()
+                    return result
+                if response.status_code == 304:
+                    response.close()
+                    logger.info(f"Page not modified since last crawl: {url}")
+                    result["status"] = "not_modified"
+                    result["response_headers"] = dict(response.headers)
+                    return result
+                content_type = content_type_of(response.headers)
+                if response.ok and not is_html_content_type(content_type):
+                    return self._handle_non_html(url, result, response, content_type)
+                response.close()
+
             if use_playwright:
                 # Use Playwright for JavaScript-rendered pages
                 with sync_playwright() as p:
@@ -299,13 +423,23 @@ class WebCrawler:
                     # Set viewport size
                     page.set_viewport_size({"width": 1280, "height": 800})
                     
-                    # Navigate to the page
-                    page.goto(url, wait_until="networkidle", timeout=60000)
+                    # Skip images, fonts, trackers and other resources text extraction does not need
+                    render_stats = self.render_options.attach(page, url)
                     
-                    # Wait for page to be fully loaded
-                    page.wait_for_load_state("networkidle")
+                    # Navigate to the page and wait for it within the render budget
+                    request_start = time.monotonic()
+                    response = self.render_options.navigate(page, url)
+                    logger.debug(f"Rendered {url} in {time.monotonic() - request_start:.2f}s, "
+                                 f"blocked {render_stats['blocked']} of "
+                                 f"{render_stats['blocked'] + render_stats['allowed']} requests")
+                    if response:
+                        result["response_headers"] = response.headers
+                        if self._record_response(url, result, response.status,
+                                                 time.monotonic() - request_start, response.headers):
+                            browser.close()
+                            return result
                     
-                    # Get the fully rendered HTML
+                    # Get the rendered HTML
                     html = page.content()
                     
                     # Get page title
@@ -314,8 +448,8 @@ class WebCrawler:
                     # Close browser
                     browser.close()
                     
-                    # Parse the HTML with BeautifulSoup
-                    soup = BeautifulSoup(html, 'html.parser')
+                    # Parse the HTML once; the soup is reused for the rest of the crawl
+                    soup = parse_html(html)
                     
                     result["status"] = "success"
                     result["html"] = html
@@ -332,12 +466,30 @@ class WebCrawler:
                     if canonical and 'href' in canonical.attrs:
                         result["canonical_url"] = canonical['href']
             else:
-                # Use requests for simpler pages
-                response = requests.get(url, headers=self.headers, timeout=30)
-                response.raise_for_status()
+                # Use requests for simpler pages, streaming the body so that
+                # non-HTML and oversized responses are dropped early
+                request_start = time.monotonic()
+                response = self.session.get(url, headers={**self.headers, **conditional_headers}, timeout=30, stream=True)
+                try:
+                    result["response_headers"] = dict(response.headers)
+                    if self._record_response(url, result, response.status_code,
+                                             time.monotonic() - request_start, response.headers):
+                        return result
+                    if response.status_code == 304:
+                        logger.info(f"Page not modified since last crawl: {url}")
+                        result["status"] = "not_modified"
+                        return result
+                    response.raise_for_status()
+                    
+                    content_type = content_type_of(response.headers)
+                    if not is_html_content_type(content_type):
+                        return self._handle_non_html(url, result, response, content_type)
+                    
+                    html = decode_html(read_body(response, self.max_page_bytes), response)
+                finally:
+                    response.close()
                 
-                html = response.text
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = parse_html(html)
                 
                 result["status"] = "success"
                 result["html"] = html
@@ -358,75 +510,295 @@ class WebCrawler:
                 if canonical and 'href' in canonical.attrs:
                     result["canonical_url"] = canonical['href']
         
+        except ResponseTooLarge as e:
+            logger.warning(f"Skipping {url}: {e}")
+            result["error"] = str(e)
         except Exception as e:
             logger.error(f"Error fetching {url}: {e}")
             result["error"] = str(e)
             
         return result
 
-    def html_to_markdown(self, html, url):
+    def _looks_like_document(self, url):
+        """Check whether a URL's file extension suggests a non-HTML document."""
+        suffix = os.path.splitext(urlparse(url).path)[1].lower()
+        return bool(suffix) and suffix not in HTML_EXTENSIONS
+
+    def _handle_non_html(self, url, result, response, content_type):
+        """
+        Route a non-HTML response to the document downloader, or skip it.
+        
+        Args:
+            url: URL that was fetched
+            result: Result dictionary of fetch_page, updated in place
+            response: Open streaming response, or None to let the downloader request the URL
+            content_type: Media type of the response
+            
+        Returns:
+            dict: The updated result, with status 'document' if the document was downloaded
+        """
+        result["content_type"] = content_type
+        if self.document_downloader and self.document_downloader.is_supported(content_type):
+            download = self.document_downloader.download(url, response=response, headers=self.headers)
+            result.update({k: v for k, v in download.items() if k != "fetched_at"})
+            return result
+        
+        if response is not None:
+            response.close()
+        logger.info(f"Skipping non-HTML content ({content_type}): {url}")
+        result["status"] = "skipped"
+        result["error"] = f"Unsupported content type: {content_type}"
+        return result
+
+    def html_to_markdown(self, html, url, soup=None):
         """
         Convert HTML to markdown using jinaai/Reader-LMv2 model.
         
         Args:
             html: HTML content
             url: URL of the page
+            soup: Already parsed HTML, reused by the fallback conversion instead of parsing again
             
         Returns:
             str: Markdown content
         """
         try:
-            # Use our dedicated HTML to Markdown converter
-            from processors.markdown_converter import HTMLMarkdownConverter
-            
-            # Initialize the converter (lazy loading of model when needed)
-            converter = HTMLMarkdownConverter()
+            # Use the process-wide conversion service, which loads the model once
+            from processors.conversion_service import get_conversion_service
             
-            # Create a custom instruction that includes the URL
-            custom_instruction = f"Extract the main content from the given HTML and convert it to Markdown format. Include the source URL: {url}"
+            converter = get_conversion_service()
             
-            # Convert HTML to Markdown
-            markdown = converter.html_to_markdown(
-                html=html,
+            # Convert HTML to Markdown with the default instruction, so simple pages can be
+            # routed to the rule-based converter; the source URL is added here instead
+            markdown = converter.convert(
+                html,
                 clean_html=True,
-                custom_instruction=custom_instruction,
-                max_tokens=4096
+                max_tokens=4096,
+                soup=soup
             )
             
             # If successful, return the markdown
             if markdown and len(markdown) > 10:  # Basic check that we got something usable
-                return markdown
+                return self._add_source_url(markdown, url)
             
             # If markdown is empty or very short, try the fallback method
             logger.warning("Markdown conversion returned minimal content, trying fallback method")
-            return self._fallback_html_to_markdown(html, url)
+            return self._fallback_html_to_markdown(html, url, soup=soup)
             
         except ImportError:
             # Fall back to basic conversion if the converter module is not available
             logger.warning("markdown_converter module not available, using fallback method")
-            return self._fallback_html_to_markdown(html, url)
+            return self._fallback_html_to_markdown(html, url, soup=soup)
             
         except Exception as e:
             logger.error(f"Error converting HTML to markdown: {e}")
             
             # Fallback to basic text extraction
-            return self._fallback_html_to_markdown(html, url)
+            return self._fallback_html_to_markdown(html, url, soup=soup)
+    
+    @staticmethod
+    def _add_source_url(markdown, url):
+        """
+        Add the source URL of a page to its markdown, below the title heading if there is one.
+        
+        Args:
+            markdown: Markdown content
+            url: URL of the page
+            
+        Returns:
+            str: Markdown content with a "Source:" line
+        """
+        if markdown.startswith("# "):
+            title, _, body = markdown.partition("\n")
+            body = body.lstrip("\n")
+            return f"{title}\n\nSource: {url}\n\n{body}"
+        return f"Source: {url}\n\n{markdown}"
     
-    def _fallback_html_to_markdown(self, html, url):
+    def _get_page_markdown(self, page_data, url):
+        """
+        Get the markdown for a fetched page, reusing the crawl cache if the page is unchanged.
+        
+        Args:
+            page_data: Result dictionary returned by fetch_page
+            url: URL of the page
+            
+        Returns:
+            str: Markdown content, or None if the page could not be fetched again
+                after its cached copy disappeared
+        """
+        if self.crawl_cache:
+            markdown = self.crawl_cache.get_unchanged_markdown(url, page_data)
+            if markdown is not None:
+                logger.debug(f"Reusing cached markdown for unchanged page: {url}")
+                page_data["from_cache"] = True
+                if page_data["soup"]:
+                    page_data["links"] = self._get_page_links(page_data["soup"], url)
+                else:
+                    page_data["links"] = (self.crawl_cache.get_entry(url) or {}).get("links", [])
+                return markdown
+            
+            if page_data["status"] == "not_modified":
+                # The cached copy is gone (e.g. evicted since the request was
+                # sent), so the 304 has nothing to reuse; fetch the page in full
+                logger.info(f"No cached copy of not modified page {url}, fetching it again")
+                page_data.update(self.fetch_page(url, conditional=False))
+                if page_data["status"] != "success":
+                    logger.warning(f"Could not fetch {url} again: {page_data.get('error')}")
+                    return None
+
+            page_data["links"] = self._get_page_links(page_data["soup"], url)
+
+        return self.html_to_markdown(page_data["html"], url, soup=page_data.get("soup"))
+
+    def _store_in_cache(self, page_data, markdown):
+        """
+        Store a converted page in the crawl cache.
+        
+        Args:
+            page_data: Result dictionary returned by fetch_page
+            markdown: Final markdown for the page
+        """
+        self.crawl_cache.store(
+            page_data["url"],
+            page_data["html"],
+            markdown,
+            response_headers=page_data.get("response_headers"),
+            links=page_data.get("links")
+        )
+
+    def _release_page(self, page_data):
+        """
+        Drop the HTML and parsed tree of a processed page, keeping only its links.
+
+        Args:
+            page_data: Result dictionary returned by fetch_page
+        """
+        if page_data.get("links") is None and page_data.get("soup"):
+            page_data["links"] = self._get_page_links(page_data["soup"], page_data["url"])
+        page_data["html"] = None
+        page_data["soup"] = None
+
+    def _apply_content_selectors(self, page_data, url, markdown, selectors):
+        """
+        Replace a page's markdown with the conversion of the elements matching AI content selectors.
+        
+        Args:
+            page_data: Page data with a soup
+            url: URL of the page
+            markdown: Markdown of the whole page
+            selectors: CSS selectors of the content to keep
+            
+        Returns:
+            str: Markdown of the selected content, or the original markdown if nothing useful matched
+        """
+        try:
+            soup = page_data["soup"]
+            
+            # Selected elements are moved out of the page, so collect its links first
+            if page_data.get("links") is None:
+                page_data["links"] = self._get_page_links(soup, url)
+            
+            # Apply each selector, moving matches into one container so
+            # they can be converted without parsing the HTML again
+            selected = soup.new_tag("div")
+            for selector in selectors:
+                try:
+                    selected_elements = soup.select(selector)
+                    if selected_elements:
+                        for element in selected_elements:
+                            selected.append(element.extract())
+                        
+                        logger.debug(f"Applied selector '{selector}' found {len(selected_elements)} elements")
+                except Exception as selector_error:
+                    logger.warning(f"Error applying selector '{selector}': {str(selector_error)}")
+            filtered_content = selected.decode_contents() if selected.contents else ""
+            
+            # If we extracted content with selectors, reconvert it to markdown
+            if filtered_content and len(filtered_content) > 10:
+                logger.info(f"Using AI-selected content for {url}")
+                
+                # Convert the filtered HTML to markdown
+                filtered_markdown = self.html_to_markdown(filtered_content, url, soup=selected)
+                
+                # If we got good filtered content, replace the original markdown
+                if filtered_markdown and len(filtered_markdown) > 20:
+                    page_data["ai_filtered"] = True
+                    page_data["original_markdown"] = markdown
+                    page_data["markdown"] = filtered_markdown
+                    return filtered_markdown
+        except Exception as e:
+            logger.error(f"Error applying AI content selectors: {str(e)}")
+        
+        return markdown
+
+    def _save_page(self, page_data, url, markdown):
+        """
+        Write a converted page to the temp directory and drop its HTML.
+        
+        Args:
+            page_data: Page data returned by fetch_page
+            url: URL of the page
+            markdown: Final markdown of the page
+        """
+        parsed_url = urlparse(url)
+        filename = parsed_url.netloc + parsed_url.path.replace('/', '_')
+        if not filename.endswith('.md'):
+            filename += '.md'
+        file_path = self.temp_dir / filename
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(markdown)
+        
+        if self.crawl_cache:
+            self._store_in_cache(page_data, markdown)
+        
+        # Archive the page while its HTML is still available
+        if self.crawl_archive:
+            if page_data.get("links") is None and page_data.get("soup"):
+                page_data["links"] = self._get_page_links(page_data["soup"], url)
+            self.crawl_archive.write_page(page_data, markdown)
+        
+        # The HTML and soup are no longer needed once the page is converted
+        self._release_page(page_data)
+        
+        page_data["markdown"] = markdown
+        page_data["local_path"] = str(file_path)
+
+    def _matches_content_filters(self, page_data, content_filters):
+        """
+        Check whether a page's markdown contains any of the content filter keywords.
+        
+        Args:
+            page_data: Page data with markdown
+            content_filters: Keywords of which at least one must appear
+            
+        Returns:
+            bool: Whether the page matches
+        """
+        markdown = (page_data.get("markdown") or "").lower()
+        if not markdown:
+            return True
+        for filter_pattern in content_filters:
+            if filter_pattern.lower() in markdown:
+                logger.info(f"Content filter '{filter_pattern}' matched for {page_data['url']}")
+                return True
+        logger.info(f"Page content didn't match any content filters, excluding: {page_data['url']}")
+        return False
+
+    def _fallback_html_to_markdown(self, html, url, soup=None):
         """
         Fallback method to convert HTML to Markdown using BeautifulSoup.
         
         Args:
             html: HTML content to convert
             url: URL of the page
+            soup: Already parsed HTML to convert instead of parsing html (left unmodified)
             
         Returns:
-            str: Basic Markdown conversion of the HTML
+            str: Markdown conversion of the HTML
         """
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            for script in soup(["script", "style"]):
-                script.extract()
+            if soup is None:
+                soup = parse_html(html)
             
             # Get the page title
             title = soup.find('title')
@@ -435,54 +807,16 @@ class WebCrawler:
             else:
                 title_text = "Untitled Page"
             
-            # Start markdown with title and URL
-            markdown = f"# {title_text}\n\nSource: {url}\n\n"
-            
-            # Add headings
-            for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                level = int(heading.name[1])
-                markdown += f"{'#' * level} {heading.text.strip()}\n\n"
-                
-                # Add paragraphs after headings
-                next_el = heading.next_sibling
-                while next_el and next_el.name != 'h1' and next_el.name != 'h2' and next_el.name != 'h3':
-                    if next_el.name == 'p':
-                        markdown += f"{next_el.text.strip()}\n\n"
-                    next_el = next_el.next_sibling
-            
-            # Add remaining paragraphs
-            for p in soup.find_all('p'):
-                markdown += f"{p.text.strip()}\n\n"
-            
-            # Add lists
-            for ul in soup.find_all('ul'):
-                for li in ul.find_all('li'):
-                    markdown += f"* {li.text.strip()}\n"
-                markdown += "\n"
-            
-            for ol in soup.find_all('ol'):
-                for i, li in enumerate(ol.find_all('li')):
-                    markdown += f"{i+1}. {li.text.strip()}\n"
-                markdown += "\n"
-            
-            # Add links
-            for a in soup.find_all('a', href=True):
-                link_text = a.text.strip()
-                if link_text:
-                    href = a['href']
-                    if not href.startswith(('http://', 'https://')):
-                        href = urljoin(url, href)
-                    # We're not actually replacing in text since this is a basic fallback
-                    markdown += f"[{link_text}]({href})\n\n"
-            
-            return markdown
+            # The body in document order with links resolved against the page URL, below the
+            # title (unless the page repeats it) and the source URL, as on the converter path
+            return self._add_source_url(add_title(soup_to_markdown(soup, base_url=url), title_text), url)
             
         except Exception as e:
             logger.error(f"Error in fallback HTML to Markdown conversion: {e}")
             
             # Very basic fallback if everything else fails
             try:
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = parse_html(html)
                 for script in soup(["script", "style"]):
                     script.extract()
                 
@@ -597,12 +931,92 @@ class WebCrawler:
             logger.error(f"Error getting crawl instructions: {str(e)}")
             return default_instructions
             
-    def crawl_website(self, start_url, recursive=False, max_pages=None, progress_callback=None, 
+    def _get_main_text(self, soup):
+        """
+        Get the visible main-content text of a page, without navigation and page chrome.
+        
+        Args:
+            soup: BeautifulSoup object
+            
+        Returns:
+            str: Text of the page's main content
+        """
+        root = soup.find('main') or soup.find('article') or soup.body or soup
+        parts = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Comment):
+                continue
+            if isinstance(node, NavigableString):
+                parts.append(str(node))
+            elif node.name not in NON_CONTENT_TAGS:
+                stack.extend(reversed(node.contents))
+        return " ".join(parts)
+
+    def _queue_page_links(self, page_data, frontier, url_patterns=None, max_depth=None, priority_content=None):
+        """
+        Add the unvisited links of a crawled page to the crawl frontier.
+        
+        Args:
+            page_data: Page data with a soup or precomputed links
+            frontier: CrawlFrontier to add the links to
+            url_patterns: List of regex patterns for URLs to include
+            max_depth: Maximum depth to crawl
+            priority_content: Keywords marking links to crawl first
+            
+        Returns:
+            int: Number of prioritized links added to the front of the queue
+        """
+        if not page_data["soup"] and page_data.get("links") is None:
+            return 0
+        
+        # Track current depth for this page
+        current_depth = page_data.get("depth", 0)
+        
+        # Extract URLs with depth and pattern awareness
+        new_urls = self._extract_urls(
+            page_data["soup"], 
+            page_data["url"], 
+            url_patterns=url_patterns,
+            current_depth=current_depth,
+            max_depth=max_depth,
+            links=page_data.get("links")
+        )
+        
+        # Filter out already visited or queued URLs
+        filtered_urls = [u for u in new_urls if not frontier.is_known(u)]
+        
+        if not priority_content:
+            # Standard link handling with depth tracking
+            frontier.push_many(filtered_urls, current_depth + 1)
+            return 0
+        
+        # Links matching any priority pattern go to the front of the queue
+        prioritized_urls = []
+        other_urls = []
+        for link in filtered_urls:
+            if any(pattern.lower() in link.lower() for pattern in priority_content):
+                prioritized_urls.append(link)
+            else:
+                other_urls.append(link)
+        
+        frontier.push_many(prioritized_urls, current_depth + 1, front=True)
+        frontier.push_many(other_urls, current_depth + 1)
+        return len(prioritized_urls)
+
+    def crawl_website(self, start_url, recursive=False, max_pages=None, progress_callback=None,
                       _cancellation_event=None, cleanup_temp=False, user_instructions=None, use_ai_guidance=False,
-                      max_depth=None, content_filters=None, url_patterns=None):
+                      max_depth=None, content_filters=None, url_patterns=None,
+                      near_duplicates=None, near_duplicate_distance=NEAR_DUPLICATE_MAX_DISTANCE,
+                      follow_duplicate_links=False, task_id=None, checkpoint_interval=CRAWL_CHECKPOINT_INTERVAL,
+                      num_workers=None):
         """
         Crawl a website starting from the provided URL.
         
+        This collects the pages produced by iter_crawl; large crawls should
+        consume iter_crawl directly instead of holding every page in memory.
+        
         Args:
             start_url: URL to start crawling from
             recursive: Whether to recursively crawl all linked pages
@@ -615,29 +1029,204 @@ class WebCrawler:
             max_depth: Maximum depth to crawl from the start URL (None means no limit)
             content_filters: List of keywords or patterns to filter content by (inclusive)
             url_patterns: List of regex patterns for URLs to include
-            
+            near_duplicates: How to handle near-duplicate pages: 'drop' skips them,
+                'mark' keeps them with a 'near_duplicate_of' field (None disables detection)
+            near_duplicate_distance: Maximum SimHash Hamming distance for near-duplicates
+            follow_duplicate_links: Whether to expand the outlinks of near-duplicate pages
+            task_id: TaskTracker task ID; enables checkpoints, and the crawl resumes from
+                the task's last checkpoint if one exists
+            checkpoint_interval: Number of pages crawled between checkpoints
+            num_workers: Number of worker processes; more than one shards the crawl
+                across processes with a ShardedCrawler (checkpoints are not supported then)
+        
         Returns:
             list: List of crawled page data
         """
-        # If AI guidance is requested and user instructions are provided, get crawl instructions
+        results = list(self.iter_crawl(
+            start_url,
+            recursive=recursive,
+            max_pages=max_pages,
+            progress_callback=progress_callback,
+            _cancellation_event=_cancellation_event,
+            user_instructions=user_instructions,
+            use_ai_guidance=use_ai_guidance,
+            max_depth=max_depth,
+            content_filters=content_filters,
+            url_patterns=url_patterns,
+            near_duplicates=near_duplicates,
+            near_duplicate_distance=near_duplicate_distance,
+            follow_duplicate_links=follow_duplicate_links,
+            task_id=task_id,
+            checkpoint_interval=checkpoint_interval,
+            keep_checkpoint=not cleanup_temp,
+            num_workers=num_workers
+        ))
+        
+        # Clean up temporary files if requested
+        if cleanup_temp:
+            logger.info("Cleaning up temporary files")
+            for page_data in results:
+                if "local_path" in page_data and page_data["local_path"]:
+                    try:
+                        # Store the markdown in a content field before removing the file
+                        if os.path.exists(page_data["local_path"]):
+                            with open(page_data["local_path"], 'r', encoding='utf-8') as f:
+                                # Make sure we have the content in memory before deleting the file
+                                if "markdown" not in page_data or not page_data["markdown"]:
+                                    page_data["markdown"] = f.read()
+                            
+                            # Remove the file
+                            os.remove(page_data["local_path"])
+                            logger.debug(f"Removed temporary file: {page_data['local_path']}")
+                    except Exception as e:
+                        logger.error(f"Error cleaning up temporary file {page_data.get('local_path')}: {e}")
+        
+        return results
+
+    def _get_ai_crawl_settings(self, user_instructions, start_url, recursive, max_pages, progress_callback=None):
+        """
+        Get AI crawl instructions and apply their overrides to the crawl settings.
+        
+        Args:
+            user_instructions: User's description of what to scrape
+            start_url: URL the crawl starts from
+            recursive: Requested recursive setting
+            max_pages: Requested page limit
+            progress_callback: Function to call with progress updates
+            
+        Returns:
+            tuple: (ai_instructions, recursive, max_pages)
+        """
+        if progress_callback:
+            progress_callback(0, "Getting AI guidance for crawling...")
+        
+        ai_instructions = self.get_crawl_instructions(user_instructions, start_url)
+        
+        # Apply AI instructions to crawler settings
+        if ai_instructions:
+            # Override recursive setting if specified by AI
+            if "should_crawl_recursively" in ai_instructions:
+                recursive = ai_instructions["should_crawl_recursively"]
+            
+            # Override max_pages if specified by AI
+            if "max_pages" in ai_instructions and ai_instructions["max_pages"] > 0:
+                max_pages = ai_instructions["max_pages"]
+            
+            logger.info(f"Using AI-guided crawl settings: recursive={recursive}, max_pages={max_pages}")
+        
+        return ai_instructions, recursive, max_pages
+
+    def _iter_sharded_crawl(self, start_url, num_workers, recursive=False, max_pages=None, progress_callback=None,
+                            _cancellation_event=None, user_instructions=None, use_ai_guidance=False,
+                            task_id=None, **options):
+        """
+        Crawl a website with a ShardedCrawler, yielding pages as the worker processes finish them.
+        
+        Args:
+            start_url: URL to start crawling from
+            num_workers: Number of worker processes
+            options: Link, filter and near-duplicate options of iter_crawl
+            Other arguments are the same as for crawl_website.
+        
+        Yields:
+            dict: Crawled page data
+        """
+        from web.sharded_crawler import ShardedCrawler
+        
+        if task_id:
+            logger.info(f"Sharded crawls are not checkpointed, task {task_id} cannot be resumed mid-crawl")
+        
         ai_instructions = None
         if use_ai_guidance and user_instructions:
-            if progress_callback:
-                progress_callback(0, "Getting AI guidance for crawling...")
-                
-            ai_instructions = self.get_crawl_instructions(user_instructions, start_url)
-            
-            # Apply AI instructions to crawler settings
-            if ai_instructions:
-                # Override recursive setting if specified by AI
-                if "should_crawl_recursively" in ai_instructions:
-                    recursive = ai_instructions["should_crawl_recursively"]
-                    
-                # Override max_pages if specified by AI
-                if "max_pages" in ai_instructions and ai_instructions["max_pages"] > 0:
-                    max_pages = ai_instructions["max_pages"]
-                    
-                logger.info(f"Using AI-guided crawl settings: recursive={recursive}, max_pages={max_pages}")
+            ai_instructions, recursive, max_pages = self._get_ai_crawl_settings(
+                user_instructions, start_url, recursive, max_pages, progress_callback
+            )
+        
+        sharded_crawler = ShardedCrawler(
+            num_workers=num_workers,
+            respect_robots_txt=self.respect_robots_txt,
+            rate_limit_delay=self.rate_limit_delay,
+            archive_dir=self.crawl_archive.archive_dir if self.crawl_archive else None,
+            use_playwright=self.use_playwright
+        )
+        try:
+            yield from sharded_crawler.iter_crawl(
+                [start_url],
+                recursive=recursive,
+                max_pages=max_pages,
+                progress_callback=progress_callback,
+                _cancellation_event=_cancellation_event,
+                ai_instructions=ai_instructions,
+                **options
+            )
+        finally:
+            # The merged outlinks of all shards
+            self.link_graph = sharded_crawler.link_graph
+
+    def iter_crawl(self, start_url, recursive=False, max_pages=None, progress_callback=None,
+                   _cancellation_event=None, user_instructions=None, use_ai_guidance=False,
+                   max_depth=None, content_filters=None, url_patterns=None,
+                   near_duplicates=None, near_duplicate_distance=NEAR_DUPLICATE_MAX_DISTANCE,
+                   follow_duplicate_links=False, task_id=None, checkpoint_interval=CRAWL_CHECKPOINT_INTERVAL,
+                   keep_checkpoint=True, num_workers=None):
+        """
+        Crawl a website, yielding each page as soon as it has been converted.
+        
+        The HTML and parsed tree of a page are released before it is yielded,
+        so yielded pages carry their markdown, metadata, local file path and
+        outgoing links only. The crawler itself keeps just a lightweight index
+        of crawled pages and their links.
+        
+        Args:
+            start_url: URL to start crawling from
+            keep_checkpoint: Whether to keep the task's checkpoint once the crawl finishes
+                (the checkpoint is always kept when the crawl is cancelled)
+            Other arguments are the same as for crawl_website.
+        
+        Yields:
+            dict: Crawled page data
+        """
+        if num_workers and num_workers > 1:
+            yield from self._iter_sharded_crawl(
+                start_url, num_workers,
+                recursive=recursive,
+                max_pages=max_pages,
+                progress_callback=progress_callback,
+                _cancellation_event=_cancellation_event,
+                user_instructions=user_instructions,
+                use_ai_guidance=use_ai_guidance,
+                task_id=task_id,
+                max_depth=max_depth,
+                content_filters=content_filters,
+                url_patterns=url_patterns,
+                near_duplicates=near_duplicates,
+                near_duplicate_distance=near_duplicate_distance,
+                follow_duplicate_links=follow_duplicate_links
+            )
+            return
+        
+        # Load the task's checkpoint if this crawl is being resumed
+        checkpoint_store = CrawlCheckpointStore() if task_id else None
+        checkpoint = checkpoint_store.load(task_id) if checkpoint_store else None
+        if checkpoint and checkpoint.get("start_url") != start_url:
+            logger.warning(f"Ignoring checkpoint of task {task_id}: it was created for {checkpoint.get('start_url')}")
+            checkpoint = None
+        
+        # Load robots.txt in the background while the crawl is being set up
+        if self.respect_robots_txt:
+            self.robots_cache.prefetch([start_url])
+        
+        # If AI guidance is requested and user instructions are provided, get crawl instructions
+        ai_instructions = None
+        if checkpoint:
+            # Reuse the settings the interrupted crawl was running with
+            ai_instructions = checkpoint.get("ai_instructions")
+            recursive = checkpoint.get("recursive", recursive)
+            max_pages = checkpoint.get("max_pages", max_pages)
+        elif use_ai_guidance and user_instructions:
+            ai_instructions, recursive, max_pages = self._get_ai_crawl_settings(
+                user_instructions, start_url, recursive, max_pages, progress_callback
+            )
         
         logger.info(f"Starting crawl at {start_url}, recursive={recursive}")
         
@@ -647,20 +1236,76 @@ class WebCrawler:
             else:
                 progress_callback(0, "Starting crawl")
         
-        # Reset visited URLs
-        self.visited_urls = set()
+        # Frontier of URLs to visit, keyed by canonical URL so equivalent
+        # URLs are only fetched once
+        frontier = CrawlFrontier(self.url_normalizer)
+        self.documents = []
+        self.visited_urls = frontier.visited
+        
+        # Outlinks of every crawled page, used to check crawl completeness
+        link_graph = LinkGraph(self.url_normalizer)
+        self.link_graph = link_graph
+        
+        # Fingerprint index for near-duplicate detection
+        near_duplicate_index = None
+        if near_duplicates:
+            near_duplicate_index = NearDuplicateIndex(max_distance=near_duplicate_distance)
         
-        # Queue of URLs to visit (with depth tracking)
-        to_visit = [(start_url, 0)]  # (url, depth)
+        # Lightweight index of crawled pages (metadata and links, no content)
+        page_index = []
         
-        # List of page data
-        results = []
+        # Number of times each throttled URL has been re-queued
+        retries = {}
         
         # Crawl until queue is empty or max_pages is reached
         page_count = 0
         total_pages = 1  # Initial estimate
         
-        while to_visit and (max_pages is None or page_count < max_pages):
+        if checkpoint:
+            # Restore the crawl state; completed pages are not fetched again
+            frontier.load_state(checkpoint.get("frontier", {}))
+            link_graph.load_state(checkpoint.get("link_graph", {}))
+            for entry in checkpoint.get("results", []):
+                page_data = restore_page(entry)
+                if page_data:
+                    page_index.append(entry)
+                    yield page_data
+                else:
+                    # The page's markdown is gone, so crawl it again
+                    frontier.requeue(entry["url"], entry.get("depth", 0))
+            page_count = checkpoint.get("page_count", len(page_index))
+            total_pages = max(checkpoint.get("total_pages", 1), page_count + len(frontier))
+            if near_duplicate_index:
+                for fingerprint_url, fingerprint in checkpoint.get("fingerprints", {}).items():
+                    near_duplicate_index.add(fingerprint_url, fingerprint)
+            
+            logger.info(f"Resuming crawl of task {task_id}: {page_count} pages done, {len(frontier)} in queue")
+            if progress_callback:
+                progress_callback(
+                    page_count / max(1, total_pages) * 100,
+                    f"Resuming crawl from checkpoint with {page_count} pages already crawled"
+                )
+        else:
+            # Queue the start URL (with depth tracking)
+            frontier.push(start_url, 0)
+        
+        def save_checkpoint(completed=False):
+            """Save the current crawl state for the task."""
+            checkpoint_store.save(task_id, {
+                "start_url": start_url,
+                "recursive": recursive,
+                "max_pages": max_pages,
+                "ai_instructions": ai_instructions,
+                "frontier": frontier.to_state(),
+                "link_graph": link_graph.to_state(),
+                "results": page_index,
+                "page_count": page_count,
+                "total_pages": total_pages,
+                "fingerprints": near_duplicate_index.fingerprints if near_duplicate_index else {},
+                "completed": completed
+            })
+        
+        while frontier and (max_pages is None or page_count < max_pages):
             # Check for cancellation
             if _cancellation_event and _cancellation_event.is_set():
                 logger.info("Crawl cancelled")
@@ -670,256 +1315,214 @@ class WebCrawler:
             
             # Update progress
             if progress_callback:
-                progress_percent = min(95, page_count / max(1, len(to_visit) + page_count) * 100)
-                progress_callback(progress_percent, f"Crawled {page_count} pages, {len(to_visit)} in queue")
+                progress_percent = min(95, page_count / max(1, len(frontier) + page_count) * 100)
+                progress_callback(progress_percent, f"Crawled {page_count} pages, {len(frontier)} in queue")
             
-            # Get next URL to visit (and its depth if available)
-            url_info = to_visit.pop(0)
-            if isinstance(url_info, tuple) and len(url_info) == 2:
-                url, current_depth = url_info
-            else:
-                url = url_info
-                current_depth = 0
-            
-            # Skip if already visited
-            if url in self.visited_urls:
-                continue
+            # Get the next unvisited URL (from the domain that may be fetched
+            # soonest) and its depth
+            next_url = frontier.pop(self.scheduler)
+            if next_url is None:
+                break
+            url, current_depth = next_url
             
             # Mark as visited
-            self.visited_urls.add(url)
+            frontier.mark_visited(url)
             
             # Fetch the page
             page_data = self.fetch_page(url)
             # Add depth information
             page_data["depth"] = current_depth
             
-            if page_data["status"] == "success":
-                # Convert HTML to markdown
-                markdown = self.html_to_markdown(page_data["html"], url)
-                
-                # Generate unique filename
-                parsed_url = urlparse(url)
-                filename = parsed_url.netloc + parsed_url.path.replace('/', '_')
-                if not filename.endswith('.md'):
-                    filename += '.md'
-                
-                # Save to temp directory
-                file_path = self.temp_dir / filename
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(markdown)
+            # Retry throttled pages once the domain's backoff has passed
+            if page_data.get("throttled") and retries.get(url, 0) < CRAWL_MAX_RETRIES:
+                retries[url] = retries.get(url, 0) + 1
+                logger.info(f"Re-queuing throttled page {url} (attempt {retries[url]} of {CRAWL_MAX_RETRIES})")
+                frontier.requeue(url, current_depth)
+                continue
+            
+            # Downloaded documents skip the HTML pipeline
+            if page_data["status"] == "document":
+                self.documents.append(page_data)
+                continue
+            
+            # Register the page's canonical link so aliases are never fetched
+            if page_data.get("canonical_url"):
+                if frontier.add_canonical(url, page_data["canonical_url"]):
+                    logger.info(f"Skipping {url}: canonical page {page_data['canonical_url']} was already crawled")
+                    continue
+            
+            # Check the page text against previously crawled pages
+            if near_duplicate_index and page_data["status"] == "success" and page_data["soup"]:
+                duplicate_of = near_duplicate_index.check(url, self._get_main_text(page_data["soup"]))
+                if duplicate_of:
+                    logger.info(f"Page {url} is a near-duplicate of {duplicate_of}")
+                    page_data["near_duplicate_of"] = duplicate_of
+                    
+                    if near_duplicates == "drop":
+                        if recursive and follow_duplicate_links:
+                            self._queue_page_links(page_data, frontier, url_patterns=url_patterns, max_depth=max_depth)
+                        continue
+            
+            if page_data["status"] in ("success", "not_modified"):
+                # Convert HTML to markdown (reusing the cache for unchanged pages)
+                markdown = self._get_page_markdown(page_data, url)
+                if markdown is None:
+                    continue
                 
                 # Apply content selectors from AI instructions if available
-                if ai_instructions and ai_instructions.get("content_selectors"):
-                    try:
-                        # Create a new soup from the markdown for further processing
-                        filtered_content = ""
-                        soup_copy = page_data["soup"]
-                        
-                        # Apply each selector
-                        for selector in ai_instructions["content_selectors"]:
-                            try:
-                                selected_elements = soup_copy.select(selector)
-                                if selected_elements:
-                                    for element in selected_elements:
-                                        filtered_content += str(element) + "\n\n"
-                                        
-                                    logger.debug(f"Applied selector '{selector}' found {len(selected_elements)} elements")
-                            except Exception as selector_error:
-                                logger.warning(f"Error applying selector '{selector}': {str(selector_error)}")
-                        
-                        # If we extracted content with selectors, reconvert it to markdown
-                        if filtered_content and len(filtered_content) > 10:
-                            logger.info(f"Using AI-selected content for {url}")
-                            
-                            # Convert the filtered HTML to markdown
-                            filtered_markdown = self.html_to_markdown(filtered_content, url)
-                            
-                            # If we got good filtered content, replace the original markdown
-                            if filtered_markdown and len(filtered_markdown) > 20:
-                                page_data["ai_filtered"] = True
-                                page_data["original_markdown"] = markdown
-                                markdown = filtered_markdown
-                                page_data["markdown"] = markdown
-                                
-                                if progress_callback:
-                                    progress_callback(
-                                        page_count / max(1, total_pages) * 100,
-                                        f"Applied {len(ai_instructions['content_selectors'])} AI-guided content selectors"
-                                    )
-                    except Exception as e:
-                        logger.error(f"Error applying AI content selectors: {str(e)}")
+                # (cached markdown has already been filtered on a previous crawl)
+                if ai_instructions and ai_instructions.get("content_selectors") and not page_data.get("from_cache"):
+                    markdown = self._apply_content_selectors(page_data, url, markdown, ai_instructions["content_selectors"])
+                    if page_data.get("ai_filtered") and progress_callback:
+                        progress_callback(
+                            page_count / max(1, total_pages) * 100,
+                            f"Applied {len(ai_instructions['content_selectors'])} AI-guided content selectors"
+                        )
                 
-                # Add to results
-                page_data["markdown"] = markdown
-                page_data["local_path"] = str(file_path)
+                # Save the final markdown and drop the page's HTML
+                self._save_page(page_data, url, markdown)
                 
                 # Add AI guidance information if applicable
                 if ai_instructions:
                     page_data["ai_guided"] = True
                     page_data["extraction_goal"] = ai_instructions.get("extraction_goal", "general")
-                    
-                results.append(page_data)
+                
+                page_index.append(page_index_entry(page_data))
+                link_graph.add_page(url, page_data.get("links"))
                 
                 # Increment page count
                 page_count += 1
                 
+                # Periodically checkpoint the crawl state
+                if checkpoint_store and page_count % max(1, checkpoint_interval) == 0:
+                    save_checkpoint()
+                
                 # Apply content filtering if specified
-                if content_filters and page_data.get("markdown"):
-                    content_match = False
-                    for filter_pattern in content_filters:
-                        if filter_pattern.lower() in page_data["markdown"].lower():
-                            content_match = True
-                            logger.info(f"Content filter '{filter_pattern}' matched for {url}")
-                            break
-                    
-                    if not content_match:
-                        logger.info(f"Page content didn't match any content filters, excluding: {url}")
-                        page_data["filtered_out"] = True
-                        # Keep tracking the URL as visited but don't include in final results
-                        continue
-
+                if content_filters and not self._matches_content_filters(page_data, content_filters):
+                    page_data["filtered_out"] = True
+                
                 # Extract URLs and add to queue if recursive
-                if recursive:
-                    if page_data["soup"]:
-                        # Track current depth for this page
-                        current_depth = page_data.get("depth", 0)
-                        
-                        # Extract URLs with depth and pattern awareness
-                        new_urls = self._extract_urls(
-                            page_data["soup"], 
-                            url, 
-                            url_patterns=url_patterns,
-                            current_depth=current_depth,
-                            max_depth=max_depth
+                # (links of filtered-out pages are not followed)
+                if (recursive and not page_data.get("filtered_out")
+                        and (follow_duplicate_links or not page_data.get("near_duplicate_of"))):
+                    prioritized_count = self._queue_page_links(
+                        page_data,
+                        frontier,
+                        url_patterns=url_patterns,
+                        max_depth=max_depth,
+                        priority_content=ai_instructions.get("priority_content") if ai_instructions else None
+                    )
+                    
+                    if prioritized_count and progress_callback:
+                        progress_callback(
+                            page_count / max(1, total_pages) * 100,
+                            f"Found {prioritized_count} priority links matching AI criteria"
                         )
-                        
-                        # Filter out already visited or queued URLs
-                        filtered_urls = [u for u in new_urls if u not in self.visited_urls and u not in to_visit]
-                        
-                        # Apply AI prioritization if available
-                        if ai_instructions and ai_instructions.get("priority_content"):
-                            prioritized_urls = []
-                            other_urls = []
-                            
-                            for link in filtered_urls:
-                                # Check if link matches any priority content patterns
-                                is_priority = False
-                                for pattern in ai_instructions["priority_content"]:
-                                    if pattern.lower() in link.lower():
-                                        is_priority = True
-                                        break
-                                
-                                if is_priority:
-                                    prioritized_urls.append(link)
-                                else:
-                                    other_urls.append(link)
-                            
-                            # Create URL objects with depth information
-                            prioritized_with_depth = [(url, current_depth + 1) for url in prioritized_urls]
-                            other_with_depth = [(url, current_depth + 1) for url in other_urls]
-                            
-                            # Add prioritized links first
-                            to_visit_with_depth = [(u, d) for u, d in prioritized_with_depth if u not in [x[0] for x in to_visit]]
-                            to_visit_with_depth.extend([(u, d) for u, d in to_visit_with_depth + other_with_depth if u not in [x[0] for x in to_visit]])
-                            
-                            # Update to_visit with the new structure
-                            to_visit = to_visit_with_depth
-                            
-                            if prioritized_urls and progress_callback:
-                                progress_callback(
-                                    page_count / max(1, total_pages) * 100, 
-                                    f"Found {len(prioritized_urls)} priority links matching AI criteria"
-                                )
-                        else:
-                            # Standard link handling with depth tracking
-                            url_with_depth = [(url, current_depth + 1) for url in filtered_urls]
-                            to_visit.extend(url_with_depth)
-                        
-                        # Update total pages estimate
-                        total_pages = max(total_pages, page_count + len(to_visit))
-            
-            # Respect rate limiting
-            time.sleep(1)
+                    
+                    # Update total pages estimate
+                    total_pages = max(total_pages, page_count + len(frontier))
+                
+                yield page_data
         
         # Complete progress
         if progress_callback:
             progress_callback(100, f"Completed crawl of {page_count} pages")
         
-        # Second verification round to ensure no documents are missed
-        if recursive and page_count > 0 and not (_cancellation_event and _cancellation_event.is_set()):
-            logger.info("Starting verification round to check for missed documents")
+        # Check the link graph for linked pages that were never visited
+        cancelled = bool(_cancellation_event and _cancellation_event.is_set())
+        already_verified = bool(checkpoint and checkpoint.get("completed"))
+        if recursive and page_count > 0 and not cancelled and not already_verified:
+            logger.info(
+                f"Checking link graph for missed documents ({len(link_graph)} URLs, {link_graph.edge_count} links)"
+            )
             
             if progress_callback:
                 progress_callback(95, "Verifying crawl completeness")
             
-            # Check if we missed any pages by re-examining all links
-            for page_data in results:
-                if page_data["soup"]:
-                    urls = self._extract_urls(page_data["soup"], page_data["url"])
-                    
-                    for url in urls:
-                        if url not in self.visited_urls:
-                            logger.info(f"Found missed URL during verification: {url}")
-                            
-                            # Fetch the missed page
-                            missed_page = self.fetch_page(url)
-                            
-                            if missed_page["status"] == "success":
-                                # Convert HTML to markdown
-                                markdown = self.html_to_markdown(missed_page["html"], url)
-                                
-                                # Generate unique filename
-                                parsed_url = urlparse(url)
-                                filename = parsed_url.netloc + parsed_url.path.replace('/', '_')
-                                if not filename.endswith('.md'):
-                                    filename += '.md'
-                                
-                                # Save to temp directory
-                                file_path = self.temp_dir / filename
-                                with open(file_path, 'w', encoding='utf-8') as f:
-                                    f.write(markdown)
-                                
-                                # Add to results
-                                missed_page["markdown"] = markdown
-                                missed_page["local_path"] = str(file_path)
-                                results.append(missed_page)
-                                
-                                # Mark as visited
-                                self.visited_urls.add(url)
-            
-            logger.info(f"Verification round complete, final page count: {len(results)}")
+            # A single pass over the links of crawled pages whose links the
+            # main loop followed; pages found here are not followed further
+            sources = {
+                entry["url"]: entry.get("depth", 0)
+                for entry in page_index
+                if not entry.get("filtered_out")
+                and (follow_duplicate_links or not entry.get("near_duplicate_of"))
+                and (max_depth is None or entry.get("depth", 0) < max_depth)
+            }
+            missed = link_graph.missing_from(frontier.visited, sources)
+            allowed = set(self._filter_urls([url for url, _ in missed], url_patterns))
+            for url, depth in missed:
+                if max_pages is not None and page_count >= max_pages:
+                    break
+                if url not in allowed or frontier.is_visited(url):
+                    continue
+                logger.info(f"Found missed URL during verification: {url}")
+                
+                # Fetch the missed page
+                missed_page = self.fetch_page(url)
+                missed_page["depth"] = depth
+                
+                # Mark as visited
+                frontier.mark_visited(url)
+                if missed_page["status"] == "document":
+                    self.documents.append(missed_page)
+                    continue
+                if missed_page.get("canonical_url") and frontier.add_canonical(url, missed_page["canonical_url"]):
+                    continue
+                
+                if near_duplicate_index and missed_page["status"] == "success" and missed_page["soup"]:
+                    duplicate_of = near_duplicate_index.check(url, self._get_main_text(missed_page["soup"]))
+                    if duplicate_of:
+                        missed_page["near_duplicate_of"] = duplicate_of
+                        if near_duplicates == "drop":
+                            logger.info(f"Skipping near-duplicate missed URL {url} (duplicate of {duplicate_of})")
+                            continue
+                
+                if missed_page["status"] in ("success", "not_modified"):
+                    # Convert HTML to markdown
+                    markdown = self._get_page_markdown(missed_page, url)
+                    if markdown is None:
+                        continue
+                    self._save_page(missed_page, url, markdown)
+                    page_index.append(page_index_entry(missed_page))
+                    link_graph.add_page(url, missed_page.get("links"))
+                    page_count += 1
+                    yield missed_page
+            
+            logger.info(f"Verification round complete, final page count: {len(page_index)}")
         
-        # Final progress update
-        if progress_callback:
-            progress_callback(100, f"Completed crawl with {len(results)} pages")
+        # Checkpoint the final state; cancelled crawls resume where they stopped
+        if checkpoint_store:
+            if not keep_checkpoint and not cancelled:
+                checkpoint_store.delete(task_id)
+            else:
+                save_checkpoint(completed=not cancelled)
         
-        # Clean up temporary files if requested
-        if cleanup_temp:
-            logger.info("Cleaning up temporary files")
-            for page_data in results:
-                if "local_path" in page_data and page_data["local_path"]:
-                    try:
-                        # Store the markdown in a content field before removing the file
-                        if os.path.exists(page_data["local_path"]):
-                            with open(page_data["local_path"], 'r', encoding='utf-8') as f:
-                                # Make sure we have the content in memory before deleting the file
-                                if "markdown" not in page_data or not page_data["markdown"]:
-                                    page_data["markdown"] = f.read()
-                            
-                            # Remove the file
-                            os.remove(page_data["local_path"])
-                            logger.debug(f"Removed temporary file: {page_data['local_path']}")
-                    except Exception as e:
-                        logger.error(f"Error cleaning up temporary file {page_data.get('local_path')}: {e}")
+        # Persist the validator cache for the next re-crawl
+        if self.crawl_cache:
+            self.crawl_cache.save()
+            cache_stats = self.crawl_cache.get_stats()
+            logger.info(
+                f"Crawl cache: {cache_stats['skipped']} unchanged pages skipped "
+                f"({cache_stats['not_modified']} not modified, {cache_stats['unchanged']} identical), "
+                f"{cache_stats['converted']} pages converted"
+            )
         
-        return results
+        # Final progress update
+        if progress_callback:
+            if self.crawl_cache and self.crawl_cache.skipped_count:
+                progress_callback(
+                    100,
+                    f"Completed crawl with {len(page_index)} pages ({self.crawl_cache.skipped_count} unchanged pages skipped)"
+                )
+            else:
+                progress_callback(100, f"Completed crawl with {len(page_index)} pages")
 
     def prepare_data_for_dataset(self, crawled_data):
         """
         Prepare crawled data for dataset creation.
         
         Args:
-            crawled_data: List of crawled page data
+            crawled_data: List of crawled page data (pages or downloaded documents)
             
         Returns:
             list: List of file data for dataset creation
@@ -927,15 +1530,17 @@ class WebCrawler:
         file_data_list = []
         
         for page in crawled_data:
+            # Downloaded documents keep their own format for the file processor
+            is_document = page.get("status") == "document"
             file_data = {
                 "path": page["url"],
                 "local_path": page["local_path"],
-                "format": "markdown",
+                "format": Path(page["local_path"]).suffix.lstrip(".") if is_document else "markdown",
                 "url": page["url"],
-                "title": page["title"] or "Unknown Title",
-                "description": page["meta_description"] or "",
+                "title": page.get("title") or "Unknown Title",
+                "description": page.get("meta_description") or "",
                 "fetched_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "content_type": "text/markdown"
+                "content_type": page.get("content_type") if is_document else "text/markdown"
             }
             
             # Add to file data list
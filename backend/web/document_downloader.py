@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+from config.settings import TEMP_DIR, CRAWL_DOCUMENT_TYPES, CRAWL_MAX_DOCUMENT_BYTES
+from web.http_session import get_http_session, content_type_of
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentDownloader:
+    """
+    Downloads non-HTML documents (PDFs, JSON, plain text, ...) linked from crawled sites.
+
+    Documents bypass the HTML pipeline: they are streamed to disk with a
+    size limit and handed to the file processor through their local path.
+    """
+
+    def __init__(self, download_dir=None, document_types=None, max_bytes=CRAWL_MAX_DOCUMENT_BYTES, session=None):
+        """
+        Initialize the downloader.
+
+        Args:
+            download_dir: Directory to save documents in (defaults to TEMP_DIR / 'documents')
+            document_types: Mapping of supported content types to file extensions
+            max_bytes: Largest document to download, in bytes
+            session: requests session to download with (defaults to the crawler's shared session)
+        """
+        self.download_dir = Path(download_dir) if download_dir else TEMP_DIR / "documents"
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        self.document_types = document_types if document_types is not None else CRAWL_DOCUMENT_TYPES
+        self.max_bytes = max_bytes
+        self.session = session or get_http_session()
+
+    def is_supported(self, content_type):
+        """Check whether documents of a content type are downloaded."""
+        return content_type in self.document_types
+
+    def _path_for(self, url, content_type):
+        """Return a unique local path for a document URL."""
+        name = Path(urlparse(url).path).stem or "document"
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+        return self.download_dir / f"{name[:80]}-{digest}{self.document_types[content_type]}"
+
+    def download(self, url, response=None, headers=None, timeout=60):
+        """
+        Stream a document to disk.
+
+        Args:
+            url: URL of the document
+            response: Already opened streaming response to read instead of requesting the URL again
+            headers: Request headers used when the URL has to be requested
+            timeout: Request timeout in seconds
+
+        Returns:
+            dict: Result with status 'document' and the document's local_path, content_type and size,
+                or status 'error' with an error message
+        """
+        result = {"status": "error", "url": url, "fetched_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+        path = None
+        try:
+            if response is None:
+                response = self.session.get(url, headers=headers, timeout=timeout, stream=True)
+                response.raise_for_status()
+
+            content_type = content_type_of(response.headers)
+            result["content_type"] = content_type
+            if not self.is_supported(content_type):
+                result["error"] = f"Unsupported document type: {content_type or 'unknown'}"
+                return result
+
+            declared = response.headers.get("Content-Length")
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                result["error"] = f"Document of {declared} bytes exceeds the limit of {self.max_bytes} bytes"
+                return result
+
+            path = self._path_for(url, content_type)
+            size = 0
+            with open(path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=256 * 1024):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ValueError(f"Document exceeds the limit of {self.max_bytes} bytes")
+                    f.write(chunk)
+
+            logger.info(f"Downloaded {content_type} document {url} ({size} bytes)")
+            result.update({
+                "status": "document",
+                "local_path": str(path),
+                "size": size,
+                "title": Path(urlparse(url).path).name or url,
+            })
+        except Exception as e:
+            logger.warning(f"Error downloading document {url}: {e}")
+            result["error"] = str(e)
+            if path and path.exists():
+                path.unlink()
+        finally:
+            if response is not None:
+                response.close()
+        return result
@@ -0,0 +1,189 @@
+import logging
+from collections import deque
+from urllib.parse import urlsplit
+
+from web.url_normalizer import URLNormalizer
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlFrontier:
+    """
+    Queue of URLs to crawl plus the set of URLs already crawled.
+
+    Both are keyed by the canonical form produced by a URLNormalizer, so a URL
+    that is equivalent to a queued or visited one is rejected before any
+    network I/O. URLs are queued per domain so that a PolitenessScheduler
+    can pick whichever domain may be fetched next.
+    """
+
+    def __init__(self, normalizer=None):
+        """
+        Initialize the frontier.
+
+        Args:
+            normalizer: URLNormalizer used to compute URL keys
+        """
+        self.normalizer = normalizer or URLNormalizer()
+        self.queues = {}  # domain -> deque of (url, depth) tuples
+        self.queued = set()  # keys of queued URLs
+        self.visited = set()  # keys of visited URLs
+        self._size = 0
+
+    def key(self, url):
+        """Return the canonical key for a URL."""
+        return self.normalizer.canonicalize(url)
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    @property
+    def queue(self):
+        """All queued (url, depth) tuples, grouped by domain."""
+        return [entry for domain_queue in self.queues.values() for entry in domain_queue]
+
+    def is_known(self, url):
+        """Check whether a URL is already queued or visited."""
+        key = self.key(url)
+        return key in self.visited or key in self.queued
+
+    def is_visited(self, url):
+        """Check whether a URL has already been visited."""
+        return self.key(url) in self.visited
+
+    def push(self, url, depth=0, front=False):
+        """
+        Add a URL to the queue unless it is already known.
+
+        Args:
+            url: URL to queue
+            depth: Link depth of the URL from the start URL
+            front: Whether to put the URL at the front of the queue
+
+        Returns:
+            bool: Whether the URL was added
+        """
+        key = self.key(url)
+        if key in self.visited or key in self.queued:
+            return False
+
+        self.queued.add(key)
+        domain_queue = self.queues.setdefault(urlsplit(url).netloc, deque())
+        if front:
+            domain_queue.appendleft((url, depth))
+        else:
+            domain_queue.append((url, depth))
+        self._size += 1
+        return True
+
+    def push_many(self, urls, depth=0, front=False):
+        """
+        Add several URLs to the queue, keeping their order.
+
+        Returns:
+            int: Number of URLs added
+        """
+        urls = list(urls)
+        added = 0
+        for url in (reversed(urls) if front else urls):
+            if self.push(url, depth, front=front):
+                added += 1
+        return added
+
+    def _next_domain(self, scheduler=None):
+        """Choose the domain to take the next URL from."""
+        if scheduler is None:
+            return next(iter(self.queues))
+        # The domain that becomes ready first (ties keep queue order)
+        return min(self.queues, key=scheduler.ready_at)
+
+    def pop(self, scheduler=None):
+        """
+        Remove and return the next URL that has not been visited yet.
+
+        Args:
+            scheduler: PolitenessScheduler; if given, the URL is taken from the
+                domain that may be fetched soonest
+
+        Returns:
+            tuple: (url, depth), or None if the queue is empty
+        """
+        while self._size:
+            domain = self._next_domain(scheduler)
+            domain_queue = self.queues[domain]
+            url, depth = domain_queue.popleft()
+            self._size -= 1
+            if not domain_queue:
+                del self.queues[domain]
+
+            key = self.key(url)
+            self.queued.discard(self.normalizer.normalize(url))
+            self.queued.discard(key)
+
+            # The URL may have become an alias of a visited canonical page
+            if key in self.visited:
+                logger.debug(f"Skipping already visited URL: {url}")
+                continue
+            return url, depth
+        return None
+
+    def requeue(self, url, depth=0):
+        """
+        Put a visited URL back in the queue, e.g. to retry a throttled fetch.
+
+        Returns:
+            bool: Whether the URL was added
+        """
+        self.visited.discard(self.key(url))
+        return self.push(url, depth)
+
+    def mark_visited(self, url):
+        """Mark a URL as visited and return its key."""
+        key = self.key(url)
+        self.visited.add(key)
+        return key
+
+    def add_canonical(self, url, canonical_url):
+        """
+        Record a page's canonical link and mark the canonical URL as visited.
+
+        Args:
+            url: URL the page was fetched from
+            canonical_url: Canonical URL declared by the page
+
+        Returns:
+            bool: Whether the canonical page had already been visited under another URL
+        """
+        canonical = self.normalizer.add_alias(url, canonical_url)
+        if not canonical:
+            return False
+
+        already_visited = canonical in self.visited and canonical != self.normalizer.normalize(url)
+        self.visited.add(canonical)
+        return already_visited
+
+    def to_state(self):
+        """Return the frontier as a JSON-serializable dictionary."""
+        return {
+            "queue": [[url, depth] for url, depth in self.queue],
+            "visited": sorted(self.visited),
+            "aliases": dict(self.normalizer.aliases),
+        }
+
+    def load_state(self, state):
+        """
+        Restore the frontier from a dictionary produced by to_state.
+
+        Args:
+            state: Saved frontier state
+        """
+        self.normalizer.aliases.update(state.get("aliases", {}))
+        self.visited.update(state.get("visited", []))
+        self.queues.clear()
+        self.queued.clear()
+        self._size = 0
+        for url, depth in state.get("queue", []):
+            self.push(url, depth)
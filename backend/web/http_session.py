@@ -0,0 +1,125 @@
+import logging
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import CRAWL_HTTP_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Content types handled by the HTML pipeline (a missing Content-Type is treated as HTML)
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+
+# Process-wide session
+_session = None
+_session_lock = threading.Lock()
+
+
+class ResponseTooLarge(Exception):
+    """Raised when a response body exceeds the configured size limit."""
+
+
+def _accept_encoding():
+    """Content codings urllib3 can decode in this environment."""
+    encodings = ["gzip", "deflate"]
+    try:
+        import brotli  # noqa: F401
+        encodings.append("br")
+    except ImportError:
+        pass
+    return ", ".join(encodings)
+
+
+def get_http_session():
+    """
+    Get the process-wide keep-alive session used for crawling.
+
+    Returns:
+        requests.Session: Session with pooled connections and compressed transfer enabled
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=CRAWL_HTTP_POOL_SIZE, pool_maxsize=CRAWL_HTTP_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["Accept-Encoding"] = _accept_encoding()
+            _session = session
+        return _session
+
+
+def content_type_of(headers):
+    """
+    Get the media type of a response, without parameters.
+
+    Args:
+        headers: Response headers
+
+    Returns:
+        str: Lower-case media type, or '' if the response has none
+    """
+    value = (headers or {}).get("Content-Type") or (headers or {}).get("content-type") or ""
+    return value.split(";", 1)[0].strip().lower()
+
+
+def is_html_content_type(content_type):
+    """Check whether a media type is handled by the HTML pipeline."""
+    return not content_type or content_type in HTML_CONTENT_TYPES
+
+
+def read_body(response, max_bytes):
+    """
+    Read a streamed response body, aborting once it exceeds a size limit.
+
+    The limit applies to the decompressed body, so compressed responses
+    cannot expand past it.
+
+    Args:
+        response: Response opened with stream=True
+        max_bytes: Maximum body size in bytes
+
+    Returns:
+        bytes: Response body
+
+    Raises:
+        ResponseTooLarge: If the declared or received size exceeds max_bytes
+    """
+    declared = response.headers.get("Content-Length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise ResponseTooLarge(f"Response of {declared} bytes exceeds the limit of {max_bytes} bytes")
+
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        size += len(chunk)
+        if size > max_bytes:
+            raise ResponseTooLarge(f"Response exceeds the limit of {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def decode_html(body, response):
+    """
+    Decode an HTML body using the charset of the response or the document.
+
+    Args:
+        body: Raw HTML bytes
+        response: Response the body was read from
+
+    Returns:
+        str: Decoded HTML
+    """
+    encoding = requests.utils.get_encoding_from_headers(response.headers)
+    # requests defaults text/* without a charset to ISO-8859-1; prefer the document's own declaration
+    if not encoding or (encoding.lower() == "iso-8859-1" and "charset" not in response.headers.get("Content-Type", "").lower()):
+        match = _META_CHARSET.search(body[:4096])
+        encoding = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return body.decode(encoding, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
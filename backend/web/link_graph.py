@@ -0,0 +1,203 @@
+import logging
+from array import array
+
+from web.url_normalizer import URLNormalizer
+
+logger = logging.getLogger(__name__)
+
+
+class LinkGraph:
+    """
+    Directed graph of the links between crawled pages.
+
+    Every URL is assigned an integer ID the first time it is seen (keyed by
+    its canonical form), and each crawled page stores its outlinks as a
+    compact array of IDs. The graph is built incrementally while crawling,
+    so finding linked pages that were never crawled is a set difference
+    rather than a re-parse of every page.
+    """
+
+    def __init__(self, normalizer=None):
+        """
+        Initialize the link graph.
+
+        Args:
+            normalizer: URLNormalizer used to compute URL keys
+        """
+        self.normalizer = normalizer or URLNormalizer()
+        self.ids = {}  # canonical key -> node ID
+        self.urls = []  # node ID -> URL
+        self.outlinks = {}  # node ID of a crawled page -> array of node IDs
+
+    def __len__(self):
+        return len(self.urls)
+
+    def node_id(self, url):
+        """
+        Get the ID of a URL, assigning a new one if the URL is unknown.
+
+        Args:
+            url: Absolute URL
+
+        Returns:
+            int: Node ID
+        """
+        key = self.normalizer.canonicalize(url)
+        node = self.ids.get(key)
+        if node is None:
+            node = len(self.urls)
+            self.ids[key] = node
+            self.urls.append(url)
+        return node
+
+    def add_page(self, url, links):
+        """
+        Record the outlinks of a crawled page.
+
+        Args:
+            url: URL of the page
+            links: Absolute URLs the page links to
+
+        Returns:
+            int: Node ID of the page
+        """
+        node = self.node_id(url)
+        # Refer to crawled pages by the URL they were fetched from
+        self.urls[node] = url
+        targets = array("i")
+        seen = set()
+        for link in links or ():
+            target = self.node_id(link)
+            if target != node and target not in seen:
+                seen.add(target)
+                targets.append(target)
+        self.outlinks[node] = targets
+        return node
+
+    @property
+    def edge_count(self):
+        """Number of links between pages."""
+        return sum(len(targets) for targets in self.outlinks.values())
+
+    def missing(self, visited):
+        """
+        Find linked URLs that have been neither crawled nor visited.
+
+        Args:
+            visited: Set of canonical keys of visited URLs
+
+        Returns:
+            list: URLs in order of discovery
+        """
+        linked = set()
+        for targets in self.outlinks.values():
+            linked.update(targets)
+        linked.difference_update(self.outlinks)
+
+        missing = []
+        for node in sorted(linked):
+            # Canonical aliases may have been registered after the link was recorded
+            url = self.urls[node]
+            if self.normalizer.canonicalize(url) not in visited:
+                missing.append(url)
+        return missing
+
+    def missing_from(self, visited, sources):
+        """
+        Find unvisited URLs linked from the given crawled pages.
+
+        Args:
+            visited: Set of canonical keys of visited URLs
+            sources: Dictionary mapping URLs of crawled pages to their link depth
+
+        Returns:
+            list: (url, depth) tuples in order of discovery, where depth is one
+                more than the depth of the shallowest page linking to the URL
+        """
+        depths = {}
+        for url, depth in sources.items():
+            node = self.ids.get(self.normalizer.canonicalize(url))
+            for target in self.outlinks.get(node, ()):
+                if target in self.outlinks:
+                    continue
+                if target not in depths or depth + 1 < depths[target]:
+                    depths[target] = depth + 1
+
+        missing = []
+        for node in sorted(depths):
+            url = self.urls[node]
+            if self.normalizer.canonicalize(url) not in visited:
+                missing.append((url, depths[node]))
+        return missing
+
+    def edges(self):
+        """
+        Iterate over the links of the graph.
+
+        Yields:
+            tuple: (source URL, target URL)
+        """
+        for node, targets in self.outlinks.items():
+            source = self.urls[node]
+            for target in targets:
+                yield source, self.urls[target]
+
+    def pagerank(self, damping=0.85, iterations=30, tolerance=1e-6):
+        """
+        Compute PageRank scores over all nodes of the graph.
+
+        Pages without outlinks (including linked pages that were not crawled)
+        spread their rank evenly over all nodes.
+
+        Args:
+            damping: Probability of following a link rather than jumping to a random page
+            iterations: Maximum number of power iterations
+            tolerance: Stop once the total rank change falls below this value
+
+        Returns:
+            dict: URL -> score, with scores summing to 1
+        """
+        count = len(self.urls)
+        if not count:
+            return {}
+
+        ranks = [1.0 / count] * count
+        for _ in range(iterations):
+            dangling = sum(ranks[node] for node in range(count) if not self.outlinks.get(node))
+            base = (1.0 - damping) / count + damping * dangling / count
+            new_ranks = [base] * count
+            for node, targets in self.outlinks.items():
+                if targets:
+                    share = damping * ranks[node] / len(targets)
+                    for target in targets:
+                        new_ranks[target] += share
+
+            change = sum(abs(new - old) for new, old in zip(new_ranks, ranks))
+            ranks = new_ranks
+            if change < tolerance:
+                break
+
+        return {self.urls[node]: rank for node, rank in enumerate(ranks)}
+
+    def to_state(self):
+        """Return the graph as a JSON-serializable dictionary."""
+        return {
+            "urls": list(self.urls),
+            "outlinks": {str(node): targets.tolist() for node, targets in self.outlinks.items()},
+        }
+
+    def load_state(self, state):
+        """
+        Restore the graph from a dictionary produced by to_state.
+
+        Args:
+            state: Saved graph state
+        """
+        self.ids.clear()
+        self.urls = []
+        self.outlinks = {}
+        for url in state.get("urls", []):
+            self.ids.setdefault(self.normalizer.canonicalize(url), len(self.urls))
+            self.urls.append(url)
+        for node, targets in state.get("outlinks", {}).items():
+            self.outlinks[int(node)] = array("i", targets)
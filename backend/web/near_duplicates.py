@@ -0,0 +1,192 @@
+import hashlib
+import logging
+import re
+import threading
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Numpy is optional; it is used to vectorize fingerprint computation
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FINGERPRINT_BITS = 64
+_MASK64 = (1 << FINGERPRINT_BITS) - 1
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Multiplier used to combine word hashes into shingle hashes (odd 64-bit constant)
+_SHINGLE_PRIME = 0x9E3779B97F4A7C15
+
+
+@lru_cache(maxsize=65536)
+def _word_hash(word):
+    """Return a stable 64-bit hash for a single word."""
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _mix64(value):
+    """SplitMix64 finalizer for a Python integer."""
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def _simhash_numpy(word_hashes, shingle_size):
+    """Vectorized SimHash over the shingles of a word hash sequence."""
+    words = np.array(word_hashes, dtype=np.uint64)
+    count = len(words) - shingle_size + 1
+
+    # Combine each window of words into one hash: w0*P^(k-1) ^ ... ^ w(k-1)
+    shingles = np.zeros(count, dtype=np.uint64)
+    prime = np.uint64(_SHINGLE_PRIME)
+    for offset in range(shingle_size):
+        shingles = (shingles * prime) ^ words[offset:offset + count]
+
+    shingles ^= shingles >> np.uint64(30)
+    shingles *= np.uint64(0xBF58476D1CE4E5B9)
+    shingles ^= shingles >> np.uint64(27)
+    shingles *= np.uint64(0x94D049BB133111EB)
+    shingles ^= shingles >> np.uint64(31)
+
+    # Count set bits per position and keep the positions set in most shingles
+    bits = (shingles[:, None] >> np.arange(FINGERPRINT_BITS, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 > count
+    return int(sum(1 << int(i) for i in np.flatnonzero(votes)))
+
+
+def _simhash_python(word_hashes, shingle_size):
+    """Pure-Python SimHash, producing the same result as the numpy version."""
+    count = len(word_hashes) - shingle_size + 1
+    votes = [0] * FINGERPRINT_BITS
+
+    for start in range(count):
+        value = 0
+        for offset in range(shingle_size):
+            value = ((value * _SHINGLE_PRIME) & _MASK64) ^ word_hashes[start + offset]
+        value = _mix64(value)
+
+        bit = 0
+        while value:
+            if value & 1:
+                votes[bit] += 1
+            value >>= 1
+            bit += 1
+
+    fingerprint = 0
+    for bit, set_count in enumerate(votes):
+        if set_count * 2 > count:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def simhash(text, shingle_size=3):
+    """
+    Compute a 64-bit SimHash fingerprint of a text.
+
+    The text is split into lowercase word shingles and each shingle votes on
+    every bit of the fingerprint. Similar texts produce fingerprints with a
+    small Hamming distance.
+
+    Args:
+        text: Text to fingerprint
+        shingle_size: Number of consecutive words per shingle
+
+    Returns:
+        int: 64-bit fingerprint (0 for empty text)
+    """
+    words = _WORD_PATTERN.findall((text or "").lower())
+    if not words:
+        return 0
+
+    word_hashes = [_word_hash(word) for word in words]
+    shingle_size = max(1, min(shingle_size, len(word_hashes)))
+
+    if np is not None:
+        return _simhash_numpy(word_hashes, shingle_size)
+    return _simhash_python(word_hashes, shingle_size)
+
+
+def hamming_distance(a, b):
+    """Return the number of differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateIndex:
+    """
+    Index of SimHash fingerprints for near-duplicate lookups.
+
+    Fingerprints are split into bands so that any fingerprint within
+    max_distance bits of a stored one shares at least one identical band,
+    which keeps lookups independent of the number of pages seen.
+    """
+
+    def __init__(self, max_distance=6, shingle_size=3):
+        """
+        Initialize the index.
+
+        Args:
+            max_distance: Maximum Hamming distance for two pages to be near-duplicates
+            shingle_size: Number of consecutive words per shingle
+        """
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+        self.band_count = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.band_count
+        self.bands = [{} for _ in range(self.band_count)]
+        self.fingerprints = {}  # url -> fingerprint
+        self._lock = threading.Lock()
+
+    def _band_keys(self, fingerprint):
+        """Split a fingerprint into band keys."""
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & mask for i in range(self.band_count)]
+
+    def fingerprint(self, text):
+        """Compute the fingerprint of a text with this index's settings."""
+        return simhash(text, shingle_size=self.shingle_size)
+
+    def find(self, fingerprint):
+        """
+        Find a stored URL whose fingerprint is within max_distance bits.
+
+        Args:
+            fingerprint: Fingerprint to look up
+
+        Returns:
+            str: URL of the near-duplicate page, or None
+        """
+        with self._lock:
+            for band, key in zip(self.bands, self._band_keys(fingerprint)):
+                for url in band.get(key, ()):
+                    if hamming_distance(fingerprint, self.fingerprints[url]) <= self.max_distance:
+                        return url
+        return None
+
+    def add(self, url, fingerprint):
+        """Store the fingerprint of a page."""
+        with self._lock:
+            self.fingerprints[url] = fingerprint
+            for band, key in zip(self.bands, self._band_keys(fingerprint)):
+                band.setdefault(key, []).append(url)
+
+    def check(self, url, text):
+        """
+        Check a page against the index and add it if it is not a near-duplicate.
+
+        Args:
+            url: URL of the page
+            text: Text content of the page
+
+        Returns:
+            str: URL of the page this one duplicates, or None if the page is new
+        """
+        fingerprint = self.fingerprint(text)
+        if fingerprint == 0:
+            return None
+
+        duplicate_of = self.find(fingerprint)
+        if duplicate_of is None:
+            self.add(url, fingerprint)
+        return duplicate_of
@@ -0,0 +1,179 @@
+import email.utils
+import logging
+import threading
+import time
+
+from config.settings import CRAWL_MAX_DELAY, CRAWL_LATENCY_DELAY_FACTOR
+
+logger = logging.getLogger(__name__)
+
+# Response codes that ask the crawler to slow down
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+        now: Current UNIX time (defaults to time.time())
+
+    Returns:
+        float: Seconds to wait, or None if the value cannot be parsed
+    """
+    if value is None:
+        return None
+
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - (now if now is not None else time.time()))
+
+
+class _DomainState:
+    """Politeness state of one domain."""
+
+    __slots__ = ("robots_delay", "latency", "backoff", "next_allowed")
+
+    def __init__(self):
+        self.robots_delay = 0.0  # From Crawl-delay / Request-rate
+        self.latency = None  # Moving average of response times
+        self.backoff = 0.0  # Extra delay after throttling responses
+        self.next_allowed = 0.0  # Monotonic time of the earliest allowed fetch
+
+
+class PolitenessScheduler:
+    """
+    Per-domain politeness scheduler.
+
+    Each domain gets an earliest allowed fetch time, computed from the
+    crawler's default delay, robots.txt Crawl-delay/Request-rate, the
+    domain's observed response latency and any 429/503 Retry-After
+    responses. Crawl loops pick the domain that is ready first instead of
+    sleeping a fixed interval, so one slow or strict host does not hold up
+    the others.
+    """
+
+    def __init__(self, default_delay=1.0, max_delay=CRAWL_MAX_DELAY, latency_factor=CRAWL_LATENCY_DELAY_FACTOR):
+        """
+        Initialize the scheduler.
+
+        Args:
+            default_delay: Minimum delay between requests to the same domain, in seconds
+            max_delay: Upper bound on any per-domain delay, including Retry-After waits
+            latency_factor: Minimum delay as a multiple of the domain's response time
+        """
+        self.default_delay = default_delay
+        self.max_delay = max_delay
+        self.latency_factor = latency_factor
+        self.domains = {}
+        self._lock = threading.Lock()
+
+    def _state(self, domain):
+        state = self.domains.get(domain)
+        if state is None:
+            state = self.domains[domain] = _DomainState()
+        return state
+
+    def _delay(self, state):
+        """Current delay between requests for a domain."""
+        delay = max(self.default_delay, state.robots_delay)
+        if state.latency is not None:
+            delay = max(delay, state.latency * self.latency_factor)
+        return min(self.max_delay, delay + state.backoff)
+
+    def set_robots_rules(self, domain, crawl_delay=None, request_rate=None):
+        """
+        Apply a domain's robots.txt rate directives.
+
+        Args:
+            domain: Domain (host[:port]) the rules apply to
+            crawl_delay: Crawl-delay in seconds, if any
+            request_rate: RequestRate(requests, seconds) tuple, if any
+        """
+        delay = float(crawl_delay) if crawl_delay else 0.0
+        if request_rate and request_rate.requests:
+            delay = max(delay, request_rate.seconds / request_rate.requests)
+
+        with self._lock:
+            self._state(domain).robots_delay = min(self.max_delay, delay)
+        if delay:
+            logger.info(f"Using robots.txt delay of {delay:.2f}s for {domain}")
+
+    def get_delay(self, domain):
+        """Get the current delay between requests for a domain, in seconds."""
+        with self._lock:
+            return self._delay(self._state(domain))
+
+    def ready_at(self, domain):
+        """Get the monotonic time at which a domain may be fetched next."""
+        with self._lock:
+            state = self.domains.get(domain)
+            return state.next_allowed if state else 0.0
+
+    def time_until_ready(self, domain):
+        """Get the number of seconds until a domain may be fetched."""
+        return max(0.0, self.ready_at(domain) - time.monotonic())
+
+    def reserve(self, domain):
+        """
+        Claim the next fetch slot of a domain.
+
+        Returns:
+            float: Seconds the caller must wait before fetching
+        """
+        with self._lock:
+            state = self._state(domain)
+            now = time.monotonic()
+            start = max(now, state.next_allowed)
+            state.next_allowed = start + self._delay(state)
+            return start - now
+
+    def wait(self, domain):
+        """Block until the domain may be fetched, then claim the fetch slot."""
+        wait_time = self.reserve(domain)
+        if wait_time > 0:
+            logger.debug(f"Politeness: waiting {wait_time:.2f}s for {domain}")
+            time.sleep(wait_time)
+
+    def record_response(self, domain, status_code=None, latency=None, retry_after=None):
+        """
+        Update a domain's schedule from a fetch result.
+
+        Args:
+            domain: Domain that was fetched
+            status_code: HTTP status code (None if the request failed)
+            latency: Response time in seconds
+            retry_after: Retry-After header value, if any
+
+        Returns:
+            float: Seconds the domain is paused for, if the response asked the crawler to back off
+        """
+        with self._lock:
+            state = self._state(domain)
+            if latency is not None:
+                state.latency = latency if state.latency is None else 0.7 * state.latency + 0.3 * latency
+
+            if status_code in THROTTLE_STATUS_CODES:
+                # Double the backoff on every throttling response
+                state.backoff = min(self.max_delay, max(1.0, state.backoff * 2))
+                pause = parse_retry_after(retry_after)
+                pause = min(self.max_delay, pause if pause is not None else self._delay(state))
+                state.next_allowed = max(state.next_allowed, time.monotonic() + pause)
+                logger.warning(f"{domain} responded {status_code}, pausing it for {pause:.1f}s")
+                return pause
+
+            if status_code is not None and status_code < 400:
+                # Recover gradually once the domain responds normally again
+                state.backoff /= 2
+                if state.backoff < 0.1:
+                    state.backoff = 0.0
+            return 0.0
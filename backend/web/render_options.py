@@ -0,0 +1,136 @@
+import logging
+import time
+from urllib.parse import urlparse
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from config.settings import (
+    PLAYWRIGHT_WAIT_STRATEGY, PLAYWRIGHT_WAIT_SELECTOR, PLAYWRIGHT_RENDER_BUDGET,
+    PLAYWRIGHT_BLOCKED_RESOURCE_TYPES, PLAYWRIGHT_BLOCKED_DOMAINS, PLAYWRIGHT_BLOCK_THIRD_PARTY
+)
+
+logger = logging.getLogger(__name__)
+
+WAIT_STRATEGIES = ("domcontentloaded", "load", "networkidle", "selector")
+
+
+def _site(host):
+    """Approximate the registrable domain of a host by its last two labels."""
+    labels = (host or "").lower().split(".")
+    return ".".join(labels[-2:])
+
+
+class RenderOptions:
+    """
+    Controls how Playwright renders a page for text extraction.
+
+    Requests for blocked resource types (images, fonts, ...) and blocked
+    hosts are aborted before they hit the network. Navigation only waits
+    for the DOM; the configured wait strategy then runs within what is left
+    of the page's render budget, and the page is used as rendered so far
+    when the budget runs out.
+    """
+
+    def __init__(self, wait_strategy=PLAYWRIGHT_WAIT_STRATEGY, wait_selector=PLAYWRIGHT_WAIT_SELECTOR,
+                 render_budget=PLAYWRIGHT_RENDER_BUDGET, blocked_resource_types=PLAYWRIGHT_BLOCKED_RESOURCE_TYPES,
+                 blocked_domains=PLAYWRIGHT_BLOCKED_DOMAINS, block_third_party=PLAYWRIGHT_BLOCK_THIRD_PARTY):
+        """
+        Initialize render options.
+
+        Args:
+            wait_strategy: One of 'domcontentloaded', 'load', 'networkidle' or 'selector'
+            wait_selector: CSS selector awaited by the 'selector' strategy
+            render_budget: Max seconds spent rendering one page
+            blocked_resource_types: Playwright resource types to abort
+            blocked_domains: Hosts whose requests are aborted, including subdomains
+            block_third_party: Whether to abort requests to hosts outside the page's site
+        """
+        if wait_strategy not in WAIT_STRATEGIES:
+            raise ValueError(f"Unknown wait strategy '{wait_strategy}', expected one of {', '.join(WAIT_STRATEGIES)}")
+        if wait_strategy == "selector" and not wait_selector:
+            raise ValueError("The 'selector' wait strategy needs a wait_selector")
+
+        self.wait_strategy = wait_strategy
+        self.wait_selector = wait_selector
+        self.render_budget = render_budget
+        # The page itself is never blocked
+        self.blocked_resource_types = set(blocked_resource_types or []) - {"document"}
+        self.blocked_domains = tuple(domain.lower().lstrip(".") for domain in blocked_domains or [])
+        self.block_third_party = block_third_party
+
+    def should_block(self, request_url, resource_type, page_host):
+        """
+        Check whether a request made while rendering a page should be aborted.
+
+        Args:
+            request_url: URL of the request
+            resource_type: Playwright resource type of the request
+            page_host: Host of the page being rendered
+
+        Returns:
+            bool: Whether to abort the request
+        """
+        if resource_type in self.blocked_resource_types:
+            return True
+
+        host = (urlparse(request_url).hostname or "").lower()
+        if not host:
+            return False
+        if any(host == domain or host.endswith("." + domain) for domain in self.blocked_domains):
+            return True
+        return self.block_third_party and _site(host) != _site(page_host)
+
+    def attach(self, page, url):
+        """
+        Install request interception on a page.
+
+        Args:
+            page: Playwright page
+            url: URL that will be rendered
+
+        Returns:
+            dict: Counts of blocked and allowed requests, updated while the page loads
+        """
+        page_host = urlparse(url).hostname
+        stats = {"blocked": 0, "allowed": 0}
+
+        def handle(route):
+            request = route.request
+            if self.should_block(request.url, request.resource_type, page_host):
+                stats["blocked"] += 1
+                route.abort()
+            else:
+                stats["allowed"] += 1
+                route.continue_()
+
+        if self.blocked_resource_types or self.blocked_domains or self.block_third_party:
+            page.route("**/*", handle)
+        return stats
+
+    def navigate(self, page, url):
+        """
+        Navigate to a URL and wait for it within the render budget.
+
+        Args:
+            page: Playwright page
+            url: URL to render
+
+        Returns:
+            Response of the navigation, or None
+        """
+        deadline = time.monotonic() + self.render_budget
+        response = page.goto(url, wait_until="domcontentloaded", timeout=self.render_budget * 1000)
+
+        if self.wait_strategy == "domcontentloaded":
+            return response
+
+        # Wait for the rest of the page with whatever budget is left
+        remaining = max(0.001, deadline - time.monotonic()) * 1000
+        try:
+            if self.wait_strategy == "selector":
+                page.wait_for_selector(self.wait_selector, timeout=remaining)
+            else:
+                page.wait_for_load_state(self.wait_strategy, timeout=remaining)
+        except PlaywrightTimeoutError:
+            logger.info(f"Render budget of {self.render_budget}s used up for {url}, using the page as rendered")
+        return response
@@ -0,0 +1,303 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from config.settings import ROBOTS_CACHE_DIR, ROBOTS_CACHE_TTL, ROBOTS_ERROR_TTL, ROBOTS_FETCH_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Largest robots.txt body that is parsed (RFC 9309 requires at least 500 KiB)
+MAX_ROBOTS_BYTES = 512 * 1024
+
+_MAX_AGE_PATTERN = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+# Process-wide cache instance
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _robots_ttl(status_code, headers, default_ttl, error_ttl):
+    """
+    Work out how long a robots.txt response may be cached.
+
+    Args:
+        status_code: HTTP status code, or None if the fetch failed
+        headers: Response headers
+        default_ttl: TTL when the response sets no caching headers
+        error_ttl: TTL for server errors and failed fetches
+
+    Returns:
+        float: Seconds the response stays fresh
+    """
+    if status_code is None or status_code >= 500:
+        return error_ttl
+
+    headers = headers or {}
+    cache_control = headers.get("Cache-Control") or headers.get("cache-control") or ""
+    if "no-store" in cache_control.lower() or "no-cache" in cache_control.lower():
+        return error_ttl
+
+    ttl = default_ttl
+    match = _MAX_AGE_PATTERN.search(cache_control)
+    if match:
+        ttl = int(match.group(1))
+    elif headers.get("Expires") or headers.get("expires"):
+        try:
+            expires = parsedate_to_datetime(headers.get("Expires") or headers.get("expires"))
+            ttl = expires.timestamp() - time.time()
+        except (TypeError, ValueError):
+            pass
+
+    # Never keep robots.txt longer than the default, and not for less than the error TTL
+    return max(error_ttl, min(default_ttl, ttl))
+
+
+def build_parser(status_code, body):
+    """
+    Build a RobotFileParser from a robots.txt response.
+
+    Status codes are handled like urllib's RobotFileParser.read(): 401/403
+    disallow everything, other 4xx responses allow everything, and server
+    errors disallow everything. This is stricter than RFC 9309 for 401/403,
+    which it treats like any other 4xx.
+
+    Failed fetches (status None) allow everything, whereas RFC 9309 treats
+    an unreachable robots.txt as disallow-all. When the host is really down,
+    the page fetches that follow fail anyway. When only robots.txt times out,
+    disallow-all would drop the whole site until the cached failure expires
+    (ROBOTS_ERROR_TTL). Failed fetches are cached only that long and then
+    retried.
+
+    Args:
+        status_code: HTTP status code, or None if the fetch failed
+        body: robots.txt content
+
+    Returns:
+        RobotFileParser: Parser ready for can_fetch checks
+    """
+    parser = RobotFileParser()
+    if status_code is None:
+        parser.allow_all = True
+    elif status_code in (401, 403) or status_code >= 500:
+        parser.disallow_all = True
+    elif status_code >= 400:
+        parser.allow_all = True
+    else:
+        parser.parse((body or "").splitlines())
+    parser.modified()
+    return parser
+
+
+class RobotsCache:
+    """
+    Shared robots.txt cache with TTLs, kept in memory and on disk.
+
+    Entries honor the response's Cache-Control/Expires headers (capped at
+    the default TTL). Missing files, server errors and failed fetches are
+    cached too, so warm crawls add no robots.txt latency. Fetches run on a
+    small thread pool; concurrent lookups of the same site share one fetch.
+    """
+
+    def __init__(self, cache_dir=None, default_ttl=ROBOTS_CACHE_TTL, error_ttl=ROBOTS_ERROR_TTL,
+                 timeout=ROBOTS_FETCH_TIMEOUT, user_agent=None, max_workers=4):
+        """
+        Initialize the robots.txt cache.
+
+        Args:
+            cache_dir: Directory for cached robots.txt files (defaults to ROBOTS_CACHE_DIR)
+            default_ttl: Seconds a robots.txt is cached without caching headers
+            error_ttl: Seconds server errors and failed fetches are cached
+            timeout: Timeout of robots.txt requests in seconds
+            user_agent: User-Agent header of robots.txt requests
+            max_workers: Number of concurrent robots.txt fetches
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else ROBOTS_CACHE_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.default_ttl = default_ttl
+        self.error_ttl = error_ttl
+        self.timeout = timeout
+        self.headers = {"User-Agent": user_agent} if user_agent else {}
+
+        self.entries = {}  # site -> (parser, expires_at)
+        self._inflight = {}  # site -> Future of a running fetch
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="robots")
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def site(url):
+        """Return the scheme://host[:port] a URL's robots.txt belongs to."""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def _path(self, site):
+        """Return the disk cache file of a site."""
+        return self.cache_dir / f"{hashlib.sha1(site.encode('utf-8')).hexdigest()}.json"
+
+    def _load_from_disk(self, site):
+        """Load an unexpired entry from disk, or return None."""
+        path = self._path(site)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except Exception as e:
+            logger.warning(f"Error reading cached robots.txt for {site}: {e}")
+            return None
+
+        if record.get("expires_at", 0) <= time.time():
+            return None
+        return build_parser(record.get("status_code"), record.get("body")), record["expires_at"]
+
+    def _save_to_disk(self, site, status_code, body, expires_at):
+        """Atomically write a fetched robots.txt to disk."""
+        path = self._path(site)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "site": site,
+                    "status_code": status_code,
+                    "body": body,
+                    "fetched_at": time.time(),
+                    "expires_at": expires_at,
+                }, f)
+            tmp_path.replace(path)
+        except Exception as e:
+            logger.warning(f"Error caching robots.txt for {site}: {e}")
+
+    def _fetch(self, site):
+        """Fetch a site's robots.txt and cache the result."""
+        robots_url = f"{site}/robots.txt"
+        status_code, body, headers = None, "", {}
+        try:
+            response = requests.get(robots_url, headers=self.headers, timeout=self.timeout, stream=True)
+            try:
+                status_code = response.status_code
+                headers = response.headers
+                if status_code < 400:
+                    content = response.raw.read(MAX_ROBOTS_BYTES, decode_content=True)
+                    body = content.decode(response.encoding or "utf-8", errors="replace")
+            finally:
+                response.close()
+            logger.info(f"Loaded robots.txt from {robots_url} (HTTP {status_code})")
+        except Exception as e:
+            logger.warning(f"Failed to fetch robots.txt from {robots_url}: {e}")
+
+        parser = build_parser(status_code, body)
+        expires_at = time.time() + _robots_ttl(status_code, headers, self.default_ttl, self.error_ttl)
+        self._save_to_disk(site, status_code, body, expires_at)
+        return parser, expires_at
+
+    def _run_fetch(self, site, future):
+        """Fetch a site's robots.txt on the thread pool and publish the result."""
+        try:
+            entry = self._load_from_disk(site) or self._fetch(site)
+            with self._lock:
+                self.entries[site] = entry
+            future.set_result(entry[0])
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(site, None)
+
+    def _lookup(self, site):
+        """
+        Return a cached parser, or a future for an in-flight fetch.
+
+        Returns:
+            tuple: (parser, future); exactly one of them is set
+        """
+        with self._lock:
+            entry = self.entries.get(site)
+            if entry and entry[1] > time.time():
+                self.hits += 1
+                return entry[0], None
+
+            future = self._inflight.get(site)
+            if future is None:
+                self.misses += 1
+                future = self._inflight[site] = Future()
+                self._executor.submit(self._run_fetch, site, future)
+            return None, future
+
+    def prefetch(self, urls):
+        """
+        Start loading the robots.txt of several sites without waiting.
+
+        Args:
+            urls: URLs whose sites should be loaded
+        """
+        for site in {self.site(url) for url in urls}:
+            self._lookup(site)
+
+    def get_parser(self, url):
+        """
+        Get the robots.txt parser for a URL's site, fetching it if needed.
+
+        Args:
+            url: Any URL on the site
+
+        Returns:
+            RobotFileParser: Parser for the site
+        """
+        parser, future = self._lookup(self.site(url))
+        if parser is not None:
+            return parser
+
+        try:
+            return future.result(timeout=self.timeout * 2)
+        except Exception as e:
+            logger.warning(f"robots.txt lookup for {url} failed: {e}")
+            return build_parser(None, "")
+
+    def can_fetch(self, user_agent, url):
+        """Check whether a user agent may fetch a URL."""
+        return self.get_parser(url).can_fetch(user_agent, url)
+
+    def invalidate(self, url):
+        """Drop the cached robots.txt of a URL's site."""
+        site = self.site(url)
+        with self._lock:
+            self.entries.pop(site, None)
+        try:
+            self._path(site).unlink()
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self):
+        """Get cache statistics."""
+        with self._lock:
+            return {"sites": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+def get_robots_cache(user_agent=None):
+    """
+    Get or create the process-wide robots.txt cache.
+
+    Args:
+        user_agent: User-Agent of robots.txt requests, used when the cache is created
+
+    Returns:
+        RobotsCache: Shared cache
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RobotsCache(user_agent=user_agent)
+        return _cache
@@ -0,0 +1,624 @@
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import time
+import uuid
+import zlib
+from urllib.parse import urlsplit
+
+from config.settings import (
+    TEMP_DIR, CRAWL_WORKERS, CRAWL_SHARD_POLL_INTERVAL, CRAWL_MAX_RETRIES, CRAWL_WORKER_RESTARTS,
+    NEAR_DUPLICATE_MAX_DISTANCE
+)
+from web.crawl_archive import CrawlArchive
+from web.crawl_checkpoint import page_index_entry, restore_page
+from web.link_graph import LinkGraph
+from web.near_duplicates import NearDuplicateIndex
+from web.robots_cache import get_robots_cache
+from web.url_normalizer import URLNormalizer
+
+logger = logging.getLogger(__name__)
+
+SHARD_STRATEGIES = ("url", "domain")
+
+# URL states in the shared frontier
+QUEUED, IN_PROGRESS, DONE = 0, 1, 2
+
+# Queued URLs looked at when choosing the domain that may be fetched first
+_POP_CANDIDATES = 50
+
+
+def shard_for_url(url, num_shards, shard_by="url", key=None):
+    """
+    Get the shard responsible for a URL.
+
+    Uses a stable hash, so every process maps a URL to the same shard.
+
+    Args:
+        url: URL to place
+        num_shards: Number of shards
+        shard_by: 'domain' keeps each domain on one shard, 'url' spreads a domain's URLs over all shards
+        key: Canonical key of the URL (hashed instead of the URL when sharding by URL)
+
+    Returns:
+        int: Shard number
+    """
+    value = urlsplit(url).netloc if shard_by == "domain" else (key or url)
+    return zlib.crc32(value.encode("utf-8")) % num_shards
+
+
+class SQLiteFrontier:
+    """
+    Crawl frontier shared by several processes through a SQLite database.
+
+    Every known URL is one row keyed by its canonical form, so the table is
+    both the queue and the visited set, and INSERT OR IGNORE deduplicates
+    URLs across processes. Each URL belongs to one shard; a frontier
+    opened for a shard only pops that shard's URLs but may push URLs for
+    any shard. Crawled pages are recorded in a second table, from which
+    the coordinator merges the crawl output.
+
+    Implements the parts of the CrawlFrontier interface used by the crawler.
+    """
+
+    def __init__(self, db_path, num_shards=1, shard_by="url", shard=None, normalizer=None,
+                 stop_event=None, poll_interval=CRAWL_SHARD_POLL_INTERVAL):
+        """
+        Open (and create if needed) a shared frontier.
+
+        Args:
+            db_path: Path of the SQLite database
+            num_shards: Number of shards URLs are spread over
+            shard_by: 'url' or 'domain'
+            shard: Shard this frontier pops URLs for (None for the coordinator)
+            normalizer: URLNormalizer used to compute URL keys
+            stop_event: Event that makes pop() give up waiting for work
+            poll_interval: Seconds between checks for new work while the shard is idle
+        """
+        if shard_by not in SHARD_STRATEGIES:
+            raise ValueError(f"Unknown shard strategy '{shard_by}', expected one of {', '.join(SHARD_STRATEGIES)}")
+
+        self.db_path = str(db_path)
+        self.num_shards = max(1, num_shards)
+        self.shard_by = shard_by
+        self.shard = shard
+        self.normalizer = normalizer or URLNormalizer()
+        self.stop_event = stop_event
+        self.poll_interval = poll_interval
+        self._claimed = {}  # url -> key of URLs popped by this process
+
+        self.conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS urls (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                shard INTEGER NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                state INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS urls_by_shard ON urls (shard, state, priority);
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                entry TEXT NOT NULL,
+                links TEXT
+            );
+        """)
+
+    def key(self, url):
+        """Return the canonical key for a URL."""
+        return self.normalizer.canonicalize(url)
+
+    def __len__(self):
+        """Number of queued URLs across all shards."""
+        return self.conn.execute("SELECT COUNT(*) FROM urls WHERE state = ?", (QUEUED,)).fetchone()[0]
+
+    def __bool__(self):
+        return self.has_pending()
+
+    def has_pending(self):
+        """Check whether any shard still has queued or in-progress URLs."""
+        row = self.conn.execute("SELECT 1 FROM urls WHERE state != ? LIMIT 1", (DONE,)).fetchone()
+        return row is not None
+
+    def is_known(self, url):
+        """Check whether a URL is already queued or visited."""
+        return self.conn.execute("SELECT 1 FROM urls WHERE key = ?", (self.key(url),)).fetchone() is not None
+
+    def is_visited(self, url):
+        """Check whether a URL has already been visited."""
+        row = self.conn.execute("SELECT state FROM urls WHERE key = ?", (self.key(url),)).fetchone()
+        return row is not None and row[0] != QUEUED
+
+    def _insert(self, url, depth, front, state=QUEUED, key=None):
+        key = key or self.key(url)
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO urls (key, url, depth, shard, priority, state) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, url, depth, shard_for_url(url, self.num_shards, self.shard_by, key), 1 if front else 0, state)
+        )
+        return cursor.rowcount == 1
+
+    def push(self, url, depth=0, front=False):
+        """
+        Add a URL to its shard's queue unless any process already knows it.
+
+        Args:
+            url: URL to queue
+            depth: Link depth of the URL from the start URL
+            front: Whether to crawl the URL before the shard's other URLs
+
+        Returns:
+            bool: Whether the URL was added
+        """
+        return self._insert(url, depth, front)
+
+    def push_many(self, urls, depth=0, front=False):
+        """
+        Add several URLs in one transaction.
+
+        Returns:
+            int: Number of URLs added
+        """
+        added = 0
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            for url in urls:
+                added += self._insert(url, depth, front)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def _claim(self, scheduler=None):
+        """Atomically move the shard's next URL from queued to in progress."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.conn.execute(
+                "SELECT key, url, depth FROM urls WHERE shard = ? AND state = ? "
+                "ORDER BY priority DESC, rowid LIMIT ?",
+                (self.shard, QUEUED, _POP_CANDIDATES if scheduler else 1)
+            ).fetchall()
+            if not rows:
+                self.conn.execute("COMMIT")
+                return None
+
+            # Prefer the domain that may be fetched soonest (ties keep queue order)
+            row = min(rows, key=lambda r: scheduler.ready_at(urlsplit(r[1]).netloc)) if scheduler else rows[0]
+            self.conn.execute("UPDATE urls SET state = ? WHERE key = ?", (IN_PROGRESS, row[0]))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        self._claimed[row[1]] = row[0]
+        return row[1], row[2]
+
+    def pop(self, scheduler=None):
+        """
+        Claim the next URL of this frontier's shard.
+
+        Waits while the shard is idle but other shards are still crawling,
+        since they may discover URLs for this shard.
+
+        Args:
+            scheduler: PolitenessScheduler; if given, the URL is taken from the
+                domain that may be fetched soonest
+
+        Returns:
+            tuple: (url, depth), or None once the whole crawl has run out of URLs
+        """
+        while not (self.stop_event and self.stop_event.is_set()):
+            claimed = self._claim(scheduler)
+            if claimed:
+                return claimed
+            if not self.has_pending():
+                return None
+            time.sleep(self.poll_interval)
+        return None
+
+    def mark_visited(self, url):
+        """Return the key of a popped URL (claimed URLs are already visited)."""
+        return self._claimed.get(url) or self.key(url)
+
+    def complete(self, url):
+        """Mark a popped URL as done."""
+        key = self._claimed.pop(url, None) or self.key(url)
+        self.conn.execute("UPDATE urls SET state = ? WHERE key = ?", (DONE, key))
+
+    def requeue(self, url, depth=0):
+        """
+        Put a popped URL back in the queue, e.g. to retry a throttled fetch.
+
+        Returns:
+            bool: Whether the URL was re-queued
+        """
+        key = self._claimed.pop(url, None) or self.key(url)
+        cursor = self.conn.execute("UPDATE urls SET state = ?, depth = ? WHERE key = ?", (QUEUED, depth, key))
+        return cursor.rowcount == 1
+
+    def release_shard(self, shard, drop_queued=False):
+        """
+        Mark the URLs a dead worker was crawling as done.
+
+        They are not retried, since fetching one of them may be what killed
+        the worker. With drop_queued the shard's queued URLs are given up
+        too, so the other workers stop waiting for them.
+
+        Args:
+            shard: Shard of the dead worker
+            drop_queued: Also mark the shard's queued URLs as done
+
+        Returns:
+            int: Number of URLs marked as done
+        """
+        states = (IN_PROGRESS, QUEUED) if drop_queued else (IN_PROGRESS,)
+        cursor = self.conn.execute(
+            f"UPDATE urls SET state = ? WHERE shard = ? AND state IN ({','.join('?' * len(states))})",
+            (DONE, shard, *states)
+        )
+        return cursor.rowcount
+
+    def add_canonical(self, url, canonical_url):
+        """
+        Record a page's canonical link and mark the canonical URL as visited.
+
+        Args:
+            url: URL the page was fetched from
+            canonical_url: Canonical URL declared by the page
+
+        Returns:
+            bool: Whether the canonical page was already crawled (or is being crawled) under another URL
+        """
+        canonical = self.normalizer.add_alias(url, canonical_url)
+        if not canonical or canonical == self.normalizer.normalize(url):
+            return False
+
+        if self._insert(canonical_url, 0, False, state=DONE, key=canonical):
+            return False
+        cursor = self.conn.execute(
+            "UPDATE urls SET state = ? WHERE key = ? AND state = ?", (DONE, canonical, QUEUED)
+        )
+        # A queued canonical URL is now covered by this page; otherwise it was crawled elsewhere
+        return cursor.rowcount == 0
+
+    def add_page(self, page_data):
+        """
+        Record a crawled page for the coordinator.
+
+        Args:
+            page_data: Processed page data with a local markdown file
+        """
+        self.conn.execute(
+            "INSERT INTO pages (url, entry, links) VALUES (?, ?, ?)",
+            (page_data["url"], json.dumps(page_index_entry(page_data)), json.dumps(page_data.get("links") or []))
+        )
+
+    def page_count(self):
+        """Number of pages crawled by all shards."""
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def pages_since(self, last_id=0):
+        """
+        Get the pages crawled after a given page ID.
+
+        Args:
+            last_id: ID of the last page already read
+
+        Returns:
+            list: (id, entry, links) tuples in crawl order
+        """
+        rows = self.conn.execute(
+            "SELECT id, entry, links FROM pages WHERE id > ? ORDER BY id", (last_id,)
+        ).fetchall()
+        return [(page_id, json.loads(entry), json.loads(links or "[]")) for page_id, entry, links in rows]
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+
+def _crawl_shard(shard, config, stop_event):
+    """
+    Crawl one shard's URLs until the shared frontier runs out. Runs in a worker process.
+
+    Args:
+        shard: Shard number
+        config: Crawl settings from ShardedCrawler.iter_crawl
+        stop_event: Event set by the coordinator to stop the crawl
+    """
+    from web.crawler import WebCrawler
+
+    crawler_factory = config["crawler_factory"] or WebCrawler
+    crawler = crawler_factory(respect_robots_txt=config["respect_robots_txt"], rate_limit_delay=config["rate_limit_delay"])
+    crawler.use_playwright = config["use_playwright"]
+    if config["archive_dir"]:
+        # Every worker appends to its own archive files in the shared directory
+        crawler.crawl_archive = CrawlArchive(config["archive_dir"])
+    frontier = SQLiteFrontier(
+        config["db_path"], config["num_shards"], config["shard_by"], shard=shard,
+        normalizer=crawler.url_normalizer, stop_event=stop_event
+    )
+    near_duplicate_index = None
+    if config["near_duplicates"]:
+        near_duplicate_index = NearDuplicateIndex(max_distance=config["near_duplicate_distance"])
+
+    ai_instructions = config["ai_instructions"] or {}
+    max_pages = config["max_pages"]
+    retries = {}
+
+    try:
+        while max_pages is None or frontier.page_count() < max_pages:
+            next_url = frontier.pop(crawler.scheduler)
+            if next_url is None:
+                break
+            url, depth = next_url
+
+            try:
+                page_data = crawler.fetch_page(url)
+                page_data["depth"] = depth
+
+                # Retry throttled pages once the domain's backoff has passed
+                if page_data.get("throttled") and retries.get(url, 0) < CRAWL_MAX_RETRIES:
+                    retries[url] = retries.get(url, 0) + 1
+                    frontier.requeue(url, depth)
+                    continue
+
+                if page_data.get("canonical_url") and frontier.add_canonical(url, page_data["canonical_url"]):
+                    logger.info(f"Skipping {url}: canonical page {page_data['canonical_url']} was already crawled")
+                    continue
+
+                # Near-duplicates are detected among the pages of this shard
+                if near_duplicate_index and page_data["status"] == "success" and page_data["soup"]:
+                    duplicate_of = near_duplicate_index.check(url, crawler._get_main_text(page_data["soup"]))
+                    if duplicate_of:
+                        page_data["near_duplicate_of"] = duplicate_of
+                        if config["near_duplicates"] == "drop":
+                            if config["recursive"] and config["follow_duplicate_links"]:
+                                crawler._queue_page_links(page_data, frontier, url_patterns=config["url_patterns"],
+                                                          max_depth=config["max_depth"])
+                            continue
+
+                if page_data["status"] not in ("success", "not_modified"):
+                    continue
+
+                markdown = crawler._get_page_markdown(page_data, url)
+                if markdown is None:
+                    continue
+                if ai_instructions.get("content_selectors") and not page_data.get("from_cache"):
+                    markdown = crawler._apply_content_selectors(page_data, url, markdown,
+                                                                ai_instructions["content_selectors"])
+                crawler._save_page(page_data, url, markdown)
+
+                if ai_instructions:
+                    page_data["ai_guided"] = True
+                    page_data["extraction_goal"] = ai_instructions.get("extraction_goal", "general")
+
+                if config["content_filters"] and not crawler._matches_content_filters(page_data, config["content_filters"]):
+                    page_data["filtered_out"] = True
+
+                if (config["recursive"] and not page_data.get("filtered_out")
+                        and (config["follow_duplicate_links"] or not page_data.get("near_duplicate_of"))):
+                    crawler._queue_page_links(
+                        page_data,
+                        frontier,
+                        url_patterns=config["url_patterns"],
+                        max_depth=config["max_depth"],
+                        priority_content=ai_instructions.get("priority_content")
+                    )
+
+                frontier.add_page(page_data)
+            except Exception as e:
+                logger.error(f"Shard {shard} failed to crawl {url}: {e}")
+            finally:
+                if url in frontier._claimed:
+                    frontier.complete(url)
+    finally:
+        frontier.close()
+        if crawler.crawl_archive:
+            crawler.crawl_archive.close()
+
+
+class ShardedCrawler:
+    """
+    Crawl coordinator that spreads a crawl over several worker processes.
+
+    URLs are assigned to shards by a hash of their domain or their URL, and
+    each worker process crawls one shard with its own WebCrawler, so
+    parsing and markdown conversion run on every core. Workers share the
+    queue and visited set through a SQLiteFrontier, and the coordinator
+    merges the pages they record into one crawl output.
+
+    Sharding by domain suits batches of many sites: each domain is fetched
+    by one process, which keeps per-domain politeness exact. Sharding by URL
+    spreads a single large site over all workers; each worker then waits
+    num_workers times the rate limit delay, so the site sees the same
+    request rate as a single-process crawl.
+    """
+
+    def __init__(self, num_workers=None, shard_by="url", respect_robots_txt=True, rate_limit_delay=1.0,
+                 poll_interval=CRAWL_SHARD_POLL_INTERVAL, crawler_factory=None, archive_dir=None,
+                 use_playwright=True):
+        """
+        Initialize the coordinator.
+
+        Args:
+            num_workers: Number of worker processes (defaults to CRAWL_WORKERS, or the CPU count)
+            shard_by: 'url' or 'domain'
+            respect_robots_txt: Whether workers respect robots.txt rules
+            rate_limit_delay: Delay between requests to the same domain, in seconds
+            poll_interval: Seconds between checks for pages recorded by the workers
+            crawler_factory: Picklable callable building each worker's crawler from
+                respect_robots_txt and rate_limit_delay keyword arguments (defaults to WebCrawler)
+            archive_dir: Directory the workers write CrawlArchive files to (None disables archiving)
+            use_playwright: Whether workers render pages with Playwright
+        """
+        if shard_by not in SHARD_STRATEGIES:
+            raise ValueError(f"Unknown shard strategy '{shard_by}', expected one of {', '.join(SHARD_STRATEGIES)}")
+
+        self.num_workers = max(1, num_workers or CRAWL_WORKERS or os.cpu_count() or 1)
+        self.shard_by = shard_by
+        self.respect_robots_txt = respect_robots_txt
+        self.rate_limit_delay = rate_limit_delay
+        self.poll_interval = poll_interval
+        self.crawler_factory = crawler_factory
+        self.archive_dir = str(archive_dir) if archive_dir else None
+        self.use_playwright = use_playwright
+        self.url_normalizer = URLNormalizer()
+        self.link_graph = LinkGraph(self.url_normalizer)
+
+    def iter_crawl(self, start_urls, recursive=False, max_pages=None, progress_callback=None,
+                   _cancellation_event=None, ai_instructions=None, max_depth=None, content_filters=None,
+                   url_patterns=None, near_duplicates=None, near_duplicate_distance=NEAR_DUPLICATE_MAX_DISTANCE,
+                   follow_duplicate_links=False):
+        """
+        Crawl from one or more start URLs, yielding pages as the workers finish them.
+
+        Args:
+            start_urls: URL or list of URLs to start crawling from
+            ai_instructions: Crawl instructions from WebCrawler.get_crawl_instructions, if any
+            Other arguments are the same as for WebCrawler.crawl_website.
+
+        Yields:
+            dict: Crawled page data (markdown included, HTML released)
+        """
+        if isinstance(start_urls, str):
+            start_urls = [start_urls]
+
+        # Load robots.txt once, so the workers find it in the shared robots cache
+        if self.respect_robots_txt:
+            robots_cache = get_robots_cache()
+            for start_url in start_urls:
+                robots_cache.get_parser(start_url)
+
+        TEMP_DIR.mkdir(parents=True, exist_ok=True)
+        db_path = TEMP_DIR / f"crawl-frontier-{uuid.uuid4().hex}.sqlite"
+        frontier = SQLiteFrontier(db_path, self.num_workers, self.shard_by, normalizer=self.url_normalizer)
+        frontier.push_many(start_urls, 0)
+
+        rate_limit_delay = self.rate_limit_delay
+        if self.shard_by == "url":
+            rate_limit_delay *= self.num_workers
+
+        config = {
+            "db_path": str(db_path),
+            "num_shards": self.num_workers,
+            "shard_by": self.shard_by,
+            "respect_robots_txt": self.respect_robots_txt,
+            "rate_limit_delay": rate_limit_delay,
+            "recursive": recursive,
+            "max_pages": max_pages,
+            "max_depth": max_depth,
+            "content_filters": content_filters,
+            "url_patterns": url_patterns,
+            "near_duplicates": near_duplicates,
+            "near_duplicate_distance": near_duplicate_distance,
+            "follow_duplicate_links": follow_duplicate_links,
+            "ai_instructions": ai_instructions,
+            "crawler_factory": self.crawler_factory,
+            "archive_dir": self.archive_dir,
+            "use_playwright": self.use_playwright,
+        }
+
+        # Spawned workers do not inherit the coordinator's threads and locks
+        context = multiprocessing.get_context("spawn")
+        stop_event = context.Event()
+
+        def start_worker(shard):
+            worker = context.Process(target=_crawl_shard, args=(shard, config, stop_event),
+                                     name=f"crawl-shard-{shard}", daemon=True)
+            worker.start()
+            return worker
+
+        workers = [start_worker(shard) for shard in range(self.num_workers)]
+        restarts = [0] * self.num_workers
+        abandoned = set()
+        logger.info(f"Started {self.num_workers} crawl workers sharded by {self.shard_by}")
+
+        self.link_graph = LinkGraph(self.url_normalizer)
+        page_count = 0
+        last_id = 0
+        try:
+            while True:
+                running = any(worker.is_alive() for worker in workers)
+
+                # A worker that died (e.g. killed for memory) leaves its URLs in
+                # progress; release them so the crawl does not wait forever
+                for shard, worker in enumerate(workers):
+                    if worker.exitcode in (None, 0) or shard in abandoned:
+                        continue
+                    replace = restarts[shard] < CRAWL_WORKER_RESTARTS and not stop_event.is_set()
+                    released = frontier.release_shard(shard, drop_queued=not replace)
+                    if replace:
+                        restarts[shard] += 1
+                        logger.error(f"Crawl worker {worker.name} exited with code {worker.exitcode}; "
+                                     f"skipped {released} URLs it was crawling and restarted it")
+                        workers[shard] = start_worker(shard)
+                        running = True
+                    else:
+                        abandoned.add(shard)
+                        logger.error(f"Crawl worker {worker.name} exited with code {worker.exitcode}; "
+                                     f"gave up its {released} remaining URLs")
+
+                for last_id, entry, links in frontier.pages_since(last_id):
+                    if max_pages is not None and page_count >= max_pages:
+                        continue
+                    page_data = restore_page(entry)
+                    if page_data is None:
+                        logger.warning(f"Markdown of crawled page {entry.get('url')} is missing, skipping it")
+                        continue
+                    page_data["links"] = links
+                    self.link_graph.add_page(page_data["url"], links)
+                    page_count += 1
+                    yield page_data
+
+                if not running:
+                    break
+
+                if _cancellation_event and _cancellation_event.is_set():
+                    logger.info("Crawl cancelled")
+                    stop_event.set()
+                if max_pages is not None and page_count >= max_pages:
+                    stop_event.set()
+
+                if progress_callback:
+                    queued = len(frontier)
+                    progress_callback(
+                        min(95, page_count / max(1, queued + page_count) * 100),
+                        f"Crawled {page_count} pages with {self.num_workers} workers, {queued} in queue"
+                    )
+                time.sleep(self.poll_interval)
+        finally:
+            stop_event.set()
+            for worker in workers:
+                worker.join(timeout=30)
+                if worker.is_alive():
+                    logger.warning(f"Terminating crawl worker {worker.name}")
+                    worker.terminate()
+            frontier.close()
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(f"{db_path}{suffix}")
+                except FileNotFoundError:
+                    pass
+
+        if progress_callback:
+            progress_callback(100, f"Completed crawl with {page_count} pages")
+
+    def crawl(self, start_urls, **kwargs):
+        """
+        Crawl from one or more start URLs and return all pages.
+
+        Args:
+            start_urls: URL or list of URLs to start crawling from
+            **kwargs: Arguments for iter_crawl
+
+        Returns:
+            list: Crawled page data
+        """
+        return list(self.iter_crawl(start_urls, **kwargs))
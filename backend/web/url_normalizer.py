@@ -0,0 +1,160 @@
+import logging
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, urljoin
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only carry tracking information
+DEFAULT_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "yclid",
+    "_ga", "_gl", "_hsenc", "_hsmi", "ref_src", "igshid",
+}
+# Parameters used for tracking on some sites but selecting content on others
+# (e.g. ?ref=<branch> on code hosts); pass them in tracking_params to strip them
+OPTIONAL_TRACKING_PARAMS = {"ref", "si"}
+DEFAULT_TRACKING_PREFIXES = ("utm_",)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class URLNormalizer:
+    """
+    Normalizes URLs so that equivalent addresses map to one crawl key.
+
+    Normalization handles fragments, tracking parameters, case, default ports,
+    trailing slashes and query ordering. Pages that declare a
+    <link rel="canonical"> can be registered as aliases so that later links to
+    any alias resolve to the canonical key without being fetched.
+    """
+
+    def __init__(
+        self,
+        strip_fragment=True,
+        remove_tracking_params=True,
+        tracking_params=None,
+        tracking_prefixes=DEFAULT_TRACKING_PREFIXES,
+        lowercase_path=False,
+        trailing_slash="strip",
+        sort_query=True,
+        strip_index_pages=False,
+    ):
+        """
+        Initialize the URL normalizer.
+
+        Args:
+            strip_fragment: Whether to drop '#fragment' parts
+            remove_tracking_params: Whether to drop tracking query parameters
+            tracking_params: Names of tracking parameters (defaults to DEFAULT_TRACKING_PARAMS)
+            tracking_prefixes: Prefixes of tracking parameter names (e.g. 'utm_')
+            lowercase_path: Whether paths are case-insensitive on the crawled sites
+            trailing_slash: 'strip' to remove, 'add' to append or 'keep' to leave trailing slashes
+            sort_query: Whether to sort query parameters
+            strip_index_pages: Whether '/dir/index.html' is equivalent to '/dir/'
+        """
+        if trailing_slash not in ("strip", "add", "keep"):
+            raise ValueError(f"Invalid trailing_slash rule: {trailing_slash}")
+
+        self.strip_fragment = strip_fragment
+        self.remove_tracking_params = remove_tracking_params
+        self.tracking_params = set(tracking_params) if tracking_params is not None else set(DEFAULT_TRACKING_PARAMS)
+        self.tracking_prefixes = tuple(tracking_prefixes or ())
+        self.lowercase_path = lowercase_path
+        self.trailing_slash = trailing_slash
+        self.sort_query = sort_query
+        self.strip_index_pages = strip_index_pages
+
+        # Map of normalized alias -> normalized canonical URL
+        self.aliases = {}
+        self._lock = threading.Lock()
+
+    def _is_tracking_param(self, name):
+        """Check whether a query parameter name is a tracking parameter."""
+        name = name.lower()
+        return name in self.tracking_params or name.startswith(self.tracking_prefixes)
+
+    def normalize(self, url):
+        """
+        Normalize a URL without applying canonical aliases.
+
+        Args:
+            url: Absolute URL to normalize
+
+        Returns:
+            str: Normalized URL
+        """
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or "").lower()
+
+        # Keep credentials and non-default ports
+        netloc = host
+        if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+            netloc = f"{host}:{parts.port}"
+        if parts.username:
+            credentials = parts.username + (f":{parts.password}" if parts.password else "")
+            netloc = f"{credentials}@{netloc}"
+
+        path = parts.path or "/"
+        if self.lowercase_path:
+            path = path.lower()
+        if self.strip_index_pages:
+            last_segment = path.rsplit("/", 1)[-1]
+            if last_segment in ("index.html", "index.htm", "index.php"):
+                path = path[: -len(last_segment)]
+        if path != "/":
+            if self.trailing_slash == "strip":
+                path = path.rstrip("/") or "/"
+            elif self.trailing_slash == "add" and not path.endswith("/") and "." not in path.rsplit("/", 1)[-1]:
+                path += "/"
+
+        query = parts.query
+        if query and (self.remove_tracking_params or self.sort_query):
+            params = parse_qsl(query, keep_blank_values=True)
+            if self.remove_tracking_params:
+                params = [(k, v) for k, v in params if not self._is_tracking_param(k)]
+            if self.sort_query:
+                params.sort()
+            query = urlencode(params)
+
+        fragment = "" if self.strip_fragment else parts.fragment
+        return urlunsplit((scheme, netloc, path, query, fragment))
+
+    def canonicalize(self, url):
+        """
+        Return the crawl key of a URL: its normalized form, resolved through aliases.
+
+        Args:
+            url: Absolute URL
+
+        Returns:
+            str: Canonical crawl key
+        """
+        normalized = self.normalize(url)
+        with self._lock:
+            return self.aliases.get(normalized, normalized)
+
+    def add_alias(self, url, canonical_url):
+        """
+        Register a page's <link rel="canonical"> target.
+
+        Aliases are only accepted within the same host, so a page cannot
+        redirect the crawl to an unrelated site.
+
+        Args:
+            url: URL the page was fetched from
+            canonical_url: Canonical URL declared by the page (may be relative)
+
+        Returns:
+            str: Canonical key, or None if the alias was rejected
+        """
+        alias = self.normalize(url)
+        canonical = self.canonicalize(urljoin(url, canonical_url))
+
+        if urlsplit(alias).netloc != urlsplit(canonical).netloc:
+            logger.debug(f"Ignoring cross-host canonical link {canonical_url} on {url}")
+            return None
+
+        if alias != canonical:
+            with self._lock:
+                self.aliases[alias] = canonical
+        return canonical
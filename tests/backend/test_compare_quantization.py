@@ -0,0 +1,31 @@
+import pytest
+
+from utils.compare_quantization import run_mode, similarity, summarize
+
+
+class FakeConverter:
+    def __init__(self, suffix=""):
+        self.suffix = suffix
+
+    def html_to_markdown(self, html, max_tokens=None):
+        return f"# Title\n\n{html}{self.suffix}"
+
+
+def test_similarity():
+    assert similarity("a\nb\nc", "a\nb\nc") == 1.0
+    assert similarity("a\nb", "c\nd") == 0.0
+    assert 0 < similarity("a\nb\nc\nd", "a\nb\nc\nx") < 1
+
+
+def test_report_compares_outputs_and_speed():
+    samples = ["<p>one</p>", "<p>two</p>"]
+    full_outputs, full_timings = run_mode(FakeConverter(), samples, max_tokens=16)
+    quantized_outputs, quantized_timings = run_mode(FakeConverter(suffix="\nextra"), samples, max_tokens=16)
+
+    report = summarize(full_outputs, [2.0, 2.0], quantized_outputs, [1.0, 1.0])
+
+    assert len(full_timings) == len(quantized_timings) == 2
+    assert report["documents"] == 2
+    assert report["speedup"] == pytest.approx(2.0)
+    assert report["identical_outputs"] == 0
+    assert 0 < report["min_similarity"] <= report["mean_similarity"] < 1
@@ -0,0 +1,72 @@
+from processors.conversion_cache import ConversionCache
+
+
+def _key(html, **params):
+    return ConversionCache.make_key(html, None, "jinaai/ReaderLM-v2", {"max_tokens": 4096, **params})
+
+
+def test_hits_and_misses_are_counted(tmp_path):
+    cache = ConversionCache(tmp_path / "cache.sqlite3")
+    assert cache.get(_key("<p>a</p>")) is None
+
+    cache.put(_key("<p>a</p>"), "a")
+    assert cache.get(_key("<p>a</p>")) == "a"
+
+    stats = cache.get_stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+
+
+def test_key_covers_instruction_model_and_parameters():
+    base = _key("<p>a</p>")
+    assert base == _key("<p>a</p>")
+    assert base != _key("<p>b</p>")
+    assert base != _key("<p>a</p>", max_tokens=1024)
+    assert base != ConversionCache.make_key("<p>a</p>", "Summarize", "jinaai/ReaderLM-v2", {"max_tokens": 4096})
+    assert base != ConversionCache.make_key("<p>a</p>", None, "other-model", {"max_tokens": 4096})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ConversionCache(tmp_path / "cache.sqlite3", max_bytes=25)
+    cache.put("first", "x" * 10)
+    cache.put("second", "y" * 10)
+    cache.get("first")  # second is now the least recently used entry
+
+    cache.put("third", "z" * 10)
+
+    assert cache.get("second") is None
+    assert cache.get("first") == "x" * 10
+    assert cache.get("third") == "z" * 10
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_entries_persist_across_instances(tmp_path):
+    cache = ConversionCache(tmp_path / "cache.sqlite3")
+    cache.put("key", "# Page")
+    cache.close()
+
+    assert ConversionCache(tmp_path / "cache.sqlite3").get("key") == "# Page"
+
+
+def test_total_size_is_kept_without_scanning_entries(tmp_path):
+    import sqlite3
+
+    # A cache created before the running total existed
+    conn = sqlite3.connect(tmp_path / "cache.sqlite3")
+    conn.execute("CREATE TABLE conversions (key TEXT PRIMARY KEY, markdown TEXT NOT NULL, "
+                 "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+    conn.execute("INSERT INTO conversions VALUES ('old', 'abc', 3, 0)")
+    conn.commit()
+    conn.close()
+
+    cache = ConversionCache(tmp_path / "cache.sqlite3", max_bytes=25)
+    cache.put("first", "x" * 10)
+    cache.put("first", "x" * 5)  # Replacing an entry only counts its new size
+    assert cache.get_stats()["size_bytes"] == 8
+
+    cache.put("second", "y" * 10)
+    cache.put("third", "z" * 10)
+    actual = cache._connection().execute("SELECT SUM(size) FROM conversions").fetchone()[0]
+    assert cache.get_stats()["size_bytes"] == actual <= 25
+
+    cache.clear()
+    assert cache.get_stats()["size_bytes"] == 0
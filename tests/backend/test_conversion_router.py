@@ -0,0 +1,48 @@
+from processors.conversion_router import HEURISTIC, MODEL, ConversionRouter, page_features
+
+ARTICLE = "<main><h1>Guide</h1>" + "".join(
+    f"<h2>Step {i}</h2><p>{'Plain explanatory text. ' * 20}</p><ul><li>One</li><li>Two</li></ul>" for i in range(8)
+) + "</main>"
+
+
+def test_features_of_a_page():
+    features = page_features(
+        "<div><table><tr><td colspan='2'>a</td></tr><tr><td><table><tr><td>b</td></tr></table></td></tr></table>"
+        "<pre><code>x = 1</code></pre><br><img src='a.png'/></div>"
+    )
+    assert features["table_cells"] == 3
+    assert features["spanned_cells"] == 1
+    assert features["nested_tables"] == 1
+    assert features["code_blocks"] == 1
+    assert features["max_depth"] == 7  # div > table > tr > td > table > tr > td; void tags do not nest
+    assert 0 < features["text_ratio"] < 0.2
+
+
+def test_simple_articles_use_the_rules():
+    router = ConversionRouter()
+    assert router.route(ARTICLE) == HEURISTIC
+    assert router.route("<div>" * 5 + "x" + "</div>" * 5) == HEURISTIC  # Small pages always use the rules
+
+
+def test_hard_pages_use_the_model():
+    router = ConversionRouter()
+    layout = "".join(f"<div class='col'><span class='x'><a href='/{i}'>{i}</a></span></div>" for i in range(200))
+    table = "<table>" + "".join(f"<tr><td>{i}</td><td rowspan='2'>v</td></tr>" for i in range(50)) + "</table>"
+
+    assert router.route(layout) == MODEL
+    assert router.route(ARTICLE + table) == MODEL
+    assert router.reasons(page_features(ARTICLE + table)) == ["complex tables"]
+
+
+def test_thresholds_are_configurable_and_stats_recorded(caplog):
+    router = ConversionRouter({"max_elements": 10})
+    with caplog.at_level("INFO"):
+        assert router.route(ARTICLE, label="guide.html") == MODEL
+    assert "Routed guide.html" in caplog.text and "elements > 10" in caplog.text
+
+    router.record(MODEL, 2.0, 4000)
+    router.record(HEURISTIC, 0.01, 1000)
+    stats = router.get_stats()
+    assert stats[MODEL]["pages"] == 1
+    assert stats[HEURISTIC]["share"] == 0.5
+    assert stats[HEURISTIC]["pages_per_second"] == 100
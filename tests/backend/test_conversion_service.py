@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+
+from processors import conversion_service
+from processors.conversion_service import MarkdownConversionService
+
+
+class FakeConverter:
+    """Converter stub that records how often the model is loaded."""
+
+    def __init__(self):
+        self.model = None
+        self.load_attempted = False
+        self.load_count = 0
+        self.threads = set()
+
+    def load_model(self):
+        self.load_attempted = True
+        self.load_count += 1
+        self.model = object()
+        return True
+
+    def html_to_markdown(self, html, **kwargs):
+        self.threads.add(threading.current_thread().name)
+        if html == "boom":
+            raise ValueError("conversion failed")
+        return f"# {html}"
+
+
+def test_model_is_loaded_once_for_all_jobs():
+    converter = FakeConverter()
+    service = MarkdownConversionService(converter)
+
+    results = [service.convert(f"page {i}") for i in range(5)]
+
+    assert results == [f"# page {i}" for i in range(5)]
+    assert converter.load_count == 1
+    assert converter.threads == {"markdown-conversion"}
+    service.shutdown(wait=True)
+
+
+def test_stats_report_queue_depth_and_latency():
+    service = MarkdownConversionService(FakeConverter())
+    futures = [service.submit(f"page {i}") for i in range(3)]
+    for future in futures:
+        future.result(timeout=5)
+
+    with pytest.raises(ValueError):
+        service.convert("boom")
+
+    stats = service.get_stats()
+    assert stats["queue_depth"] == 0
+    assert stats["jobs_completed"] == 3
+    assert stats["jobs_failed"] == 1
+    assert stats["last_job_latency"] is not None
+    assert stats["model_loaded"] is True
+    service.shutdown(wait=True)
+
+
+def test_shut_down_service_rejects_jobs():
+    service = MarkdownConversionService(FakeConverter())
+    service.convert("page")
+    service.shutdown(wait=True)
+
+    with pytest.raises(RuntimeError):
+        service.submit("page")
+
+
+def test_process_wide_service_is_shared():
+    try:
+        assert conversion_service.get_conversion_service() is conversion_service.get_conversion_service()
+        assert conversion_service.get_conversion_stats()["jobs_completed"] == 0
+    finally:
+        conversion_service.shutdown_conversion_service()
+    assert conversion_service.get_conversion_stats() is None
@@ -0,0 +1,76 @@
+import gzip
+
+import pytest
+
+from web.crawl_archive import CrawlArchive, _read_record
+
+
+def _page(url, html, title="Page"):
+    return {
+        "url": url,
+        "html": html,
+        "title": title,
+        "meta_description": "About the page",
+        "status_code": 200,
+        "response_headers": {"Content-Type": "text/html; charset=utf-8", "Content-Encoding": "gzip", "ETag": '"abc"'},
+        "links": [url + "/next"],
+        "depth": 1,
+    }
+
+
+def test_pages_are_readable_by_url(tmp_path):
+    archive = CrawlArchive(tmp_path)
+    archive.write_page(_page("https://a.example/one", "<h1>One</h1>"), "# One")
+    archive.write_page(_page("https://a.example/two", "<h1>Two — ü</h1>"), "# Two — ü")
+
+    assert archive.get_markdown("https://a.example/two") == "# Two — ü"
+    assert archive.get_html("https://a.example/one") == "<h1>One</h1>"
+    assert archive.get_markdown("https://a.example/missing") is None
+
+    # A new instance finds the pages through the index files
+    archive.close()
+    reopened = CrawlArchive(tmp_path)
+    assert reopened.get_html("https://a.example/two") == "<h1>Two — ü</h1>"
+
+
+def test_later_crawls_of_a_url_win(tmp_path):
+    archive = CrawlArchive(tmp_path)
+    archive.write_page(_page("https://a.example/", "<p>old</p>"), "old")
+    archive.write_page(_page("https://a.example/", "<p>new</p>"), "new")
+    assert archive.get_markdown("https://a.example/") == "new"
+
+
+def test_sequential_reading_yields_whole_pages(tmp_path):
+    archive = CrawlArchive(tmp_path, max_file_size=1)  # One file per record
+    archive.write_page(_page("https://a.example/one", "<h1>One</h1>", title="One"), "# One")
+    cached = _page("https://a.example/two", None, title="Two")
+    archive.write_page(cached, "# Two")
+
+    pages = list(archive.iter_pages())
+    assert [page["url"] for page in pages] == ["https://a.example/one", "https://a.example/two"]
+
+    first, second = pages
+    assert first["status_code"] == 200
+    assert first["headers"]["ETag"] == '"abc"'
+    assert "Content-Encoding" not in first["headers"]
+    assert first["html"] == "<h1>One</h1>"
+    assert first["metadata"]["links"] == ["https://a.example/one/next"]
+    assert (second["html"], second["markdown"], second["metadata"]["title"]) == (None, "# Two", "Two")
+
+
+def test_records_are_standard_gzipped_warc(tmp_path):
+    archive = CrawlArchive(tmp_path)
+    archive.write_page(_page("https://a.example/", "<p>x</p>"), "x")
+    archive.close()
+
+    (path,) = archive.archive_files()
+    with gzip.open(path, "rb") as stream:
+        record = _read_record(stream)
+    assert record["headers"]["WARC-Type"] == "response"
+    assert record["headers"]["WARC-Target-URI"] == "https://a.example/"
+    assert record["content"].startswith(b"HTTP/1.1 200")
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        CrawlArchive(tmp_path, compression="brotli")
@@ -0,0 +1,113 @@
+import pytest
+
+from web.crawl_cache import CrawlCache
+
+
+URL = "https://example.com/docs/page"
+HTML = "<html><body><h1>Docs</h1></body></html>"
+
+
+@pytest.fixture
+def crawl_cache(tmp_path):
+    """Fixture to create a CrawlCache in a temporary directory."""
+    return CrawlCache(cache_dir=tmp_path)
+
+
+def test_conditional_headers_empty_for_unknown_url(crawl_cache):
+    assert crawl_cache.get_conditional_headers(URL) == {}
+
+
+def test_conditional_headers_from_stored_validators(crawl_cache):
+    crawl_cache.store(
+        URL, HTML, "# Docs",
+        response_headers={"ETag": '"abc"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"},
+    )
+
+    headers = crawl_cache.get_conditional_headers(URL)
+    assert headers["If-None-Match"] == '"abc"'
+    assert headers["If-Modified-Since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+
+def test_not_modified_reuses_markdown(crawl_cache):
+    crawl_cache.store(URL, HTML, "# Docs", response_headers={"ETag": '"abc"'}, links=["https://example.com/a"])
+
+    markdown = crawl_cache.get_unchanged_markdown(URL, {"status": "not_modified", "html": None})
+    assert markdown == "# Docs"
+    assert crawl_cache.get_entry(URL)["links"] == ["https://example.com/a"]
+    assert crawl_cache.get_stats()["not_modified"] == 1
+    assert crawl_cache.skipped_count == 1
+
+
+def test_identical_content_hash_reuses_markdown(crawl_cache):
+    crawl_cache.store(URL, HTML, "# Docs")
+
+    assert crawl_cache.get_unchanged_markdown(URL, {"status": "success", "html": HTML}) == "# Docs"
+    assert crawl_cache.get_unchanged_markdown(URL, {"status": "success", "html": HTML + " "}) is None
+    assert crawl_cache.get_stats()["unchanged"] == 1
+
+
+def test_store_counts_only_changed_pages(crawl_cache):
+    crawl_cache.store(URL, HTML, "# Docs")
+    crawl_cache.store(URL, HTML, "# Docs")
+    crawl_cache.store(URL, None, None, response_headers={"ETag": '"def"'})
+
+    assert crawl_cache.get_stats()["converted"] == 1
+    assert crawl_cache.get_markdown(URL) == "# Docs"
+    assert crawl_cache.get_entry(URL)["etag"] == '"def"'
+
+
+def test_save_and_reload(tmp_path):
+    cache = CrawlCache(cache_dir=tmp_path)
+    cache.store(URL, HTML, "# Docs", response_headers={"ETag": '"abc"'})
+    cache.save()
+
+    reloaded = CrawlCache(cache_dir=tmp_path)
+    assert reloaded.get_conditional_headers(URL) == {"If-None-Match": '"abc"'}
+    assert reloaded.get_unchanged_markdown(URL, {"status": "success", "html": HTML}) == "# Docs"
+
+
+def test_seeding_cache_records_pages_without_reusing_them(tmp_path):
+    seeding = CrawlCache(cache_dir=tmp_path, reuse=False)
+    seeding.store(URL, HTML, "# Docs", response_headers={"ETag": '"abc"'})
+    seeding.save()
+
+    assert seeding.get_conditional_headers(URL) == {}
+    assert seeding.get_unchanged_markdown(URL, {"status": "success", "html": HTML}) is None
+
+    # The next update finds the seeded entry
+    update = CrawlCache(cache_dir=tmp_path)
+    assert update.get_conditional_headers(URL) == {"If-None-Match": '"abc"'}
+    assert update.get_unchanged_markdown(URL, {"status": "success", "html": HTML}) == "# Docs"
+
+
+def test_concurrent_caches_keep_each_others_pages(tmp_path):
+    first = CrawlCache(cache_dir=tmp_path)
+    second = CrawlCache(cache_dir=tmp_path)
+    first.store(URL, HTML, "# Docs", response_headers={"ETag": '"abc"'})
+    second.store("https://example.com/other", HTML, "# Other", response_headers={"ETag": '"def"'})
+    second.save()
+    first.save()
+
+    reloaded = CrawlCache(cache_dir=tmp_path)
+    assert reloaded.get_conditional_headers(URL) == {"If-None-Match": '"abc"'}
+    assert reloaded.get_conditional_headers("https://example.com/other") == {"If-None-Match": '"def"'}
+
+
+def test_old_and_excess_pages_are_evicted(tmp_path, monkeypatch):
+    import web.crawl_cache as crawl_cache_module
+
+    cache = CrawlCache(cache_dir=tmp_path, max_age=3600, max_bytes=100)
+    now = 1_000_000.0
+    monkeypatch.setattr(crawl_cache_module.time, "time", lambda: now)
+    cache.store("https://example.com/old", HTML, "# Old")
+    now += 7200
+    for number in range(3):
+        cache.store(f"https://example.com/{number}", HTML, "x" * 40)
+        now += 1
+    cache.save()
+
+    assert cache.get_markdown("https://example.com/old") is None
+    assert cache.get_markdown("https://example.com/0") is None
+    assert cache.get_markdown("https://example.com/1") == "x" * 40
+    assert cache.get_markdown("https://example.com/2") == "x" * 40
+    assert cache.get_stats()["evicted"] == 2
@@ -0,0 +1,71 @@
+import pytest
+
+from web.crawl_checkpoint import CrawlCheckpointStore, page_index_entry, restore_page
+from web.frontier import CrawlFrontier
+
+
+@pytest.fixture
+def checkpoint_store(tmp_path):
+    """Fixture to create a CrawlCheckpointStore in a temporary directory."""
+    return CrawlCheckpointStore(checkpoint_dir=tmp_path / "checkpoints")
+
+
+def test_save_load_delete(checkpoint_store):
+    assert checkpoint_store.load("scrape_1") is None
+
+    checkpoint_store.save("scrape_1", {"start_url": "https://example.com", "page_count": 3})
+    state = checkpoint_store.load("scrape_1")
+    assert state["page_count"] == 3
+    assert state["task_id"] == "scrape_1"
+    assert checkpoint_store.exists("scrape_1")
+
+    assert checkpoint_store.delete("scrape_1")
+    assert not checkpoint_store.exists("scrape_1")
+    assert not checkpoint_store.delete("scrape_1")
+
+
+def test_task_ids_are_sanitized(checkpoint_store):
+    checkpoint_store.save("../escape", {"page_count": 1})
+    assert checkpoint_store.load("../escape")["page_count"] == 1
+    assert list(checkpoint_store.checkpoint_dir.glob("*.json"))
+
+
+def test_page_index_roundtrip(tmp_path):
+    local_path = tmp_path / "page.md"
+    local_path.write_text("# Page", encoding="utf-8")
+    page_data = {
+        "url": "https://example.com/page",
+        "title": "Page",
+        "html": "<html></html>",
+        "soup": object(),
+        "markdown": "# Page",
+        "local_path": str(local_path),
+        "depth": 2,
+    }
+
+    entry = page_index_entry(page_data)
+    assert "html" not in entry and "soup" not in entry and "markdown" not in entry
+
+    restored = restore_page(entry)
+    assert restored["markdown"] == "# Page"
+    assert restored["depth"] == 2
+    assert restored["soup"] is None
+
+
+def test_restore_page_with_missing_file(tmp_path):
+    assert restore_page({"url": "https://example.com", "local_path": str(tmp_path / "missing.md")}) is None
+
+
+def test_frontier_state_roundtrip():
+    frontier = CrawlFrontier()
+    frontier.mark_visited("https://example.com/")
+    frontier.add_canonical("https://example.com/print/a", "/a")
+    frontier.push_many(["https://example.com/b", "https://example.com/c"], depth=1)
+
+    restored = CrawlFrontier()
+    restored.load_state(frontier.to_state())
+
+    assert restored.is_visited("https://example.com")
+    assert restored.is_visited("https://example.com/print/a")
+    assert restored.pop() == ("https://example.com/b", 1)
+    assert not restored.push("https://example.com/c/")
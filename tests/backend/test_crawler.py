@@ -43,7 +43,7 @@ class TestWebCrawler(unittest.TestCase):
         result = crawler._can_fetch(disallowed_url)
         self.assertFalse(result)
         
-    @patch('web.crawler.BeautifulSoup')
+    @patch('web.crawler.parse_html')
     @patch('web.crawler.requests.get')
     def test_fetch_with_requests(self, mock_get, mock_bs):
         """Test fetching a page with requests."""
@@ -53,7 +53,7 @@ class TestWebCrawler(unittest.TestCase):
         mock_response.text = "<html><body>Test content</body></html>"
         mock_get.return_value = mock_response
         
-        # Mock BeautifulSoup
+        # Mock HTML parsing
         mock_soup = MagicMock()
         mock_bs.return_value = mock_soup
         
@@ -91,7 +91,7 @@ class TestWebCrawler(unittest.TestCase):
             self.assertIn(mock_path, crawler.temp_files)
             mock_file.write.assert_called_once_with(html)
             
-    @patch('web.crawler.BeautifulSoup')
+    @patch('web.crawler.parse_html')
     def test_extract_links(self, mock_bs):
         """Test extracting links from HTML."""
         # Create mock soup and tags
@@ -122,6 +122,143 @@ class TestWebCrawler(unittest.TestCase):
             self.assertFalse("#" in link)
             self.assertTrue(link.startswith(("http://", "https://")))
 
+    @patch('web.crawler.time.sleep')
+    def test_iter_crawl_releases_html_and_soup(self, mock_sleep):
+        """Test that streamed pages keep their links but not their HTML or soup."""
+        from bs4 import BeautifulSoup
+        
+        pages = {
+            "https://example.com/": '<html><body><a href="/a">A</a></body></html>',
+            "https://example.com/a": '<html><body><a href="/">Home</a><p>Page A</p></body></html>',
+        }
+        
+        def fetch_page(url, use_playwright=True):
+            return {
+                "status": "success",
+                "url": url,
+                "html": pages[url],
+                "soup": BeautifulSoup(pages[url], "html.parser"),
+                "title": url,
+                "meta_description": "",
+                "fetched_at": "",
+            }
+        
+        crawler = WebCrawler(respect_robots_txt=False, rate_limit_delay=0)
+        crawler.fetch_page = fetch_page
+        crawler.html_to_markdown = lambda html, url, soup=None: f"# {url}"
+        
+        streamed = list(crawler.iter_crawl("https://example.com/", recursive=True))
+        
+        self.assertEqual([page["url"] for page in streamed], list(pages))
+        for page in streamed:
+            self.assertIsNone(page["html"])
+            self.assertIsNone(page["soup"])
+            self.assertTrue(os.path.exists(page["local_path"]))
+            os.remove(page["local_path"])
+        self.assertEqual(streamed[0]["links"], ["https://example.com/a"])
+
+    @patch('web.crawler.time.sleep')
+    def test_iter_crawl_verification_respects_limits(self, mock_sleep):
+        """Test that the completeness check does not crawl past the crawl limits."""
+        from bs4 import BeautifulSoup
+
+        def fetch_page(url, use_playwright=True):
+            number = int(url.rsplit("/p", 1)[1]) if "/p" in url else 0
+            html = "".join(f'<a href="/p{n}">{n}</a>' for n in range(number + 1, min(number + 4, 60)))
+            return {
+                "status": "success",
+                "url": url,
+                "html": html,
+                "soup": BeautifulSoup(html, "html.parser"),
+                "title": url,
+                "meta_description": "",
+                "fetched_at": "",
+            }
+
+        def crawl(**limits):
+            crawler = WebCrawler(respect_robots_txt=False, rate_limit_delay=0)
+            crawler.fetch_page = fetch_page
+            crawler.html_to_markdown = lambda html, url, soup=None: f"# {url}"
+            pages = list(crawler.iter_crawl("https://example.com/", recursive=True, **limits))
+            for page in pages:
+                os.remove(page["local_path"])
+            return [page["url"] for page in pages]
+
+        self.assertEqual(len(crawl()), 60)
+        self.assertEqual(len(crawl(max_pages=5)), 5)
+        self.assertEqual(crawl(max_depth=1), ["https://example.com/"] + [f"https://example.com/p{n}" for n in (1, 2, 3)])
+        self.assertEqual(
+            crawl(url_patterns=[r"/(p[12])?$"]),
+            ["https://example.com/", "https://example.com/p1", "https://example.com/p2"]
+        )
+
+    def test_not_modified_page_without_cached_copy_is_fetched_again(self):
+        """Test that a 304 for a page missing from the crawl cache triggers a full fetch."""
+        from bs4 import BeautifulSoup
+        from web.crawl_cache import CrawlCache
+        import tempfile
+
+        html = '<html><body><a href="/a">A</a></body></html>'
+        calls = []
+
+        def fetch_page(url, use_playwright=None, conditional=True):
+            calls.append(conditional)
+            return {
+                "status": "success",
+                "url": url,
+                "html": html,
+                "soup": BeautifulSoup(html, "html.parser"),
+                "response_headers": {},
+            }
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            crawler = WebCrawler(respect_robots_txt=False, crawl_cache=CrawlCache(cache_dir))
+            crawler.fetch_page = fetch_page
+            crawler.html_to_markdown = lambda html, url, soup=None: "# A"
+            page_data = {"status": "not_modified", "url": "https://example.com/", "html": None, "soup": None}
+
+            markdown = crawler._get_page_markdown(page_data, "https://example.com/")
+            self.assertEqual(calls, [False])
+            self.assertEqual(markdown, "# A")
+            self.assertEqual(page_data["links"], ["https://example.com/a"])
+
+            # A page that cannot be fetched again is treated as a failed fetch
+            crawler.fetch_page = lambda url, use_playwright=None, conditional=True: {
+                "status": "error", "error": "timeout", "url": url
+            }
+            page_data = {"status": "not_modified", "url": "https://example.com/b", "html": None, "soup": None}
+            self.assertIsNone(crawler._get_page_markdown(page_data, "https://example.com/b"))
+            crawler.crawl_cache.close()
+
+    def test_fallback_matches_the_converter_output(self):
+        """Test that the fallback conversion does not repeat the title heading."""
+        html = "<html><head><title>Guide</title></head><body><h1>Guide</h1><p>Install it.</p></body></html>"
+        
+        markdown = WebCrawler()._fallback_html_to_markdown(html, "https://example.com/guide")
+        
+        self.assertEqual(markdown, "# Guide\n\nSource: https://example.com/guide\n\nInstall it.")
+
+    def test_simple_pages_are_converted_by_the_rules(self):
+        """Test that crawled pages go through the router instead of always using the model."""
+        from processors.conversion_router import ConversionRouter, HEURISTIC
+        from processors.conversion_service import MarkdownConversionService
+        from processors.markdown_converter import HTMLMarkdownConverter
+        
+        router = ConversionRouter()
+        converter = HTMLMarkdownConverter(cache=False, router=router)
+        service = MarkdownConversionService(converter)
+        html = "<html><head><title>Guide</title></head><body><h1>Guide</h1><p>Install it.</p></body></html>"
+        
+        with patch("processors.conversion_service.get_conversion_service", return_value=service), \
+                patch.object(converter, "load_model"), \
+                patch.object(converter, "_convert_with_model") as convert_with_model:
+            markdown = WebCrawler().html_to_markdown(html, "https://example.com/guide")
+        service.shutdown()
+        
+        convert_with_model.assert_not_called()
+        self.assertEqual(router.pages[HEURISTIC], 1)
+        self.assertEqual(markdown, "# Guide\n\nSource: https://example.com/guide\n\nInstall it.")
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
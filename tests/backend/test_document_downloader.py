@@ -0,0 +1,127 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from web.crawler import WebCrawler
+from web.document_downloader import DocumentDownloader
+from web.http_session import content_type_of, is_html_content_type
+
+PDF_BODY = b"%PDF-1.4\n" + b"0" * 4096
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def _send(self, status, content_type, body, encoding=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        type(self).requests.append((self.command, self.path))
+        if self.path == "/page":
+            html = "<html><head><title>Page</title><meta charset='utf-8'></head><body>Grüße</body></html>"
+            self._send(200, "text/html", gzip.compress(html.encode("utf-8")), encoding="gzip")
+        elif self.path == "/big":
+            self._send(200, "text/html; charset=utf-8", b"<p>" + b"x" * 20000 + b"</p>")
+        elif self.path == "/manual.pdf":
+            self._send(200, "application/pdf", PDF_BODY)
+        elif self.path == "/video":
+            self._send(200, "video/mp4", b"\x00" * 1024)
+        else:
+            self._send(404, "text/plain", b"missing")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site(tmp_path):
+    handler = type("Handler", (_Handler,), {"requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield handler, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def crawler(tmp_path):
+    crawler = WebCrawler(respect_robots_txt=False, rate_limit_delay=0,
+                         document_downloader=DocumentDownloader(tmp_path / "documents"))
+    crawler.max_page_bytes = 10000
+    return crawler
+
+
+def test_content_type_helpers():
+    assert content_type_of({"Content-Type": "Text/HTML; charset=utf-8"}) == "text/html"
+    assert is_html_content_type("") and is_html_content_type("application/xhtml+xml")
+    assert not is_html_content_type("application/pdf")
+
+
+def test_compressed_html_is_decoded(site, crawler):
+    _, base_url = site
+    page = crawler.fetch_page(f"{base_url}/page", use_playwright=False)
+
+    assert page["status"] == "success"
+    assert page["title"] == "Page"
+    assert "Grüße" in page["html"]
+
+
+def test_oversized_pages_are_dropped(site, crawler):
+    _, base_url = site
+    page = crawler.fetch_page(f"{base_url}/big", use_playwright=False)
+
+    assert page["status"] == "error"
+    assert page["html"] is None
+    assert "exceeds the limit" in page["error"]
+
+
+def test_documents_are_downloaded_instead_of_parsed(site, crawler):
+    _, base_url = site
+    page = crawler.fetch_page(f"{base_url}/manual.pdf", use_playwright=False)
+
+    assert page["status"] == "document"
+    assert page["soup"] is None
+    assert page["content_type"] == "application/pdf"
+    with open(page["local_path"], "rb") as f:
+        assert f.read() == PDF_BODY
+
+    file_data = crawler.prepare_data_for_dataset([page])[0]
+    assert (file_data["format"], file_data["content_type"]) == ("pdf", "application/pdf")
+
+
+def test_playwright_fetch_checks_document_links_first(site, crawler):
+    handler, base_url = site
+    page = crawler.fetch_page(f"{base_url}/manual.pdf", use_playwright=True)
+
+    # The HEAD request routed the link to the downloader without a browser
+    assert page["status"] == "document"
+    assert handler.requests[0] == ("HEAD", "/manual.pdf")
+
+
+def test_unsupported_content_is_skipped(site, crawler):
+    _, base_url = site
+    page = crawler.fetch_page(f"{base_url}/video", use_playwright=False)
+
+    assert page["status"] == "skipped"
+    assert "video/mp4" in page["error"]
+
+
+def test_download_size_limit(site, tmp_path):
+    _, base_url = site
+    downloader = DocumentDownloader(tmp_path, max_bytes=100)
+    result = downloader.download(f"{base_url}/manual.pdf")
+
+    assert result["status"] == "error"
+    assert not list(tmp_path.iterdir())
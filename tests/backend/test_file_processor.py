@@ -107,3 +107,263 @@ def test_process_pdf(file_processor):
     with patch("pathlib.Path.exists", return_value=True):
         result = file_processor.process_pdf(file_path, file_data)
         assert result["metadata"]["format"] == "pdf"
+
+
+def _write_files(directory):
+    """Create a mix of CPU-bound and plain text files, one of them invalid."""
+    files = []
+    for index in range(3):
+        path = directory / f"data{index}.json"
+        path.write_text(json.dumps({"index": index}))
+        files.append({"name": path.name, "path": path.name, "local_path": str(path)})
+    notebook = directory / "notes.ipynb"
+    notebook.write_text(json.dumps({"cells": [{"cell_type": "markdown", "source": ["# Notes"]}]}))
+    files.append({"name": notebook.name, "path": notebook.name, "local_path": str(notebook)})
+    broken = directory / "broken.json"
+    broken.write_text("{not json")
+    files.append({"name": broken.name, "path": broken.name, "local_path": str(broken)})
+    for index in range(2):
+        path = directory / f"readme{index}.txt"
+        path.write_text(f"Text {index}")
+        files.append({"name": path.name, "path": path.name, "local_path": str(path)})
+    # Invalid file data must not abort the batch
+    files.append({"name": "bad", "path": "bad", "local_path": 123})
+    return files
+
+
+def test_process_files_in_worker_processes_keeps_order(file_processor, tmp_path):
+    files = _write_files(tmp_path)
+    progress = []
+
+    results = file_processor.process_files(
+        files, max_workers=2, chunk_size=2, progress_callback=lambda done, total: progress.append((done, total))
+    )
+
+    assert [result["metadata"]["name"] for result in results] == [file_data["name"] for file_data in files]
+    assert [results[index]["structured_data"]["index"] for index in range(3)] == [0, 1, 2]
+    assert results[3]["cells"]["markdown"] == ["# Notes"]
+    assert "Invalid JSON" in results[4]["error"]
+    assert results[6]["text"] == "Text 1"
+    assert "error" in results[7]
+    assert progress[-1] == (len(files), len(files))
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
+
+
+def test_process_files_unordered_with_threads(file_processor, tmp_path):
+    files = _write_files(tmp_path)
+
+    results = file_processor.process_files(files, max_workers=3, ordered=False, use_processes=False)
+
+    assert sorted(result["metadata"]["name"] for result in results) == sorted(file_data["name"] for file_data in files)
+    assert sum("error" in result for result in results) == 2
+
+
+class FakeStream:
+    """Stream of a FakePage; counts decodes."""
+
+    decodes = 0
+
+    def __init__(self, data):
+        self._data = data.encode()
+
+    def get_data(self):
+        FakeStream.decodes += 1
+        return self._data
+
+
+class FakePage:
+    """Page of a FakePdfReader; counts text extractions."""
+
+    extractions = 0
+
+    def __init__(self, spec):
+        # A page is its text, or its text, content stream, fonts and images
+        if isinstance(spec, str):
+            spec = {"text": spec, "stream": spec, "fonts": {}}
+        self.text = spec["text"]
+        self.objects = {
+            "/Contents": FakeStream(spec["stream"]),
+            "/Resources": {
+                "/Font": spec["fonts"],
+                "/XObject": {name: FakeStream(data) for name, data in spec.get("images", {}).items()},
+            },
+        }
+
+    def extract_text(self):
+        FakePage.extractions += 1
+        if self.text == "corrupt":
+            raise ValueError("bad content stream")
+        return self.text
+
+    def __contains__(self, key):
+        return key in self.objects
+
+    def get(self, key, default=None):
+        return self.objects.get(key, default)
+
+    raw_get = get
+
+
+class FakePdfReader:
+    """Reads a "PDF" stored as a JSON list of page texts."""
+
+    def __init__(self, path):
+        self.pages = [FakePage(text) for text in json.loads(Path(path).read_text())]
+
+
+@pytest.fixture
+def fake_pypdf2():
+    FakePage.extractions = 0
+    FakeStream.decodes = 0
+    with patch.dict("sys.modules", {"PyPDF2": MagicMock(PdfReader=FakePdfReader)}):
+        yield
+
+
+@pytest.fixture
+def page_cache(tmp_path):
+    from processors.pdf_page_cache import PDFPageCache
+
+    cache = PDFPageCache(tmp_path / "pages.sqlite3")
+    yield cache
+    cache.close()
+
+
+def test_process_pdf_extracts_only_new_or_changed_pages(fake_pypdf2, page_cache, tmp_path):
+    from processors.file_processor import FileProcessor
+
+    processor = FileProcessor(page_cache=page_cache)
+    pdf = tmp_path / "manual.pdf"
+    pdf.write_text(json.dumps(["Intro", "Setup", "Usage"]))
+
+    result = processor.process_pdf(pdf, {"name": "manual.pdf"})
+    assert result["text"] == "Intro\n\nSetup\n\nUsage"
+    assert result["metadata"]["page_count"] == 3
+    assert result["metadata"]["cached_pages"] == 0
+    assert result["metadata"]["extraction_seconds"] >= 0
+    assert FakePage.extractions == 3
+
+    # Unchanged file: nothing is extracted
+    assert processor.process_pdf(pdf, {"name": "manual.pdf"})["text"] == result["text"]
+    assert FakePage.extractions == 3
+
+    # Edited file: only the changed and the new page are extracted
+    pdf.write_text(json.dumps(["Intro", "Setup v2", "Usage", "FAQ"]))
+    result = processor.process_pdf(pdf, {"name": "manual.pdf"})
+    assert result["text"] == "Intro\n\nSetup v2\n\nUsage\n\nFAQ"
+    assert result["metadata"]["cached_pages"] == 2
+    assert FakePage.extractions == 5
+
+
+def test_process_pdf_does_not_reuse_pages_with_other_resources(fake_pypdf2, page_cache, tmp_path):
+    from processors.file_processor import FileProcessor
+
+    processor = FileProcessor(page_cache=page_cache)
+    # Identical content streams drawn with different fonts give different text
+    page = {"text": "Hello", "stream": "BT /F1 12 Tf (abc) Tj ET", "fonts": {"/F1": "/ToUnicode latin"}}
+    recoded = dict(page, text="Привет", fonts={"/F1": "/ToUnicode cyrillic"})
+
+    first = tmp_path / "first.pdf"
+    first.write_text(json.dumps([page]))
+    other = tmp_path / "other.pdf"
+    other.write_text(json.dumps([page, "Appendix"]))
+    assert processor.process_pdf(first, {"name": first.name})["text"] == "Hello"
+
+    # Another document with the same page is not served from the first one
+    result = processor.process_pdf(other, {"name": other.name})
+    assert result["metadata"]["cached_pages"] == 0
+    assert FakePage.extractions == 3
+
+    # A new version of the same document with re-encoded fonts is extracted again
+    first.write_text(json.dumps([recoded, "Appendix"]))
+    result = processor.process_pdf(first, {"name": first.name})
+    assert result["text"] == "Привет\n\nAppendix"
+    assert result["metadata"]["cached_pages"] == 0
+
+
+def test_process_pdf_hashes_pages_without_decoding_streams(fake_pypdf2, page_cache, tmp_path):
+    from processors.file_processor import FileProcessor
+
+    processor = FileProcessor(page_cache=page_cache)
+    scan = {"text": "Scanned", "stream": "q /Im1 Do Q", "fonts": {}, "images": {"/Im1": "page image"}}
+    rescanned = dict(scan, text="Rescanned", images={"/Im1": "new page image"})
+
+    pdf = tmp_path / "scan.pdf"
+    pdf.write_text(json.dumps([scan, "Notes"]))
+    processor.process_pdf(pdf, {"name": pdf.name})
+
+    # The images differ, so the page is extracted again
+    pdf.write_text(json.dumps([rescanned, "Notes"]))
+    result = processor.process_pdf(pdf, {"name": pdf.name})
+    assert result["text"] == "Rescanned\n\nNotes"
+    assert result["metadata"]["cached_pages"] == 1
+    assert FakeStream.decodes == 0
+
+
+def test_process_pdf_extracts_page_ranges_in_executor(fake_pypdf2, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from processors.file_processor import FileProcessor
+
+    pdf = tmp_path / "large.pdf"
+    pages = [f"Page {number}" for number in range(40)]
+    pages[17] = "corrupt"
+    pdf.write_text(json.dumps(pages))
+
+    with patch("processors.file_processor.PDF_PAGES_PER_TASK", 8), ThreadPoolExecutor(4) as executor:
+        result = FileProcessor(page_cache=False).process_pdf(pdf, {"name": "large.pdf"}, page_executor=executor)
+
+    assert result["text"].split("\n\n")[:3] == ["Page 0", "Page 1", "Page 2"]
+    assert result["text"].split("\n\n")[17] == ""
+    assert result["metadata"]["page_count"] == 40
+    assert result["metadata"]["failed_pages"] == [18]
+
+
+NOTEBOOK = {
+    "cells": [
+        {"cell_type": "markdown", "source": "# Analysis", "attachments": {"plot.png": {"image/png": "iVBORw0KGgo" * 100}}},
+        {
+            "cell_type": "code",
+            "source": ["import pandas\n", "df.describe()"],
+            "outputs": [
+                {"output_type": "stream", "text": ["loaded\n"]},
+                {"output_type": "display_data", "data": {"image/png": "iVBORw0KGgo" * 100, "text/plain": ["<Figure>"]}},
+            ],
+        },
+        {"cell_type": "code", "source": [], "outputs": []},
+    ],
+    "metadata": {},
+}
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_process_notebook_outputs(tmp_path, stream):
+    from processors.file_processor import FileProcessor
+
+    path = tmp_path / "analysis.ipynb"
+    path.write_text(json.dumps(NOTEBOOK))
+    with patch("processors.file_processor.JSON_STREAMING_MIN_BYTES", 0 if stream else 1 << 30):
+        without = FileProcessor(page_cache=False).process_notebook(path, {"name": path.name})
+        with_outputs = FileProcessor(page_cache=False, include_outputs=True).process_notebook(path, {"name": path.name})
+
+    assert without["cells"] == {"markdown": ["# Analysis"], "code": ["import pandas\ndf.describe()", ""]}
+    assert without["text"] == "# Analysis\n\nimport pandas\ndf.describe()\n\n"
+    assert with_outputs["cells"]["outputs"] == ["loaded\n<Figure>", ""]
+    assert "iVBOR" not in with_outputs["text"]
+    assert "df.describe()\n\nloaded\n<Figure>" in with_outputs["text"]
+
+
+def test_large_json_is_streamed_without_structured_data(tmp_path):
+    from processors.file_processor import FileProcessor
+
+    content = {"records": [{"id": index, "payload": "QUJD" * 100} for index in range(3)]}
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(content))
+
+    with patch("processors.file_processor.JSON_STREAMING_MIN_BYTES", 0):
+        streamed = FileProcessor(page_cache=False).process_json(path, {"name": path.name})
+        kept = FileProcessor(page_cache=False, keep_structured_data=True).process_json(path, {"name": path.name})
+        stripped = FileProcessor(page_cache=False, drop_base64=True).process_json(path, {"name": path.name})
+
+    assert streamed["text"] == json.dumps(content, indent=2)
+    assert "structured_data" not in streamed
+    assert kept["structured_data"] == content
+    assert json.loads(stripped["text"])["records"][0]["payload"] == "[base64 data: 400 characters]"
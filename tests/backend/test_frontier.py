@@ -0,0 +1,55 @@
+from web.frontier import CrawlFrontier
+
+
+def test_push_rejects_equivalent_urls():
+    frontier = CrawlFrontier()
+    assert frontier.push("https://example.com/page")
+    assert not frontier.push("https://example.com/page/#top")
+    assert not frontier.push("https://example.com/page?utm_source=x")
+    assert len(frontier) == 1
+
+
+def test_pop_marks_and_skips_visited():
+    frontier = CrawlFrontier()
+    frontier.push_many(["https://example.com/a", "https://example.com/b"], depth=1)
+
+    url, depth = frontier.pop()
+    assert (url, depth) == ("https://example.com/a", 1)
+    frontier.mark_visited(url)
+
+    assert not frontier.push("https://example.com/a/")
+    assert frontier.is_visited("https://example.com/a#x")
+    assert frontier.pop() == ("https://example.com/b", 1)
+    assert frontier.pop() is None
+
+
+def test_push_front_keeps_order():
+    frontier = CrawlFrontier()
+    frontier.push("https://example.com/last")
+    frontier.push_many(["https://example.com/p1", "https://example.com/p2"], front=True)
+    assert [url for url, _ in frontier.queue] == [
+        "https://example.com/p1",
+        "https://example.com/p2",
+        "https://example.com/last",
+    ]
+
+
+def test_canonical_link_rejects_aliases_before_fetch():
+    frontier = CrawlFrontier()
+    frontier.push("https://example.com/docs/latest/intro")
+    frontier.push("https://example.com/docs/intro")
+
+    url, _ = frontier.pop()
+    frontier.mark_visited(url)
+    assert not frontier.add_canonical(url, "/docs/intro")
+
+    # The queued alias now resolves to the visited canonical page
+    assert frontier.pop() is None
+    assert not frontier.push("https://example.com/docs/latest/intro/")
+
+
+def test_canonical_already_visited_is_reported():
+    frontier = CrawlFrontier()
+    frontier.mark_visited("https://example.com/page")
+    frontier.mark_visited("https://example.com/print/page")
+    assert frontier.add_canonical("https://example.com/print/page", "https://example.com/page")
@@ -0,0 +1,34 @@
+from utils import html_parser
+from utils.html_parser import get_parser_name, parse_html
+from processors.markdown_converter import HTMLMarkdownConverter
+
+PAGE = """
+<html><head><title>Guide</title></head>
+<body>
+  <h1>Install</h1><p>Run the installer.</p>
+  <ul><li>Step one</li><li>Step two</li></ul>
+  <a href="/next">Next page</a>
+</body></html>
+"""
+
+
+def test_default_parser_prefers_lxml(monkeypatch):
+    monkeypatch.setattr(html_parser, "HTML_PARSER", None)
+    monkeypatch.setattr(html_parser, "LXML_AVAILABLE", True)
+    assert get_parser_name() == "lxml"
+    monkeypatch.setattr(html_parser, "LXML_AVAILABLE", False)
+    assert get_parser_name() == "html.parser"
+
+
+def test_parse_html_falls_back_to_html_parser():
+    soup = parse_html(PAGE, parser="no-such-parser")
+    assert soup.find("title").text == "Guide"
+
+
+def test_fallback_conversion_reuses_parsed_soup():
+    converter = HTMLMarkdownConverter()
+    soup = parse_html(PAGE)
+
+    assert converter._fallback_html_to_markdown(PAGE, soup=soup) == converter._fallback_html_to_markdown(PAGE)
+    # The caller's soup is left intact
+    assert soup.find("a")["href"] == "/next"
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from processors.json_stream import BASE64_MIN_LENGTH, file_events, is_base64, object_events, write_json
+
+DOCUMENT = {
+    "name": "café",
+    "empty": {"list": [], "map": {}},
+    "values": [1, 2.5, -3e-05, True, False, None, "text"],
+    "nested": [{"a": [[], [1]]}, []],
+}
+IMAGE = "data:image/png;base64," + "iVBORw0KGgo" * 40
+
+
+@pytest.mark.parametrize("value", [DOCUMENT, [], {}, "scalar", 42, None])
+def test_write_json_matches_json_dumps(value):
+    assert write_json(object_events(value)) == json.dumps(value, indent=2)
+
+
+def test_file_events_stream_the_document(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(DOCUMENT))
+    assert write_json(file_events(path)) == json.dumps(DOCUMENT, indent=2)
+
+
+def test_base64_data_is_dropped():
+    raw = "QUJD" * (BASE64_MIN_LENGTH // 4)
+    assert is_base64(IMAGE) and is_base64(raw)
+    assert is_base64("\n".join([raw[:76]] * 10))
+    assert not is_base64("A short string") and not is_base64("Plain prose without punctuation " * 40)
+
+    text = write_json(object_events({"icon": IMAGE, "title": "Logo"}), drop_base64=True)
+    assert json.loads(text) == {"icon": f"[base64 data: {len(IMAGE)} characters]", "title": "Logo"}
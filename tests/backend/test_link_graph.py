@@ -0,0 +1,71 @@
+import pytest
+
+from web.link_graph import LinkGraph
+
+
+def test_pages_and_links_share_integer_ids():
+    graph = LinkGraph()
+    graph.add_page("https://example.com/", ["https://example.com/a", "https://example.com/b/"])
+    graph.add_page("https://example.com/a", ["https://example.com/b", "https://example.com/a#top"])
+
+    assert len(graph) == 3
+    assert graph.edge_count == 3
+    assert set(graph.edges()) == {
+        ("https://example.com/", "https://example.com/a"),
+        ("https://example.com/", "https://example.com/b/"),
+        ("https://example.com/a", "https://example.com/b/"),
+    }
+
+
+def test_missing_returns_linked_pages_that_were_never_visited():
+    graph = LinkGraph()
+    graph.add_page("https://example.com/", ["https://example.com/a", "https://example.com/b"])
+    graph.add_page("https://example.com/a", ["https://example.com/c"])
+
+    visited = {"https://example.com/", "https://example.com/a", "https://example.com/b"}
+    assert graph.missing(visited) == ["https://example.com/c"]
+
+
+def test_missing_resolves_canonical_aliases():
+    graph = LinkGraph()
+    graph.add_page("https://example.com/", ["https://example.com/print/a"])
+    graph.normalizer.add_alias("https://example.com/print/a", "https://example.com/a")
+
+    assert graph.missing({"https://example.com/", "https://example.com/a"}) == []
+
+
+def test_missing_from_only_follows_the_given_pages():
+    graph = LinkGraph()
+    graph.add_page("https://example.com/", ["https://example.com/a", "https://example.com/c"])
+    graph.add_page("https://example.com/a", ["https://example.com/c", "https://example.com/d"])
+    graph.add_page("https://example.com/b", ["https://example.com/e"])
+
+    visited = {"https://example.com/", "https://example.com/a", "https://example.com/b"}
+    sources = {"https://example.com/": 0, "https://example.com/a": 1}
+    assert graph.missing_from(visited, sources) == [
+        ("https://example.com/c", 1),
+        ("https://example.com/d", 2),
+    ]
+
+
+def test_pagerank_favours_linked_pages():
+    graph = LinkGraph()
+    graph.add_page("https://example.com/", ["https://example.com/hub"])
+    graph.add_page("https://example.com/a", ["https://example.com/hub"])
+    graph.add_page("https://example.com/b", ["https://example.com/hub"])
+    graph.add_page("https://example.com/hub", ["https://example.com/"])
+
+    ranks = graph.pagerank()
+    assert sum(ranks.values()) == pytest.approx(1.0)
+    assert max(ranks, key=ranks.get) == "https://example.com/hub"
+
+
+def test_state_round_trip():
+    graph = LinkGraph()
+    graph.add_page("https://example.com/", ["https://example.com/a"])
+
+    restored = LinkGraph()
+    restored.load_state(graph.to_state())
+
+    assert list(restored.edges()) == list(graph.edges())
+    assert restored.node_id("https://example.com/a") == graph.node_id("https://example.com/a")
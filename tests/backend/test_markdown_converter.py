@@ -1,20 +1,74 @@
 import unittest
 import os
 import sys
+import tempfile
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
 # Add the root directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from processors.markdown_converter import HTMLMarkdownConverter
+from processors.conversion_cache import ConversionCache
+from processors.conversion_router import ConversionRouter
+from processors.markdown_converter import HTMLMarkdownConverter, _length_buckets
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+
+class FakeEncoding(dict):
+    """Tokenizer output supporting .to(device)."""
+
+    def to(self, device):
+        return self
+
+
+class FakeTokenizer:
+    """Character-level tokenizer whose chat template is the bare HTML."""
+
+    pad_token_id = 0
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=True):
+        return messages[0]["content"].split("```html\n")[1].rsplit("\n```", 1)[0]
+
+    def __call__(self, prompts, return_tensors=None, padding=False):
+        ids = [[ord(char) for char in prompt] for prompt in prompts]
+        if not padding:
+            return FakeEncoding(input_ids=ids)
+        width = max(len(row) for row in ids)
+        return FakeEncoding(
+            input_ids=torch.tensor([[0] * (width - len(row)) + row for row in ids]),
+            attention_mask=torch.tensor([[0] * (width - len(row)) + [1] * len(row) for row in ids]),
+        )
+
+    def batch_decode(self, rows, skip_special_tokens=True):
+        return ["".join(chr(token) for token in row.tolist() if token) for row in rows]
+
+
+class EchoModel:
+    """Model whose generated tokens repeat the unpadded prompt."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def generate(self, input_ids, attention_mask=None, **kwargs):
+        self.batch_sizes.append(input_ids.shape[0])
+        assert torch.equal(attention_mask, (input_ids != 0).long())
+        return torch.cat([input_ids, input_ids], dim=1)
 
 
 class TestHTMLMarkdownConverter(unittest.TestCase):
     """Test cases for the HTML to Markdown converter."""
 
     def setUp(self):
-        self.converter = HTMLMarkdownConverter()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.cache = ConversionCache(os.path.join(self.cache_dir.name, "conversions.sqlite3"))
+        self.addCleanup(self.cache.close)
+        # Model-path tests bypass routing; routing has its own tests
+        self.converter = HTMLMarkdownConverter(cache=self.cache, router=False)
         self.html_sample = """
         <html>
             <head>
@@ -50,6 +104,21 @@ class TestHTMLMarkdownConverter(unittest.TestCase):
         self.assertIn("<h1>Hello World</h1>", cleaned)
         self.assertIn("<p>This is a test paragraph.</p>", cleaned)
 
+    def test_clean_html_edge_cases(self):
+        cases = {
+            "<SCRIPT type='x'>a()</ SCRIPT >kept": "kept",
+            "< style>p{}</style>< meta name='a'>< link href='b'>kept": "kept",
+            "<!-- <script>x()</script> -->kept<!-- note -- >": "kept",
+            "<svg class='i'><path/></svg>": "<svg class='i'>this is a placeholder</svg>",
+            "<SVG><path/></SVG>": "<SVG><path/></SVG>",
+            '<img alt="a" src="data:image/gif;base64,R0lG">': '<img src="#"/>',
+            "<script>unclosed": "<script>unclosed",
+            "<p>plain</p>": "<p>plain</p>",
+        }
+        for html, expected in cases.items():
+            self.assertEqual(self.converter.clean_html(html), expected, html)
+        self.assertEqual(self.converter.clean_html("<svg><path/></svg>", clean_svg=False), "<svg><path/></svg>")
+
     def test_replace_svg(self):
         """Test SVG replacement."""
         svg_html = '<div><svg width="100" height="100"><circle cx="50" cy="50" r="40"></circle></svg></div>'
@@ -108,6 +177,133 @@ class TestHTMLMarkdownConverter(unittest.TestCase):
             # Verify basic markdown elements are present
             self.assertIn("# Test Page", result)  # Title
 
+    def test_length_buckets_group_similar_lengths(self):
+        self.assertEqual(_length_buckets([50, 10, 30, 20, 40], 2), [[1, 3], [2, 4], [0]])
+        self.assertEqual(_length_buckets([], 4), [])
+
+    def test_batch_conversion_without_model_uses_fallback(self):
+        with patch.object(self.converter, "load_model", return_value=False):
+            results = self.converter.batch_convert_to_markdown(
+                [("a.html", "<h1>Alpha</h1>"), "missing.html", ("b.html", "<h1>Beta</h1>")]
+            )
+
+        self.assertEqual(list(results), ["a.html", "missing.html", "b.html"])
+        self.assertIn("# Alpha", results["a.html"])
+        self.assertIsNone(results["missing.html"])
+
+    @unittest.skipIf(torch is None, "torch not installed")
+    def test_batch_conversion_generates_padded_batches(self):
+        self.converter.tokenizer = FakeTokenizer()
+        self.converter.model = EchoModel()
+        self.converter.device = "cpu"
+        pages = [(f"{i}.html", "<p>" + "x" * length + "</p>") for i, length in enumerate([40, 5, 30, 10, 20])]
+
+        results = self.converter.batch_convert_to_markdown(pages, batch_size=2)
+
+        self.assertEqual(self.converter.model.batch_sizes, [2, 2, 1])
+        self.assertEqual(results, {path: html for path, html in pages})
+        # A single conversion goes through the same generation path
+        self.assertEqual(self.converter.html_to_markdown("<p>single</p>"), "<p>single</p>")
+
+    def test_split_html_at_headings(self):
+        sections = [f"<h2>Section {i}</h2><p>{'word ' * 60}</p>" for i in range(10)]
+        html = "<main>" + "".join(sections) + "</main>"
+
+        chunks = self.converter.split_html(html, max_tokens=200)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), html)
+        self.assertTrue(all(chunk.startswith("<h2>") for chunk in chunks[1:]))
+        self.assertTrue(all(count <= 200 for count in self.converter._count_tokens(chunks)))
+        self.assertEqual(self.converter.split_html(html, max_tokens=10000), [html])
+
+    def test_split_html_splits_oversized_sections(self):
+        paragraphs = "".join(f"<p>{'word ' * 30}</p>" for _ in range(20))
+        html = f"<h1>Title</h1><div>{paragraphs}</div>" + "x" * 3000
+
+        chunks = self.converter.split_html(html, max_tokens=100)
+
+        self.assertEqual("".join(chunks), html)
+        self.assertTrue(all(count <= 100 for count in self.converter._count_tokens(chunks)))
+
+    @unittest.skipIf(torch is None, "torch not installed")
+    def test_long_pages_are_converted_in_chunks(self):
+        self.converter.tokenizer = FakeTokenizer()
+        self.converter.model = EchoModel()
+        self.converter.device = "cpu"
+        html = "".join(f"<h2>Part {i}</h2><p>{'text ' * 20}</p>" for i in range(6))
+
+        markdown = self.converter.html_to_markdown(html, chunk_tokens=300)
+        chunks = self.converter.split_html(html, 300)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(markdown, "\n\n".join(chunks))
+        self.assertEqual(sum(self.converter.model.batch_sizes), len(chunks))
+
+    def test_cached_conversions_skip_the_model(self):
+        key = self.converter._cache_key(self.converter.clean_html(self.html_sample), None, 4096, 0.0, 4096)
+        self.cache.put(key, "# Cached")
+
+        with patch.object(self.converter, "load_model", side_effect=AssertionError("model loaded")):
+            self.assertEqual(self.converter.html_to_markdown(self.html_sample, chunk_tokens=4096), "# Cached")
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+
+        # Sampled generations are never served from the cache
+        self.assertIsNone(self.converter._cache_key("<p>x</p>", None, 4096, 0.7, 4096))
+
+    @unittest.skipIf(torch is None, "torch not installed")
+    def test_model_conversions_are_cached(self):
+        self.converter.tokenizer = FakeTokenizer()
+        self.converter.model = EchoModel()
+        self.converter.device = "cpu"
+        pages = [("a.html", "<p>alpha</p>"), ("b.html", "<p>beta</p>")]
+
+        self.converter.batch_convert_to_markdown(pages)
+        self.assertEqual(self.converter.html_to_markdown("<p>alpha</p>"), "<p>alpha</p>")
+        results = self.converter.batch_convert_to_markdown(pages)
+
+        self.assertEqual(results["b.html"], "<p>beta</p>")
+        self.assertEqual(self.converter.model.batch_sizes, [2])
+        self.assertEqual(self.cache.get_stats()["hits"], 3)
+
+    def test_quantized_conversions_are_cached_separately(self):
+        quantized = HTMLMarkdownConverter(device="cpu", cache=self.cache, quantize=True)
+        full = HTMLMarkdownConverter(device="cpu", cache=self.cache, quantize=False)
+
+        self.assertEqual(quantized.model_id, "jinaai/ReaderLM-v2:int8")
+        self.assertNotEqual(quantized._cache_key("<p>x</p>", None, 4096, 0.0, 4096),
+                            full._cache_key("<p>x</p>", None, 4096, 0.0, 4096))
+        # Quantization only applies on CPU
+        self.assertEqual(HTMLMarkdownConverter(device="cuda", cache=False, quantize=True).model_id,
+                         "jinaai/ReaderLM-v2")
+
+    @unittest.skipIf(torch is None or not hasattr(torch, "nn"), "torch not installed")
+    def test_quantize_replaces_linear_layers(self):
+        converter = HTMLMarkdownConverter(device="cpu", cache=False, quantize=True, num_threads=1)
+        converter.model = torch.nn.Sequential(torch.nn.Linear(8, 8), torch.nn.ReLU(), torch.nn.Linear(8, 2))
+
+        converter._configure_cpu_inference()
+
+        self.assertEqual(torch.get_num_threads(), 1)
+        self.assertNotIsInstance(converter.model[0], torch.nn.Linear)
+        self.assertEqual(tuple(converter.model(torch.zeros(1, 8)).shape), (1, 2))
+
+    def test_simple_pages_are_routed_to_the_rules(self):
+        converter = HTMLMarkdownConverter(cache=self.cache, router=ConversionRouter())
+        html = "<html><body>" + "".join(f"<h2>Part {i}</h2><p>{'words ' * 80}</p>" for i in range(10)) + "</body></html>"
+
+        with patch.object(converter, "load_model", side_effect=AssertionError("model loaded")):
+            markdown = converter.html_to_markdown(html)
+
+        self.assertIn("## Part 3", markdown)
+        self.assertEqual(converter.router.get_stats()["heuristic"]["pages"], 1)
+
+    def test_custom_instructions_always_use_the_model(self):
+        converter = HTMLMarkdownConverter(cache=self.cache, router=ConversionRouter())
+        with patch.object(converter, "load_model", return_value=False) as load_model:
+            converter.html_to_markdown("<p>short</p>", custom_instruction="Only the title")
+        load_model.assert_called_once()
+
     def test_get_default_device(self):
         """Test device selection logic without requiring torch."""
         # Create a local method to mock 
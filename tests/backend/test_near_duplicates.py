@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from web import near_duplicates
+from web.near_duplicates import NearDuplicateIndex, hamming_distance, simhash
+
+
+def _random_text(seed, words=1000):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(2000)]
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def test_simhash_is_stable_and_case_insensitive():
+    text = _random_text(1)
+    assert simhash(text) == simhash(text.upper())
+    assert simhash("") == 0
+
+
+def test_simhash_similar_texts_are_close():
+    text = _random_text(1)
+    words = text.split()
+    words[250] = "edited"
+    assert hamming_distance(simhash(text), simhash(" ".join(words))) <= 6
+    assert hamming_distance(simhash(text), simhash(_random_text(2))) > 6
+
+
+@pytest.mark.skipif(near_duplicates.np is None, reason="numpy not installed")
+def test_numpy_and_python_fingerprints_match():
+    words = near_duplicates._WORD_PATTERN.findall(_random_text(3))
+    word_hashes = [near_duplicates._word_hash(word) for word in words]
+    assert near_duplicates._simhash_numpy(word_hashes, 3) == near_duplicates._simhash_python(word_hashes, 3)
+
+
+def test_index_detects_near_duplicates():
+    index = NearDuplicateIndex(max_distance=6)
+    text = _random_text(4)
+
+    assert index.check("https://example.com/v1/page", text) is None
+    assert index.check("https://example.com/v2/page", text + " footer") == "https://example.com/v1/page"
+    assert index.check("https://example.com/other", _random_text(5)) is None
+    assert len(index.fingerprints) == 2
+
+
+def test_index_ignores_empty_pages():
+    index = NearDuplicateIndex()
+    assert index.check("https://example.com/a", "") is None
+    assert index.check("https://example.com/b", "") is None
+    assert index.fingerprints == {}
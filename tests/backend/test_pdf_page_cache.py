@@ -0,0 +1,31 @@
+import pickle
+
+from processors.pdf_page_cache import PDFPageCache
+
+
+def test_pages_are_found_by_file_and_by_content(tmp_path):
+    cache = PDFPageCache(tmp_path / "pages.sqlite3")
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4 one")
+    file_hash = cache.file_hash(pdf)
+
+    assert cache.get_pages(file_hash) == {}
+    cache.put_pages(file_hash, [(0, "c0", "First"), (1, "c1", "Second")], "docs/manual.pdf")
+    assert cache.get_pages(file_hash) == {0: "First", 1: "Second"}
+
+    # A new version of the document reuses its unchanged pages, even if they moved
+    assert cache.find_by_content({0: "c-new", 1: "c0", 2: "c1"}, "docs/manual.pdf") == {1: "First", 2: "Second"}
+    # Other documents never reuse them
+    assert cache.find_by_content({0: "c0"}, "docs/other.pdf") == {}
+    assert cache.get_stats() == {"files": 1, "pages": 2, "hits": 4, "misses": 2}
+    cache.close()
+
+
+def test_cache_can_be_sent_to_worker_processes(tmp_path):
+    cache = PDFPageCache(tmp_path / "pages.sqlite3")
+    cache.put_pages("hash", [(0, None, "Text")])
+
+    copy = pickle.loads(pickle.dumps(cache))
+    assert copy.get_pages("hash") == {0: "Text"}
+    cache.close()
+    copy.close()
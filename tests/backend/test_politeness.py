@@ -0,0 +1,63 @@
+import email.utils
+import time
+from urllib.robotparser import RequestRate
+
+import pytest
+
+from web.frontier import CrawlFrontier
+from web.politeness import PolitenessScheduler, parse_retry_after
+
+
+def test_parse_retry_after_seconds_and_dates():
+    now = time.time()
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(email.utils.formatdate(now + 30, usegmt=True), now=now) == pytest.approx(30, abs=1)
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_robots_directives_set_the_delay():
+    scheduler = PolitenessScheduler(default_delay=0.5)
+    scheduler.set_robots_rules("a.example", crawl_delay=3)
+    scheduler.set_robots_rules("b.example", request_rate=RequestRate(requests=1, seconds=10))
+
+    assert scheduler.get_delay("a.example") == 3
+    assert scheduler.get_delay("b.example") == 10
+    assert scheduler.get_delay("c.example") == 0.5
+
+
+def test_reserve_spaces_requests_to_the_same_domain():
+    scheduler = PolitenessScheduler(default_delay=5)
+    assert scheduler.reserve("a.example") == 0
+    assert scheduler.reserve("a.example") == pytest.approx(5, abs=0.1)
+    assert scheduler.reserve("b.example") == 0
+
+
+def test_slow_domains_are_spaced_by_latency():
+    scheduler = PolitenessScheduler(default_delay=0.1, latency_factor=2)
+    scheduler.record_response("slow.example", 200, latency=1.5)
+    assert scheduler.get_delay("slow.example") == pytest.approx(3.0)
+
+
+def test_throttling_pauses_domain_and_backs_off():
+    scheduler = PolitenessScheduler(default_delay=0)
+    assert scheduler.record_response("a.example", 429, retry_after="30") == 30
+    assert scheduler.time_until_ready("a.example") == pytest.approx(30, abs=1)
+    assert scheduler.get_delay("a.example") >= 1
+
+    scheduler.record_response("a.example", 503)
+    backoff = scheduler.get_delay("a.example")
+    scheduler.record_response("a.example", 200)
+    assert scheduler.get_delay("a.example") < backoff
+
+
+def test_frontier_pops_from_the_ready_domain():
+    scheduler = PolitenessScheduler(default_delay=0)
+    frontier = CrawlFrontier()
+    frontier.push_many(["https://a.example/1", "https://a.example/2"])
+    frontier.push("https://b.example/1")
+
+    scheduler.record_response("a.example", 429, retry_after="60")
+    assert frontier.pop(scheduler) == ("https://b.example/1", 0)
+    assert frontier.pop(scheduler) == ("https://a.example/1", 0)
+    assert len(frontier) == 1
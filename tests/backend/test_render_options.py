@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from web.render_options import RenderOptions
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.outcome = None
+
+    def abort(self):
+        self.outcome = "aborted"
+
+    def continue_(self):
+        self.outcome = "continued"
+
+
+class FakePage:
+    def __init__(self, slow=False):
+        self.slow = slow
+        self.handler = None
+        self.calls = []
+
+    def route(self, pattern, handler):
+        self.handler = handler
+
+    def goto(self, url, wait_until, timeout):
+        self.calls.append(("goto", wait_until, timeout))
+        return SimpleNamespace(status=200, headers={})
+
+    def wait_for_load_state(self, state, timeout):
+        self.calls.append(("load_state", state, timeout))
+        if self.slow:
+            raise PlaywrightTimeoutError("timed out")
+
+    def wait_for_selector(self, selector, timeout):
+        self.calls.append(("selector", selector, timeout))
+
+
+def test_blocks_resource_types_and_tracking_domains():
+    options = RenderOptions(blocked_resource_types=["image", "font", "document"],
+                            blocked_domains=["google-analytics.com"])
+
+    assert options.should_block("https://docs.example.com/logo.png", "image", "docs.example.com")
+    assert options.should_block("https://www.google-analytics.com/analytics.js", "script", "docs.example.com")
+    assert not options.should_block("https://docs.example.com/app.js", "script", "docs.example.com")
+    assert not options.should_block("https://docs.example.com/", "document", "docs.example.com")
+
+
+def test_third_party_blocking_keeps_same_site_hosts():
+    options = RenderOptions(blocked_resource_types=[], blocked_domains=[], block_third_party=True)
+
+    assert not options.should_block("https://static.example.com/app.js", "script", "docs.example.com")
+    assert options.should_block("https://cdn.other.net/widget.js", "script", "docs.example.com")
+
+
+def test_attach_routes_requests():
+    options = RenderOptions(blocked_resource_types=["image"], blocked_domains=[])
+    page = FakePage()
+    stats = options.attach(page, "https://docs.example.com/")
+
+    image = FakeRoute("https://docs.example.com/a.png", "image")
+    script = FakeRoute("https://docs.example.com/a.js", "script")
+    page.handler(image)
+    page.handler(script)
+
+    assert (image.outcome, script.outcome) == ("aborted", "continued")
+    assert stats == {"blocked": 1, "allowed": 1}
+
+
+def test_navigation_waits_only_for_the_dom_by_default():
+    page = FakePage()
+    response = RenderOptions(wait_strategy="domcontentloaded", render_budget=5).navigate(page, "https://a.example/")
+
+    assert response.status == 200
+    assert page.calls == [("goto", "domcontentloaded", 5000)]
+
+
+def test_render_budget_caps_the_wait_strategy():
+    page = FakePage(slow=True)
+    options = RenderOptions(wait_strategy="networkidle", render_budget=2)
+
+    # Running out of budget keeps the page as rendered instead of failing
+    assert options.navigate(page, "https://a.example/").status == 200
+    assert page.calls[1][:2] == ("load_state", "networkidle")
+    assert page.calls[1][2] <= 2000
+
+
+def test_selector_strategy_waits_for_selector():
+    page = FakePage()
+    RenderOptions(wait_strategy="selector", wait_selector="main").navigate(page, "https://a.example/")
+    assert page.calls[1][:2] == ("selector", "main")
+
+
+def test_unknown_wait_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        RenderOptions(wait_strategy="idle")
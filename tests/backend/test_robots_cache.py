@@ -0,0 +1,102 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from web.robots_cache import RobotsCache, _robots_ttl, build_parser
+
+
+class _RobotsHandler(BaseHTTPRequestHandler):
+    status = 200
+    body = "User-agent: *\nDisallow: /private/\nCrawl-delay: 2\n"
+    headers_out = {}
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        time.sleep(0.05)
+        self.send_response(self.status)
+        for name, value in self.headers_out.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(self.body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def robots_server():
+    handler = type("Handler", (_RobotsHandler,), {"requests": 0, "headers_out": {}})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield handler, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_build_parser_status_rules():
+    rules = build_parser(200, "User-agent: *\nDisallow: /private/\n")
+    assert rules.can_fetch("bot", "http://a.example/page")
+    assert not rules.can_fetch("bot", "http://a.example/private/x")
+
+    assert build_parser(404, "").can_fetch("bot", "http://a.example/private/x")
+    assert not build_parser(403, "").can_fetch("bot", "http://a.example/page")
+    assert not build_parser(503, "").can_fetch("bot", "http://a.example/page")
+    assert build_parser(None, "").can_fetch("bot", "http://a.example/page")
+
+
+def test_ttl_honors_caching_headers():
+    assert _robots_ttl(200, {}, 3600, 60) == 3600
+    assert _robots_ttl(200, {"Cache-Control": "public, max-age=300"}, 3600, 60) == 300
+    assert _robots_ttl(200, {"Cache-Control": "max-age=999999"}, 3600, 60) == 3600
+    assert _robots_ttl(200, {"Cache-Control": "no-store"}, 3600, 60) == 60
+    assert _robots_ttl(503, {"Cache-Control": "max-age=300"}, 3600, 60) == 60
+    assert _robots_ttl(None, {}, 3600, 60) == 60
+
+
+def test_robots_txt_is_fetched_once_and_persisted(robots_server, tmp_path):
+    handler, base_url = robots_server
+    cache = RobotsCache(cache_dir=tmp_path)
+
+    # Concurrent lookups share a single fetch
+    cache.prefetch([f"{base_url}/a", f"{base_url}/b"])
+    parser = cache.get_parser(f"{base_url}/page")
+    assert not parser.can_fetch("bot", f"{base_url}/private/x")
+    assert parser.crawl_delay("bot") == 2
+    assert cache.can_fetch("bot", f"{base_url}/docs")
+    assert handler.requests == 1
+
+    # A new cache (e.g. a new process) reads the disk copy
+    warm = RobotsCache(cache_dir=tmp_path)
+    assert not warm.can_fetch("bot", f"{base_url}/private/x")
+    assert handler.requests == 1
+
+
+def test_missing_robots_txt_is_cached(robots_server, tmp_path):
+    handler, base_url = robots_server
+    handler.status = 404
+    cache = RobotsCache(cache_dir=tmp_path)
+
+    assert cache.can_fetch("bot", f"{base_url}/private/x")
+    assert cache.can_fetch("bot", f"{base_url}/other")
+    assert handler.requests == 1
+
+
+def test_expired_entries_are_refetched(robots_server, tmp_path):
+    handler, base_url = robots_server
+    handler.status = 500
+    cache = RobotsCache(cache_dir=tmp_path, error_ttl=0.2)
+
+    assert not cache.can_fetch("bot", f"{base_url}/page")
+    time.sleep(0.3)
+    handler.status = 200
+    assert cache.can_fetch("bot", f"{base_url}/page")
+    assert handler.requests == 2
+
+
+def test_unreachable_site_allows_crawling(tmp_path):
+    cache = RobotsCache(cache_dir=tmp_path, timeout=1)
+    assert cache.can_fetch("bot", "http://127.0.0.1:9/page")
@@ -0,0 +1,62 @@
+from utils.html_parser import parse_html
+from processors.rule_converter import add_title, soup_to_markdown
+
+
+def convert(body, base_url=None):
+    return soup_to_markdown(parse_html(f"<html><head><title>Page</title></head><body>{body}</body></html>"), base_url)
+
+
+def test_keeps_document_order_without_duplicates():
+    markdown = convert("<h1>Intro</h1><p>First.</p><h2>Usage</h2><p>Second.</p><div><p>Third.</p></div>")
+    assert markdown == "# Intro\n\nFirst.\n\n## Usage\n\nSecond.\n\nThird."
+
+
+def test_inline_formatting_and_links():
+    markdown = convert(
+        '<p>Run <code>make</code>, read <a href="/docs/">the <b>docs</b></a> or <em>skip</em>.<br>Done '
+        '<a href="#top">top</a> <a href="javascript:void(0)">menu</a></p>',
+        base_url="https://example.com/guide/",
+    )
+    assert markdown == (
+        "Run `make`, read [the **docs**](https://example.com/docs/) or *skip*.  \nDone top menu"
+    )
+
+
+def test_code_blocks_keep_whitespace_and_language():
+    markdown = convert('<pre><code class="language-python">def f():\n    return "```"</code></pre>')
+    assert markdown == '````python\ndef f():\n    return "```"\n````'
+
+
+def test_nested_and_ordered_lists():
+    markdown = convert(
+        "<ul><li>One<ul><li>Nested</li></ul></li><li>Two</li></ul>"
+        "<ol start='3'><li>Three</li><li><p>Four</p><p>More</p></li></ol>"
+    )
+    assert markdown == "* One\n  * Nested\n* Two\n\n3. Three\n4. Four\n\n   More"
+
+
+def test_tables():
+    markdown = convert(
+        "<table><thead><tr><th>Name</th><th>Value</th></tr></thead>"
+        "<tbody><tr><td>a|b</td><td>1</td></tr><tr><td colspan='2'>total</td></tr></tbody></table>"
+    )
+    assert markdown == "| Name | Value |\n| --- | --- |\n| a\\|b | 1 |\n| total |  |"
+
+    # Single-column layout tables are unwrapped
+    assert convert("<table><tr><td><h2>Title</h2><p>Text</p></td></tr></table>") == "## Title\n\nText"
+
+
+def test_skips_non_content_and_leaves_soup_intact():
+    soup = parse_html(
+        "<body><script>var x = 1;</script><style>p {}</style><!-- note --><p>Kept</p>"
+        "<blockquote><p>Quoted</p></blockquote><img src='data:image/png;base64,AAAA' alt='icon'></body>"
+    )
+    assert soup_to_markdown(soup) == "Kept\n\n> Quoted\n\nicon"
+    assert soup.find("script") is not None
+
+
+def test_add_title_skips_a_repeated_heading():
+    assert add_title("# Guide\n\nText", "Guide") == "# Guide\n\nText"
+    assert add_title("# Guide", "Guide") == "# Guide"
+    assert add_title("# Guides\n\nText", "Guide") == "# Guide\n\n# Guides\n\nText"
+    assert add_title("", "Guide") == "# Guide"
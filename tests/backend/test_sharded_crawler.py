@@ -0,0 +1,160 @@
+import os
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from web.crawler import WebCrawler
+from web.sharded_crawler import DONE, SQLiteFrontier, ShardedCrawler, shard_for_url
+
+
+class RequestsCrawler(WebCrawler):
+    """Worker crawler that fetches without a browser."""
+
+    def fetch_page(self, url, use_playwright=False):
+        return super().fetch_page(url, use_playwright=False)
+
+
+class CrashingCrawler(RequestsCrawler):
+    """Worker crawler whose process is killed while fetching /p3."""
+
+    def fetch_page(self, url, use_playwright=False):
+        if url.endswith("/p3"):
+            os.kill(os.getpid(), signal.SIGKILL)
+        return super().fetch_page(url)
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    """Ten linked pages: /p<n> links to the next three pages."""
+
+    fetched = []
+
+    def do_GET(self):
+        if self.path == "/robots.txt":
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        type(self).fetched.append(self.path)
+        n = int(self.path.strip("/p") or 0)
+        links = "".join(f'<a href="/p{(n + i) % 10}">next</a>' for i in range(1, 4))
+        body = f"<html><head><title>Page {n}</title></head><body><h1>Page {n}</h1>{links}</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+def test_shards_are_stable_and_domain_sharding_groups_hosts():
+    assert shard_for_url("https://a.example/x", 4) == shard_for_url("https://a.example/x", 4)
+    assert shard_for_url("https://a.example/x", 4, "domain") == shard_for_url("https://a.example/y", 4, "domain")
+
+
+def test_frontier_is_shared_between_connections(tmp_path):
+    db_path = tmp_path / "frontier.sqlite"
+    first = SQLiteFrontier(db_path, num_shards=1, shard=0)
+    second = SQLiteFrontier(db_path, num_shards=1, shard=0)
+
+    assert first.push_many(["https://a.example/a", "https://a.example/b"]) == 2
+    assert not second.push("https://a.example/a/#top")
+
+    assert first.pop() == ("https://a.example/a", 0)
+    assert second.pop() == ("https://a.example/b", 0)
+    assert second.is_visited("https://a.example/a")
+
+    # In-progress URLs keep the crawl alive until they are completed
+    assert first.has_pending()
+    first.complete("https://a.example/a")
+    second.complete("https://a.example/b")
+    assert first.pop() is None
+
+
+def test_frontier_pops_only_its_shard(tmp_path):
+    db_path = tmp_path / "frontier.sqlite"
+    coordinator = SQLiteFrontier(db_path, num_shards=2, shard_by="domain")
+    coordinator.push_many(["https://a.example/", "https://b.example/"])
+
+    popped = set()
+    for shard in range(2):
+        frontier = SQLiteFrontier(db_path, num_shards=2, shard_by="domain", shard=shard)
+        next_url = frontier._claim()
+        if next_url:
+            assert shard_for_url(next_url[0], 2, "domain") == shard
+            popped.add(next_url[0])
+            frontier.complete(next_url[0])
+    assert popped == {"https://a.example/", "https://b.example/"}
+
+
+def test_canonical_pages_are_claimed_once(tmp_path):
+    frontier = SQLiteFrontier(tmp_path / "frontier.sqlite", shard=0)
+    frontier.push_many(["https://a.example/docs/intro", "https://a.example/docs/latest/intro"])
+
+    url, _ = frontier.pop()
+    assert not frontier.add_canonical(url, "https://a.example/docs/intro")
+    frontier.complete(url)
+
+    alias, _ = frontier.pop()
+    assert frontier.add_canonical(alias, "https://a.example/docs/intro")
+    frontier.complete(alias)
+    states = frontier.conn.execute("SELECT state FROM urls").fetchall()
+    assert all(state == DONE for state, in states)
+
+
+def test_sharded_crawl_merges_pages_without_duplicate_fetches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    handler = type("Handler", (_SiteHandler,), {"fetched": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/p0"
+
+    try:
+        crawler = ShardedCrawler(num_workers=2, rate_limit_delay=0, crawler_factory=RequestsCrawler)
+        pages = crawler.crawl(base_url, recursive=True)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert sorted(page["url"] for page in pages) == sorted(f"http://127.0.0.1:{server.server_port}/p{n}" for n in range(10))
+    assert len(handler.fetched) == len(set(handler.fetched)) == 10
+    assert all(page["markdown"] and page["html"] is None for page in pages)
+    assert crawler.link_graph.edge_count == 30
+
+
+def test_release_shard_marks_claimed_urls_done(tmp_path):
+    db_path = tmp_path / "frontier.sqlite"
+    coordinator = SQLiteFrontier(db_path, num_shards=1)
+    coordinator.push_many(["https://a.example/a", "https://a.example/b"])
+    worker = SQLiteFrontier(db_path, num_shards=1, shard=0)
+    worker.pop()
+
+    assert coordinator.release_shard(0) == 1
+    assert coordinator.has_pending()
+    assert coordinator.release_shard(0, drop_queued=True) == 1
+    assert not coordinator.has_pending()
+
+
+def test_sharded_crawl_survives_a_killed_worker(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    handler = type("Handler", (_SiteHandler,), {"fetched": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        crawler = ShardedCrawler(num_workers=2, rate_limit_delay=0, crawler_factory=CrashingCrawler)
+        pages = crawler.crawl(f"{base_url}/p0", recursive=True)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # The page that killed its worker is skipped; the restarted worker crawls the rest
+    assert sorted(page["url"] for page in pages) == sorted(f"{base_url}/p{n}" for n in range(10) if n != 3)
+
+
+def test_unknown_shard_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        ShardedCrawler(shard_by="path")
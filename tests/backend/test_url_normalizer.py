@@ -0,0 +1,65 @@
+import pytest
+
+from web.url_normalizer import DEFAULT_TRACKING_PARAMS, OPTIONAL_TRACKING_PARAMS, URLNormalizer
+
+
+@pytest.fixture
+def normalizer():
+    """Fixture to create a URLNormalizer with default rules."""
+    return URLNormalizer()
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com/page",
+        "https://example.com/page/",
+        "https://example.com/page#section",
+        "https://example.com/page?utm_source=x&utm_medium=y",
+        "HTTPS://Example.COM:443/page?fbclid=abc",
+    ],
+)
+def test_equivalent_urls_share_a_key(normalizer, url):
+    assert normalizer.canonicalize(url) == "https://example.com/page"
+
+
+def test_query_is_sorted_and_kept(normalizer):
+    assert normalizer.normalize("https://example.com/s?b=2&a=1&utm_id=3") == "https://example.com/s?a=1&b=2"
+
+
+def test_content_selecting_params_are_kept_by_default(normalizer):
+    url = "https://git.example.com/repo/blob/README.md?ref=release"
+    assert normalizer.normalize(url) == url
+
+    opted_in = URLNormalizer(tracking_params=DEFAULT_TRACKING_PARAMS | OPTIONAL_TRACKING_PARAMS)
+    assert opted_in.normalize("https://example.com/page?ref=newsletter&si=abc") == "https://example.com/page"
+
+
+def test_root_path_and_custom_port(normalizer):
+    assert normalizer.normalize("http://example.com") == "http://example.com/"
+    assert normalizer.normalize("http://example.com:8080/a/") == "http://example.com:8080/a"
+
+
+def test_configurable_rules():
+    normalizer = URLNormalizer(
+        strip_fragment=False, trailing_slash="add", lowercase_path=True, strip_index_pages=True
+    )
+    assert normalizer.normalize("https://example.com/Docs#top") == "https://example.com/docs/#top"
+    assert normalizer.normalize("https://example.com/docs/index.html") == "https://example.com/docs/"
+    assert normalizer.normalize("https://example.com/file.pdf") == "https://example.com/file.pdf"
+
+
+def test_invalid_trailing_slash_rule():
+    with pytest.raises(ValueError):
+        URLNormalizer(trailing_slash="sometimes")
+
+
+def test_canonical_alias(normalizer):
+    canonical = normalizer.add_alias("https://example.com/v2/page?print=1", "/page")
+    assert canonical == "https://example.com/page"
+    assert normalizer.canonicalize("https://example.com/v2/page/?print=1#x") == "https://example.com/page"
+
+
+def test_cross_host_alias_rejected(normalizer):
+    assert normalizer.add_alias("https://example.com/page", "https://other.com/page") is None
+    assert normalizer.canonicalize("https://example.com/page") == "https://example.com/page"
@@ -0,0 +1,233 @@
+"""
+Deterministic synthetic website served from a local HTTP server.
+
+Used by the crawl benchmarks so they run fully offline. The generated site
+has a configurable number of pages, links per page, page size, response
+latency, share of duplicate pages and robots.txt rules. Every link to a page
+is emitted in several equivalent forms (tracking parameters, trailing slash,
+fragment) so URL deduplication is exercised, and each request is counted so
+duplicate fetches can be reported.
+"""
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+class SyntheticSite:
+    """A synthetic site served on 127.0.0.1 with per-path fetch accounting."""
+
+    def __init__(self, pages=100, fanout=5, page_size=20000, latency=0.0, duplicate_ratio=0.1,
+                 disallow=("/private/",), crawl_delay=None, seed=0):
+        """
+        Configure the site.
+
+        Args:
+            pages: Number of crawlable pages
+            fanout: Number of distinct pages each page links to
+            page_size: Approximate size of each page in bytes
+            latency: Seconds every response is delayed by
+            duplicate_ratio: Share of pages whose content copies another page
+            disallow: Path prefixes disallowed in robots.txt; every page also links
+                to one page under each prefix
+            crawl_delay: Crawl-delay value for robots.txt (None omits it)
+            seed: Seed for the generated link structure and text
+        """
+        self.pages = pages
+        self.fanout = fanout
+        self.page_size = page_size
+        self.latency = latency
+        self.duplicate_ratio = duplicate_ratio
+        self.disallow = tuple(disallow)
+        self.crawl_delay = crawl_delay
+        self.seed = seed
+
+        rng = random.Random(seed)
+        duplicates = set(rng.sample(range(1, pages), int((pages - 1) * duplicate_ratio))) if pages > 1 else set()
+        originals = [page for page in range(pages) if page not in duplicates]
+        # Duplicate pages reuse the text of an original page, so their content is identical
+        self.content_source = {page: rng.choice(originals) for page in sorted(duplicates)}
+        self.links = {page: self._page_links(page, rng) for page in range(pages)}
+
+        self.fetches = Counter()
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    # Site content
+
+    def _page_links(self, page, rng):
+        """Pick the outlinks of a page; the next page is always linked so every page is reachable."""
+        targets = [(page + 1) % self.pages]
+        while len(targets) < min(self.fanout, self.pages - 1):
+            target = rng.randrange(self.pages)
+            if target != page and target not in targets:
+                targets.append(target)
+        return targets
+
+    @staticmethod
+    def page_path(page):
+        """Canonical path of a page."""
+        return f"/page/{page}"
+
+    def _link_forms(self, page, target):
+        """Equivalent URLs for one link, which a crawler should fetch once."""
+        path = self.page_path(target)
+        return [path, f"{path}/", f"{path}#section-{page}", f"{path}?utm_source=page{page}&utm_medium=link"]
+
+    def _text(self, page):
+        """Deterministic filler paragraphs of roughly page_size bytes."""
+        rng = random.Random(self.seed * 100003 + page)
+        words = ["crawler", "frontier", "robots", "latency", "markdown", "dataset", "shard",
+                 "archive", "parser", "cache", "render", "budget", "session", "network"]
+        paragraphs = []
+        size = 0
+        section = 0
+        while size < self.page_size:
+            text = " ".join(rng.choice(words) for _ in range(60))
+            paragraph = f"<h2>Section {section}</h2><p>{text}.</p>"
+            paragraphs.append(paragraph)
+            size += len(paragraph)
+            section += 1
+        return "".join(paragraphs)
+
+    def render_page(self, page):
+        """Build the HTML of a page."""
+        source = self.content_source.get(page, page)
+        links = "".join(
+            f'<li><a href="{href}">Page {target}</a></li>'
+            for target in self.links[page]
+            for href in self._link_forms(page, target)
+        )
+        private = "".join(f'<a href="{prefix}{page}">Private</a>' for prefix in self.disallow)
+        return (
+            f"<html><head><title>Page {source}</title><meta charset='utf-8'></head><body>"
+            f"<nav>{private}</nav><main><h1>Page {source}</h1>{self._text(source)}</main>"
+            f"<ul>{links}</ul><footer>Synthetic site</footer></body></html>"
+        )
+
+    def robots_txt(self):
+        """Build the robots.txt of the site."""
+        lines = ["User-agent: *"]
+        lines += [f"Disallow: {prefix}" for prefix in self.disallow]
+        if self.crawl_delay is not None:
+            lines.append(f"Crawl-delay: {self.crawl_delay}")
+        return "\n".join(lines) + "\n"
+
+    # Fetch accounting
+
+    @staticmethod
+    def _normalize(path):
+        """Collapse the equivalent forms of a request path."""
+        path = urlparse(path).path
+        return path.rstrip("/") or "/"
+
+    def reset_counts(self):
+        """Forget the requests seen so far."""
+        with self._lock:
+            self.fetches.clear()
+            self.not_modified = 0
+
+    def get_stats(self):
+        """
+        Summarize the requests served since the last reset.
+
+        Returns:
+            dict: Page fetches, distinct pages fetched, duplicate fetches,
+                fetches of disallowed paths and 304 responses
+        """
+        with self._lock:
+            pages = {path: count for path, count in self.fetches.items() if path != "/robots.txt"}
+            return {
+                "fetches": sum(pages.values()),
+                "distinct_pages": len(pages),
+                "duplicate_fetches": sum(count - 1 for count in pages.values()),
+                "disallowed_fetches": sum(count for path, count in pages.items()
+                                          if any(path.startswith(prefix.rstrip("/")) for prefix in self.disallow)),
+                "not_modified": self.not_modified,
+            }
+
+    # Server
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+                self.send_response(status)
+                if status != 304:
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != "HEAD" and status != 304:
+                    self.wfile.write(body)
+
+            def do_HEAD(self):
+                self.do_GET()
+
+            def do_GET(self):
+                path = site._normalize(self.path)
+                if self.command == "GET":
+                    with site._lock:
+                        site.fetches[path] += 1
+                if site.latency:
+                    time.sleep(site.latency)
+
+                if path == "/robots.txt":
+                    self._send(200, site.robots_txt().encode("utf-8"), content_type="text/plain")
+                    return
+
+                parts = path.strip("/").split("/")
+                page = int(parts[1]) if len(parts) == 2 and parts[0] == "page" and parts[1].isdigit() else None
+                if page is None or page >= site.pages:
+                    self._send(404, b"<html><body>Not found</body></html>")
+                    return
+
+                body = site.render_page(page).encode("utf-8")
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    with site._lock:
+                        site.not_modified += 1
+                    self._send(304, headers={"ETag": etag})
+                    return
+                self._send(200, body, headers={"ETag": etag})
+
+        return Handler
+
+    @property
+    def base_url(self):
+        """Base URL of the running server."""
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    @property
+    def start_url(self):
+        """URL crawls of the site start from."""
+        return self.base_url + self.page_path(0)
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,182 @@
+"""
+End-to-end crawl benchmark against a synthetic local site.
+
+Runs WebCrawler.crawl_website in its different modes (plain HTTP,
+near-duplicate dropping, conditional re-crawl from the crawl cache, sharded
+across worker processes and, when a Chromium build is installed, Playwright
+rendering) and reports pages/sec, CPU per page, peak RSS and duplicate
+fetches. Each mode runs in a fresh process so CPU and memory are measured
+separately; nothing leaves 127.0.0.1. Run directly for a report:
+
+    python tests/benchmarks/test_crawl_benchmark.py --pages 500 --latency 0.01
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../backend")))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from synthetic_site import SyntheticSite
+
+MODES = ["requests", "near_duplicates", "cached", "sharded", "playwright"]
+
+
+def _chromium_available():
+    """Check whether Playwright and a Chromium build are installed."""
+    try:
+        from playwright.sync_api import sync_playwright
+        with sync_playwright() as p:
+            return os.path.exists(p.chromium.executable_path)
+    except Exception:
+        return False
+
+
+def _make_crawler(mode, work_dir):
+    """Build a crawler for a mode with caches kept inside work_dir."""
+    from web.crawl_cache import CrawlCache
+    from web.crawler import WebCrawler
+    from web.robots_cache import RobotsCache
+
+    return WebCrawler(
+        respect_robots_txt=True,
+        rate_limit_delay=0,
+        crawl_cache=CrawlCache(os.path.join(work_dir, "crawl_cache")) if mode == "cached" else None,
+        robots_cache=RobotsCache(os.path.join(work_dir, "robots")),
+        use_playwright=mode == "playwright",
+    )
+
+
+def _crawl(mode, start_url, work_dir):
+    """Crawl the site once in a mode and return the number of pages."""
+    crawler = _make_crawler(mode, work_dir)
+    results = crawler.crawl_website(
+        start_url,
+        recursive=True,
+        cleanup_temp=True,
+        near_duplicates="drop" if mode == "near_duplicates" else None,
+        num_workers=2 if mode == "sharded" else None,
+    )
+    return len(results)
+
+
+def _run_mode(mode, start_url, work_dir, queue):
+    """Child process: crawl once and report wall time, CPU and peak RSS."""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    pages = _crawl(mode, start_url, work_dir)
+    wall = time.perf_counter() - wall_start
+
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    own_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put({
+        "pages": pages,
+        "wall": wall,
+        "cpu": time.process_time() - cpu_start + children.ru_utime + children.ru_stime,
+        # ru_maxrss is in KiB on Linux; worker processes are counted by their largest member
+        "peak_rss_mb": max(own_rss, children.ru_maxrss) / 1024,
+    })
+
+
+def run_mode(site, mode, work_dir):
+    """
+    Benchmark one crawl mode against a running synthetic site.
+
+    Args:
+        site: Started SyntheticSite
+        mode: One of MODES
+        work_dir: Directory for the crawler's caches
+
+    Returns:
+        dict: pages, pages_per_sec, cpu_ms_per_page, peak_rss_mb and the site's fetch stats
+    """
+    context = multiprocessing.get_context("spawn")
+    if mode == "cached":
+        # Populate the cache first; only the conditional re-crawl is measured
+        warm = context.Process(target=_crawl, args=("cached", site.start_url, work_dir))
+        warm.start()
+        warm.join()
+
+    site.reset_counts()
+    queue = context.Queue()
+    process = context.Process(target=_run_mode, args=(mode, site.start_url, work_dir, queue))
+    process.start()
+    result = queue.get(timeout=600)
+    process.join()
+
+    pages = max(result["pages"], 1)
+    report = {
+        "mode": mode,
+        "pages": result["pages"],
+        "pages_per_sec": result["pages"] / result["wall"] if result["wall"] else 0.0,
+        "cpu_ms_per_page": result["cpu"] * 1000 / pages,
+        "peak_rss_mb": result["peak_rss_mb"],
+    }
+    report.update(site.get_stats())
+    return report
+
+
+def run_benchmark(site, modes=None):
+    """Run several modes against one site and return their reports."""
+    modes = [mode for mode in (modes or MODES) if mode != "playwright" or _chromium_available()]
+    reports = []
+    for mode in modes:
+        with tempfile.TemporaryDirectory() as work_dir:
+            reports.append(run_mode(site, mode, work_dir))
+    return reports
+
+
+def format_reports(reports):
+    """Format benchmark reports as a table."""
+    lines = [f"{'mode':<16}{'pages':>7}{'pages/s':>10}{'cpu ms/page':>13}{'peak RSS MB':>13}"
+             f"{'fetches':>9}{'dup fetches':>13}{'304s':>6}"]
+    for r in reports:
+        lines.append(f"{r['mode']:<16}{r['pages']:>7}{r['pages_per_sec']:>10.1f}{r['cpu_ms_per_page']:>13.1f}"
+                     f"{r['peak_rss_mb']:>13.1f}{r['fetches']:>9}{r['duplicate_fetches']:>13}{r['not_modified']:>6}")
+    return "\n".join(lines)
+
+
+@pytest.mark.slow
+def test_crawl_modes_fetch_each_page_once():
+    with SyntheticSite(pages=40, fanout=4, page_size=8000, duplicate_ratio=0.2) as site:
+        reports = run_benchmark(site)
+    print("\n" + format_reports(reports))
+
+    by_mode = {r["mode"]: r for r in reports}
+    unique_pages = site.pages - len(site.content_source)
+    for r in reports:
+        assert r["duplicate_fetches"] == 0, r
+        assert r["disallowed_fetches"] == 0, r
+        assert r["distinct_pages"] == site.pages, r
+    assert by_mode["requests"]["pages"] == site.pages
+    assert by_mode["sharded"]["pages"] == site.pages
+    assert by_mode["near_duplicates"]["pages"] == unique_pages
+    assert by_mode["cached"]["not_modified"] == site.pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WebCrawler against a synthetic local site")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--fanout", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=20000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each response is delayed by")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1)
+    parser.add_argument("--disallow", nargs="*", default=["/private/"], help="Path prefixes disallowed in robots.txt")
+    parser.add_argument("--crawl-delay", type=float, default=None)
+    parser.add_argument("--modes", nargs="*", choices=MODES, default=MODES)
+    args = parser.parse_args()
+
+    site = SyntheticSite(pages=args.pages, fanout=args.fanout, page_size=args.page_size, latency=args.latency,
+                         duplicate_ratio=args.duplicate_ratio, disallow=args.disallow, crawl_delay=args.crawl_delay)
+    with site:
+        print(format_reports(run_benchmark(site, args.modes)))
+
+
+if __name__ == "__main__":
+    main()
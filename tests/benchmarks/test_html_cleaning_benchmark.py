@@ -0,0 +1,125 @@
+"""
+Benchmark of HTMLMarkdownConverter.clean_html on multi-megabyte pages.
+
+Compares the old cleaner, which ran one re.sub per construct (scripts,
+styles, meta, comments, links, SVG, base64 images) and rescanned the whole
+document each time, with the single-pass precompiled cleaner. Run directly
+for a report:
+
+    python tests/benchmarks/test_html_cleaning_benchmark.py
+"""
+import os
+import re
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../backend")))
+
+from processors.markdown_converter import (
+    BASE64_IMG_PATTERN, COMMENT_PATTERN, LINK_PATTERN, META_PATTERN, SCRIPT_PATTERN, STYLE_PATTERN, SVG_PATTERN,
+    HTMLMarkdownConverter,
+)
+
+FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL
+PIXEL = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+
+
+def _content_page(target_bytes):
+    """Build a documentation-style page of roughly target_bytes with occasional scripts, SVGs and images."""
+    blocks = []
+    size = 0
+    index = 0
+    while size < target_bytes:
+        block = f"<section><h2>Section {index}</h2>" + "".join(
+            f"<p>Paragraph {item} of section {index} with <a href='/docs/{item}'>a link</a>, <em>emphasis</em> "
+            f"and <code>call()</code> explaining the API in detail.</p>"
+            for item in range(30)
+        )
+        if index % 3 == 0:
+            block += f"<!-- ad slot {index} --><script>var slot{index} = {{size: [300, 250]}};</script>"
+        if index % 4 == 0:
+            block += f"<svg viewBox='0 0 16 16'><path d='M0 0h16v16H0z'/></svg><img src=\"data:image/png;base64,{PIXEL}\">"
+        blocks.append(block + "<table><tr><td>cell</td><td>cell</td></tr></table></section>")
+        size += len(blocks[-1])
+        index += 1
+    return (
+        "<html><head><title>Reference</title><meta charset='utf-8'><link rel='stylesheet' href='/site.css'>"
+        "<style>p { margin: 0; }</style></head><body>" + "".join(blocks) + "</body></html>"
+    )
+
+
+def _markup_heavy_page(target_bytes):
+    """Build a page of roughly target_bytes packed with everything the cleaner strips."""
+    head = (
+        "<html><head><title>Large page</title><meta charset='utf-8'><meta name='viewport' content='width=device-width'>"
+        "<link rel='stylesheet' href='/site.css'><style>body { margin: 0; } .nav { display: flex; }</style>"
+        "<script>window.dataLayer = window.dataLayer || [];</script></head><body>"
+    )
+    blocks = []
+    size = len(head)
+    index = 0
+    while size < target_bytes:
+        block = (
+            f"<!-- section {index} --><section><h2>Section {index}</h2>"
+            f"<p>Paragraph {index} with <a href='/docs/{index}'>a link</a> and <code>code()</code>.</p>"
+            f"<svg width='16' height='16' viewBox='0 0 16 16'><path d='M0 0h16v16H0z'/><circle cx='8' cy='8' r='4'/></svg>"
+            f"<img src=\"data:image/png;base64,{PIXEL * 4}\" alt='icon {index}'>"
+            f"<script type='application/ld+json'>{{\"@type\": \"Article\", \"position\": {index}}}</script>"
+            f"<ul><li>First item</li><li>Second item</li></ul></section>"
+        )
+        blocks.append(block)
+        size += len(block)
+        index += 1
+    return head + "".join(blocks) + "</body></html>"
+
+
+def clean_html_chained(html):
+    """The old cleaner: one full-document re.sub per construct."""
+    html = re.sub(SCRIPT_PATTERN, "", html, flags=FLAGS)
+    html = re.sub(STYLE_PATTERN, "", html, flags=FLAGS)
+    html = re.sub(META_PATTERN, "", html, flags=FLAGS)
+    html = re.sub(COMMENT_PATTERN, "", html, flags=FLAGS)
+    html = re.sub(LINK_PATTERN, "", html, flags=FLAGS)
+    html = re.sub(SVG_PATTERN, lambda m: f"{m.group(1)}this is a placeholder{m.group(3)}", html, flags=re.DOTALL)
+    return re.sub(BASE64_IMG_PATTERN, '<img src="#"/>', html)
+
+
+def measure(cleaner, html, repeat=3):
+    """Return the best wall time of a cleaner over a few runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cleaner(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+PAGES = {"content": _content_page, "markup-heavy": _markup_heavy_page}
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("kind", sorted(PAGES))
+def test_single_pass_cleaner_matches_and_beats_chained_subs(kind):
+    converter = HTMLMarkdownConverter(cache=False)
+    html = PAGES[kind](4 * 1024 * 1024)
+
+    assert converter.clean_html(html) == clean_html_chained(html)
+
+    before = measure(clean_html_chained, html)
+    after = measure(converter.clean_html, html)
+    print(f"\n{kind} page={len(html) / 1e6:.1f}MB chained={before * 1000:.0f}ms single-pass={after * 1000:.0f}ms "
+          f"speedup={before / after:.1f}x")
+    assert after < before
+
+
+if __name__ == "__main__":
+    converter = HTMLMarkdownConverter(cache=False)
+    for kind, build in PAGES.items():
+        for megabytes in (1, 4, 16):
+            html = build(megabytes * 1024 * 1024)
+            before = measure(clean_html_chained, html)
+            after = measure(converter.clean_html, html)
+            print(f"{kind:>12} {megabytes:>3} MB page: chained {before * 1000:7.0f} ms  "
+                  f"single-pass {after * 1000:7.0f} ms  ({before / after:.1f}x, {len(html) / after / 1e6:.0f} MB/s)")
@@ -0,0 +1,88 @@
+"""
+Benchmark of per-page HTML parsing cost in the crawler.
+
+Compares the old pipeline, which parsed every page with html.parser in
+fetch_page and again in the fallback converter, with the parse-once
+pipeline that reuses the fetched soup. Run directly for a report:
+
+    python tests/benchmarks/test_html_parsing_benchmark.py
+"""
+import os
+import sys
+import time
+
+import pytest
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../backend")))
+
+from processors.markdown_converter import HTMLMarkdownConverter
+from utils.html_parser import get_parser_name, parse_html
+
+PAGES = 30
+
+
+def _synthetic_page(index, sections=40):
+    """Build a documentation-style page of roughly 40 KB."""
+    body = []
+    for section in range(sections):
+        body.append(f"<h2>Section {section}</h2>")
+        body.append(f"<p>Page {index} section {section} explains the <code>api_{section}</code> call "
+                    f"with <a href='/docs/{section}'>a reference</a> and <em>examples</em>.</p>")
+        body.append("<ul>" + "".join(f"<li>Item {item}</li>" for item in range(5)) + "</ul>")
+    return (
+        f"<html><head><title>Page {index}</title><script>var x = {index};</script>"
+        f"<style>p {{ margin: 0; }}</style></head><body><nav><a href='/'>Home</a></nav>"
+        f"{''.join(body)}<footer>Footer</footer></body></html>"
+    )
+
+
+def _links(soup):
+    return [a["href"] for a in soup.find_all("a", href=True)]
+
+
+def _parse_twice(converter, html):
+    """Old pipeline: fetch_page parses the page, the fallback converter parses it again."""
+    soup = BeautifulSoup(html, "html.parser")
+    _links(soup)
+    return converter._fallback_html_to_markdown(html)
+
+
+def _parse_once(converter, html):
+    """New pipeline: one parse with the configured backend, reused by the converter."""
+    soup = parse_html(html)
+    _links(soup)
+    return converter._fallback_html_to_markdown(html, soup=soup)
+
+
+def measure(pipeline, pages):
+    """Return the CPU seconds per page spent by a pipeline."""
+    converter = HTMLMarkdownConverter()
+    start = time.process_time()
+    for html in pages:
+        pipeline(converter, html)
+    return (time.process_time() - start) / len(pages)
+
+
+@pytest.mark.slow
+def test_parse_once_saves_cpu_per_page():
+    pages = [_synthetic_page(i) for i in range(PAGES)]
+    measure(_parse_once, pages[:2])  # warm up imports and caches
+
+    before = measure(_parse_twice, pages)
+    after = measure(_parse_once, pages)
+
+    print(f"\nparser={get_parser_name()} before={before * 1000:.1f}ms/page after={after * 1000:.1f}ms/page "
+          f"saved={(before - after) * 1000:.1f}ms/page")
+    assert after < before
+
+
+if __name__ == "__main__":
+    pages = [_synthetic_page(i) for i in range(PAGES)]
+    measure(_parse_once, pages[:2])
+    before = measure(_parse_twice, pages)
+    after = measure(_parse_once, pages)
+    print(f"Parser backend: {get_parser_name()}")
+    print(f"Parse twice (html.parser): {before * 1000:.1f} ms CPU per page")
+    print(f"Parse once:                {after * 1000:.1f} ms CPU per page")
+    print(f"Saved:                     {(before - after) * 1000:.1f} ms CPU per page ({(1 - after / before) * 100:.0f}%)")